@@ -0,0 +1,185 @@
+"""
+서버 측 집계 API: COUNT / MIN / MAX / SUM / AVG 와 GROUP BY 결과만 반환 (대시보드용).
+
+POST /api/aggregate/{table}
+Body: {
+    group_by: ["hq_code", "alive"],                        # 스키마에 있는 컬럼만 허용
+    aggregates: [{ fn: "count" }, { fn: "max", field: "alive_time", as: "last_alive" }],
+    filters: [...],                                        # get-db-array와 같은 구조화 필터 (filters.py)
+    limit?: 1000
+}
+응답: [{ hq_code, alive, count, last_alive }, ...]  (그룹 컬럼 순 정렬)
+
+- 테이블 존재·권한 확인은 get-db-array와 같다 (관리 테이블은 admin만).
+- 결과는 AGGREGATE_CACHE_TTL_SEC 동안 캐시하며, 테이블 버전(쓰기·변경 알림)이 바뀌면 즉시 무효화한다.
+"""
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+
+from fast_json import FastJSONResponse, lower_dict_row
+from filters import compile_filters, get_filterable_columns
+from query_guard import GUARDS, guarded_connection
+from result_cache import get_table_version, make_cache_key
+
+try:
+    AGGREGATE_CACHE_TTL_SEC = float(os.getenv("AGGREGATE_CACHE_TTL_SEC") or "10")
+except (TypeError, ValueError):
+    AGGREGATE_CACHE_TTL_SEC = 10.0
+try:
+    AGGREGATE_MAX_GROUPS = int(os.getenv("AGGREGATE_MAX_GROUPS") or "10000")
+except (TypeError, ValueError):
+    AGGREGATE_MAX_GROUPS = 10000
+_CACHE_MAX_ENTRIES = 500
+
+# 허용 집계 함수 -> SQL 템플릿 ({col}: 검증된 컬럼)
+AGGREGATE_FUNCTIONS = {
+    "count": "COUNT({col})",
+    "count_distinct": "COUNT(DISTINCT {col})",
+    "min": "MIN({col})",
+    "max": "MAX({col})",
+    "sum": "SUM({col})",
+    "avg": "AVG({col})",
+}
+# SUM/AVG는 숫자 컬럼만 (스키마 캐시의 타입 기준)
+_NUMERIC_ONLY = {"sum", "avg"}
+_NUMERIC_TYPE_PREFIXES = ("smallint", "integer", "int", "bigint", "numeric", "decimal", "real", "double", "float")
+_ALIAS_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+MAX_GROUP_BY = 5
+MAX_AGGREGATES = 10
+
+# 캐시 키 -> (테이블 버전, 만료 시각, 결과 행)
+_cache: Dict[str, Tuple[str, float, List[Dict[str, Any]]]] = {}
+
+
+class AggregateRequest(BaseModel):
+    group_by: List[str] = []
+    # [{fn, field?, as?}] — field 생략 시 count는 COUNT(*)
+    aggregates: List[Dict[str, Any]] = [{"fn": "count"}]
+    filters: List[Any] = []
+    limit: Optional[int] = None
+
+
+def _is_numeric_type(type_name: str) -> bool:
+    return str(type_name or "").lower().startswith(_NUMERIC_TYPE_PREFIXES)
+
+
+def build_aggregate_select(table: str, body: AggregateRequest) -> Tuple[str, List[Any]]:
+    """집계 SELECT 문과 파라미터 생성 (컬럼·함수·별칭 검증, 잘못되면 400)"""
+    from database import format_table_name
+    from schema_cache import get_table_meta
+
+    columns = get_filterable_columns(table)
+    meta = get_table_meta(table)
+    column_types = meta.column_types if meta else {}
+
+    if len(body.group_by) > MAX_GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"Too many group_by columns (max {MAX_GROUP_BY})")
+    if not body.aggregates or len(body.aggregates) > MAX_AGGREGATES:
+        raise HTTPException(status_code=400, detail=f"aggregates must have 1..{MAX_AGGREGATES} items")
+
+    group_columns = []
+    for name in body.group_by:
+        if not isinstance(name, str) or name.lower() not in columns:
+            raise HTTPException(status_code=400, detail=f"Unknown group_by column {name!r}")
+        group_columns.append(f'"{name.lower()}"')
+
+    select_parts = list(group_columns)
+    aliases = {name.lower() for name in body.group_by}
+    for spec in body.aggregates:
+        if not isinstance(spec, dict):
+            raise HTTPException(status_code=400, detail="aggregate must be an object")
+        fn = str(spec.get("fn") or "").lower()
+        if fn not in AGGREGATE_FUNCTIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown aggregate function {fn!r}")
+        field = spec.get("field")
+        if field in (None, "*"):
+            if fn != "count":
+                raise HTTPException(status_code=400, detail=f"{fn} requires a field")
+            column_sql = "*"
+        else:
+            if not isinstance(field, str) or field.lower() not in columns:
+                raise HTTPException(status_code=400, detail=f"Unknown aggregate column {field!r}")
+            if fn in _NUMERIC_ONLY and column_types and not _is_numeric_type(column_types.get(field.lower(), "")):
+                raise HTTPException(status_code=400, detail=f"{fn} requires a numeric column ({field})")
+            column_sql = f'"{field.lower()}"'
+        alias = str(spec.get("as") or (fn if column_sql == "*" else f"{fn}_{field.lower()}")).lower()
+        if not _ALIAS_RE.match(alias) or alias in aliases:
+            raise HTTPException(status_code=400, detail=f"Invalid or duplicate alias {alias!r}")
+        aliases.add(alias)
+        select_parts.append(f'{AGGREGATE_FUNCTIONS[fn].format(col=column_sql)} AS "{alias}"')
+
+    condition, params = compile_filters(table, body.filters)
+    sql = f"SELECT {', '.join(select_parts)} FROM {format_table_name(table)}"
+    if condition:
+        sql += f" WHERE {condition}"
+    if group_columns:
+        sql += f" GROUP BY {', '.join(group_columns)} ORDER BY {', '.join(group_columns)}"
+        limit = min(body.limit, AGGREGATE_MAX_GROUPS) if body.limit and body.limit > 0 else AGGREGATE_MAX_GROUPS
+        sql += " LIMIT %s"
+        params = params + [limit]
+    return sql, params
+
+
+def _cache_get(key: str, version: str) -> Optional[List[Dict[str, Any]]]:
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+        return entry[2]
+    return None
+
+
+def _cache_put(key: str, version: str, rows: List[Dict[str, Any]]) -> None:
+    if AGGREGATE_CACHE_TTL_SEC <= 0:
+        return
+    if len(_cache) >= _CACHE_MAX_ENTRIES:
+        _cache.pop(next(iter(_cache)))
+    _cache[key] = (version, time.monotonic() + AGGREGATE_CACHE_TTL_SEC, rows)
+
+
+def register_aggregate_routes(app):
+    """집계 API 라우트 등록"""
+
+    @app.post("/api/aggregate/{table_name}")
+    async def aggregate(table_name: str, body: AggregateRequest, request: Request):
+        """테이블 집계 결과만 반환 (대시보드 카운트 등, 전체 행 다운로드 대체)"""
+        from auth import require_admin_user, run_with_admin_check
+        from database import ADMIN_ONLY_TABLES, check_admin_session, is_table_exists
+        import database
+
+        try:
+            if not await is_table_exists(table_name):
+                raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+            admin_only = table_name.upper() in ADMIN_ONLY_TABLES
+            if admin_only:
+                await check_admin_session(request)
+
+            sql, params = build_aggregate_select(table_name, body)
+            key = make_cache_key(table_name, sql, params)
+            version = get_table_version(table_name)
+            rows = _cache_get(key, version)
+            if rows is not None:
+                if admin_only:
+                    await require_admin_user(request)
+                return FastJSONResponse(rows)
+
+            async with guarded_connection(database.db_pool, GUARDS["aggregate"]) as conn:
+                async def fetch():
+                    async with conn.cursor(row_factory=lower_dict_row) as cur:
+                        await cur.execute(sql, params, prepare=True)
+                        return await cur.fetchall()
+
+                # 관리 테이블은 권한 확인을 집계 쿼리와 함께 파이프라인으로
+                rows = await run_with_admin_check(conn, request, fetch) if admin_only else await fetch()
+            # 조회 중 테이블이 바뀌었으면 저장하지 않음
+            if get_table_version(table_name) == version:
+                _cache_put(key, version, rows)
+            return FastJSONResponse(rows)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
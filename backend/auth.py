@@ -4,16 +4,26 @@ passlib 대신 bcrypt 패키지를 직접 사용 (passlib과 bcrypt 4.1+ 호환
 토큰은 httpOnly 쿠키로 전달 (XSS로부터 토큰 탈취 방지).
 로그인: 클라이언트가 SHA-256(평문) 전송 → 서버는 DB의 bcrypt(SHA-256(평문))와 비교.
 사용자 생성/수정 시 클라이언트가 이미 SHA-256(평문)을 보내므로 bcrypt만 적용해 저장.
+로그인 토큰·넌스는 session_store (SESSION_STORE=postgres면 워커 간 공유).
+관리자 권한 확인은 세션 사용자 캐시(user_id -> 사용자 row, MGMT_USER 버전·TTL로 무효화)를 먼저 본다.
 """
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
 import os
 import secrets
 import time
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
 
 import bcrypt
-from fastapi import HTTPException, Request
+from fastapi import Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 
+from query_log import auxiliary_statements, timed_pipeline
+from result_cache import get_table_version
+from session_store import get_session_store
+
 BCRYPT_MAX_BYTES = 72
 
 
@@ -37,83 +47,287 @@ def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(truncated.encode("utf-8"), hashed.encode("utf-8"))
 
 
-# 넌스 캐시 (재전송 방지): nonce -> 만료 시각
-_nonce_cache: Dict[str, float] = {}
+# bcrypt는 호출마다 수백 ms CPU를 쓰므로 이벤트 루프 밖(전용 실행기)에서 실행한다.
+# BCRYPT_EXECUTOR=thread(기본, bcrypt가 GIL을 놓음) 또는 process. 동시 실행은 BCRYPT_MAX_WORKERS개,
+# 대기는 BCRYPT_MAX_QUEUE개까지이고 넘으면 503 (로그인 폭주 시 대기열이 무한히 늘지 않도록).
+BCRYPT_EXECUTOR = (os.getenv("BCRYPT_EXECUTOR") or "thread").strip().lower()
+try:
+    BCRYPT_MAX_WORKERS = int(os.getenv("BCRYPT_MAX_WORKERS") or str(min(4, os.cpu_count() or 1)))
+except (TypeError, ValueError):
+    BCRYPT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+try:
+    BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE") or "64")
+except (TypeError, ValueError):
+    BCRYPT_MAX_QUEUE = 64
+_bcrypt_executor: Optional[concurrent.futures.Executor] = None
+_bcrypt_slots = asyncio.Semaphore(max(1, BCRYPT_MAX_WORKERS))
+_bcrypt_pending = 0
+_bcrypt_stats = {"completed": 0, "rejected": 0}
+
+
+def _get_bcrypt_executor() -> concurrent.futures.Executor:
+    global _bcrypt_executor
+    if _bcrypt_executor is None:
+        workers = max(1, BCRYPT_MAX_WORKERS)
+        if BCRYPT_EXECUTOR == "process":
+            _bcrypt_executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        else:
+            _bcrypt_executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _bcrypt_executor
+
+
+@contextlib.contextmanager
+def _bcrypt_reservation() -> Iterator[None]:
+    """bcrypt 대기열 자리 예약 (실행 중 + 대기 수가 상한이면 503). 블록을 나가면 반납"""
+    global _bcrypt_pending
+    if _bcrypt_pending >= max(1, BCRYPT_MAX_WORKERS) + max(0, BCRYPT_MAX_QUEUE):
+        _bcrypt_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Too many concurrent password operations",
+                            headers={"Retry-After": "1"})
+    _bcrypt_pending += 1
+    try:
+        yield
+    finally:
+        _bcrypt_pending -= 1
+
+
+async def _execute_bcrypt(fn: Callable[..., Any], *args: Any) -> Any:
+    """예약한 자리로 동시 실행 상한 내에서 실행기로 bcrypt 호출"""
+    async with _bcrypt_slots:
+        result = await asyncio.get_running_loop().run_in_executor(_get_bcrypt_executor(), fn, *args)
+    _bcrypt_stats["completed"] += 1
+    return result
+
+
+async def _run_bcrypt(fn: Callable[..., Any], *args: Any) -> Any:
+    """동시 실행 상한 내에서 실행기로 bcrypt 호출 (대기열이 차면 503)"""
+    with _bcrypt_reservation():
+        return await _execute_bcrypt(fn, *args)
+
+
+async def hash_password_async(plain: str) -> str:
+    return await _run_bcrypt(hash_password, plain)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_bcrypt(verify_password, plain, hashed)
+
+
+def get_bcrypt_status() -> Dict[str, Any]:
+    return {
+        "executor": BCRYPT_EXECUTOR,
+        "max_workers": BCRYPT_MAX_WORKERS,
+        "max_queue": BCRYPT_MAX_QUEUE,
+        "pending": _bcrypt_pending,
+        **_bcrypt_stats,
+    }
+
+
+def shutdown_bcrypt_executor() -> None:
+    """앱 종료 시 실행기 정리"""
+    global _bcrypt_executor
+    if _bcrypt_executor is not None:
+        _bcrypt_executor.shutdown(wait=False, cancel_futures=True)
+        _bcrypt_executor = None
+
+
+# 넌스 (재전송 방지) 유효 시간. 저장은 session_store (워커 간 공유 가능)
 NONCE_TTL_SECONDS = 60
 
 
-def _store_nonce(nonce: str) -> None:
-    _nonce_cache[nonce] = time.time() + NONCE_TTL_SECONDS
+async def _store_nonce(nonce: str) -> None:
+    await get_session_store().add_nonce(nonce, NONCE_TTL_SECONDS)
 
 
-def consume_nonce(nonce: str) -> bool:
-    now = time.time()
-    expired = [k for k, v in _nonce_cache.items() if v < now]
-    for k in expired:
-        del _nonce_cache[k]
-    if not nonce or nonce not in _nonce_cache:
-        return False
-    del _nonce_cache[nonce]
-    return True
+async def consume_nonce(nonce: str) -> bool:
+    return await get_session_store().consume_nonce(nonce)
 
 
-def process_mgmt_user_password_body(body: dict, table_name: str) -> None:
+def take_mgmt_user_password(body: dict, table_name: str) -> Optional[Tuple[str, str]]:
     """
-    MGMT_USER 테이블에 대한 POST/PUT body에서 비밀번호가 있으면
-    넌스 검증 후 bcrypt(SHA-256(평문)) 저장(로그인 검증과 동일), nonce 키 제거.
-    body를 직접 수정한다. 조건에 해당하지 않으면 아무 작업도 하지 않는다.
+    MGMT_USER POST/PUT body에 비밀번호가 있으면 넌스 키를 제거하고 (비밀번호 키, 넌스) 반환, 없으면 None.
+    넌스가 없으면 400. 넌스 소비·해시는 hash_mgmt_user_password에서 한다 (bulk는 전체 검증 후 호출).
     """
     if str(table_name).upper() != "MGMT_USER":
-        return
+        return None
     body_lower = {str(k).lower(): k for k in body.keys()}
     if "password" not in body_lower:
-        return
+        return None
     nonce = body.get("nonce") or body.get("NONCE")
     if not nonce:
         raise HTTPException(status_code=400, detail="NONCE required for password")
-    if not consume_nonce(str(nonce)):
-        raise HTTPException(status_code=400, detail="Invalid or expired nonce")
-    pw_key = body_lower["password"]
-    # 클라이언트가 이미 SHA-256(평문)을 보내므로 그대로 bcrypt만 적용 (로그인 검증과 일치)
-    body[pw_key] = hash_password(str(body[pw_key]))
     for k in list(body.keys()):
         if str(k).lower() == "nonce":
             del body[k]
             break
+    return body_lower["password"], str(nonce)
+
 
+async def hash_mgmt_user_password(body: dict, pw_key: str, nonce: str) -> None:
+    """넌스를 소비하고 body[pw_key]를 bcrypt(SHA-256(평문))로 바꾼다 (로그인 검증과 동일)"""
+    # 넌스를 소비하기 전에 bcrypt 자리를 예약 (대기열이 차서 503이면 넌스가 남아 재시도 가능)
+    with _bcrypt_reservation():
+        if not await consume_nonce(nonce):
+            raise HTTPException(status_code=400, detail="Invalid or expired nonce")
+        # 클라이언트가 이미 SHA-256(평문)을 보내므로 그대로 bcrypt만 적용 (로그인 검증과 일치)
+        body[pw_key] = await _execute_bcrypt(hash_password, str(body[pw_key]))
+
+
+async def process_mgmt_user_password_body(body: dict, table_name: str) -> None:
+    """
+    MGMT_USER 테이블에 대한 POST/PUT body에서 비밀번호가 있으면
+    넌스 검증 후 bcrypt(SHA-256(평문)) 저장(로그인 검증과 동일), nonce 키 제거.
+    body를 직접 수정한다. 조건에 해당하지 않으면 아무 작업도 하지 않는다.
+    """
+    password = take_mgmt_user_password(body, table_name)
+    if password is not None:
+        await hash_mgmt_user_password(body, *password)
 
-# 로그인 발급 토큰 저장 (토큰 -> user_id). 추후 Redis 등으로 교체 가능.
-_login_tokens: Dict[str, str] = {}
 
 # httpOnly 쿠키 이름 및 설정
 AUTH_COOKIE_NAME = "session_token"
 AUTH_COOKIE_MAX_AGE = 86400 * 7  # 7일
 
 
+# user_id는 PRIMARY KEY라 컬럼에 함수를 씌우지 않아야 인덱스를 탄다.
+# 입력은 앞뒤 공백 제거, 저장값은 migrations/006_mgmt_user_trim.sql이 정리하고 트리거로 계속 정규화
+_USER_LOOKUP_SQL = "SELECT user_id, user_name, email, group_name FROM mgmt_user WHERE user_id = %s"
+_LOGIN_LOOKUP_SQL = "SELECT user_id, user_name, email, password, group_name FROM mgmt_user WHERE user_id = %s"
+
+# 세션 사용자 캐시: 관리자 권한 확인마다 사용자를 조회하지 않도록 user_id -> (MGMT_USER 버전 토큰, 만료 시각, 사용자 row).
+# rest-access-page로 MGMT_USER를 쓰면 테이블 버전이 바뀌어(다른 워커는 pg_notify로) 기존 항목이 무효화된다.
+# DB를 직접 수정한 경우는 AUTH_USER_CACHE_TTL_SEC(기본 60초) 후 반영.
+try:
+    AUTH_USER_CACHE_TTL_SEC = float(os.getenv("AUTH_USER_CACHE_TTL_SEC") or "60")
+except (TypeError, ValueError):
+    AUTH_USER_CACHE_TTL_SEC = 60.0
+try:
+    AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE") or "1000")
+except (TypeError, ValueError):
+    AUTH_USER_CACHE_SIZE = 1000
+_USER_TABLE = "MGMT_USER"
+_user_cache: "collections.OrderedDict[str, Tuple[str, float, dict]]" = collections.OrderedDict()
+
+
+def _cached_user(user_id: str) -> Optional[dict]:
+    """캐시된 사용자 row (없거나 만료·무효화되었으면 None)"""
+    entry = _user_cache.get(user_id)
+    if entry is None:
+        return None
+    version, expires, row = entry
+    if version != get_table_version(_USER_TABLE) or expires < time.monotonic():
+        del _user_cache[user_id]
+        return None
+    _user_cache.move_to_end(user_id)
+    return row
+
+
+def _cache_user(user_id: str, row: Optional[dict], version: str) -> None:
+    """조회 시작 전 버전 토큰으로 저장 (조회 중 MGMT_USER가 바뀌었으면 저장하지 않음). 없는 사용자는 저장하지 않음"""
+    if not row or AUTH_USER_CACHE_TTL_SEC <= 0 or version != get_table_version(_USER_TABLE):
+        return
+    _user_cache[user_id] = (version, time.monotonic() + AUTH_USER_CACHE_TTL_SEC, row)
+    _user_cache.move_to_end(user_id)
+    while len(_user_cache) > max(1, AUTH_USER_CACHE_SIZE):
+        _user_cache.popitem(last=False)
+
+
 async def _get_user_by_user_id(user_id: str) -> Optional[dict]:
-    """DB에서 user_id로 사용자 한 명 조회. 없으면 None."""
-    from database import db_pool
+    """user_id로 사용자 한 명 조회 (세션 사용자 캐시 우선). 없으면 None."""
+    from database import get_lane_pool
     from psycopg.rows import dict_row
-    if not db_pool:
+    row = _cached_user(user_id)
+    if row is not None:
+        return row
+    pool = get_lane_pool("auth")
+    if not pool:
         return None
-    async with db_pool.connection() as conn:
+    version = get_table_version(_USER_TABLE)
+    async with pool.connection() as conn:
         async with conn.cursor(row_factory=dict_row) as cur:
-            await cur.execute(
-                "SELECT user_id, user_name, email, group_name FROM mgmt_user WHERE TRIM(user_id) = TRIM(%s)",
-                (user_id,),
-            )
-            return await cur.fetchone()
+            await cur.execute(_USER_LOOKUP_SQL, (user_id,), prepare=True)
+            row = await cur.fetchone()
+    _cache_user(user_id, row, version)
+    return row
+
+
+async def get_session_user_id(request: Request) -> Optional[str]:
+    """쿠키의 session_token에 해당하는 user_id (세션 저장소 조회, 없거나 만료면 None)"""
+    token = request.cookies.get(AUTH_COOKIE_NAME)
+    if not token:
+        return None
+    return await get_session_store().get_session(token)
+
+
+async def has_session(request: Request) -> bool:
+    """유효한 로그인 토큰 쿠키가 있는지 (사용자 조회 없음)"""
+    return await get_session_user_id(request) is not None
 
 
 async def get_current_user_from_request(request: Request) -> Optional[dict]:
     """쿠키의 session_token으로 현재 로그인 사용자 row 조회. 없거나 무효면 None."""
-    token = request.cookies.get(AUTH_COOKIE_NAME)
-    if not token or token not in _login_tokens:
+    user_id = await get_session_user_id(request)
+    if user_id is None:
         return None
-    user_id = _login_tokens[token]
     return await _get_user_by_user_id(user_id)
 
 
+def is_admin_user(user_row: Optional[dict]) -> bool:
+    """사용자 row의 그룹이 admin인지 여부"""
+    group_name = ((user_row.get("group_name") or user_row.get("GROUP_NAME")) or "").strip().lower() if user_row else ""
+    return group_name == "admin"
+
+
+async def require_admin_user(request: Request) -> dict:
+    """
+    현재 사용자가 admin 그룹이 아니면 403. 관리자 전용 엔드포인트에서 사용
+    (라우트 전체가 관리자 전용이면 dependencies=[Depends(require_admin_user)]).
+    """
+    user_row = await get_current_user_from_request(request)
+    if not is_admin_user(user_row):
+        raise HTTPException(status_code=403, detail="Admin role required for this resource")
+    return user_row
+
+
+async def run_with_admin_check(conn, request: Request, run: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    admin이 아니면 403을 내고 run()을 실행한다. run()은 conn으로 쿼리를 실행·조회하는 함수.
+    세션 사용자 캐시에 있으면 DB 조회 없이 확인하고, 없으면 사용자 조회와 run()의 쿼리를 같은 연결에서
+    파이프라인으로 한 번에 전송한다 (결과 조회 시 사용자 조회 결과도 같은 왕복으로 수신).
+    쓰기라면 호출부의 트랜잭션이 403 예외로 롤백되어 반영되지 않는다.
+    """
+    from psycopg.rows import dict_row
+    user_id = await get_session_user_id(request)
+    if user_id is None:
+        raise HTTPException(status_code=403, detail="Admin role required for this resource")
+    cached = _cached_user(user_id)
+    if cached is not None:
+        if not is_admin_user(cached):
+            raise HTTPException(status_code=403, detail="Admin role required for this resource")
+        return await run()
+    version = get_table_version(_USER_TABLE)
+    async with timed_pipeline(conn):
+        async with conn.cursor(row_factory=dict_row) as user_cur:
+            with auxiliary_statements():
+                await user_cur.execute(_USER_LOOKUP_SQL, (user_id,))
+            try:
+                result = await run()
+            except Exception:
+                # 권한 없는 사용자에게 쿼리 오류 내용을 노출하지 않음
+                try:
+                    user_row = await user_cur.fetchone()
+                except Exception:
+                    user_row = None
+                if not is_admin_user(user_row):
+                    raise HTTPException(status_code=403, detail="Admin role required for this resource") from None
+                raise
+            user_row = await user_cur.fetchone()
+    _cache_user(user_id, user_row, version)
+    if not is_admin_user(user_row):
+        raise HTTPException(status_code=403, detail="Admin role required for this resource")
+    return result
+
+
 def register_auth_routes(app):
     """인증 관련 엔드포인트를 FastAPI 앱에 등록합니다."""
 
@@ -122,7 +336,7 @@ def register_auth_routes(app):
     async def get_nonce():
         """비밀번호 전송 시 재전송 방지용 넌스 발급."""
         nonce = secrets.token_hex(32)
-        _store_nonce(nonce)
+        await _store_nonce(nonce)
         return {"nonce": nonce}
 
     @app.post("/auth/login")
@@ -147,31 +361,38 @@ def register_auth_routes(app):
             raise HTTPException(status_code=400, detail="password required")
         if not nonce:
             raise HTTPException(status_code=400, detail="NONCE required for login")
-        if not consume_nonce(str(nonce)):
-            raise HTTPException(status_code=400, detail="Invalid or expired nonce")
         # DB에서 사용자 조회 (순환 임포트 방지를 위해 라우트 내부에서 import)
-        from database import db_pool
+        from database import get_lane_pool
         from psycopg.rows import dict_row
-        if not db_pool:
+        pool = get_lane_pool("auth")
+        if not pool:
             raise HTTPException(status_code=503, detail="Database not available")
+        version = get_table_version(_USER_TABLE)
+        # 넌스를 소비하기 전에 bcrypt 자리를 예약 (대기열이 차서 503이면 넌스가 남아 재시도 가능)
+        with _bcrypt_reservation():
+            if not await consume_nonce(str(nonce)):
+                raise HTTPException(status_code=400, detail="Invalid or expired nonce")
+            try:
+                async with pool.connection() as conn:
+                    async with conn.cursor(row_factory=dict_row) as cur:
+                        await cur.execute(_LOGIN_LOOKUP_SQL, (user_id,), prepare=True)
+                        row = await cur.fetchone()
+            except Exception as e:
+                logging.exception("login: database error for user_id=%s: %s", user_id, e)
+                raise HTTPException(status_code=503, detail="Database error")
+            if not row:
+                raise HTTPException(status_code=401, detail="Invalid user_id or password")
+            stored_hash = (row.get("password") or row.get("PASSWORD") or "").strip()
+            if not await _execute_bcrypt(verify_password, str(password), stored_hash):
+                raise HTTPException(status_code=401, detail="Invalid user_id or password")
+        token = secrets.token_hex(32)
         try:
-            async with db_pool.connection() as conn:
-                async with conn.cursor(row_factory=dict_row) as cur:
-                    await cur.execute(
-                        'SELECT user_id, user_name, email, password, group_name FROM mgmt_user WHERE TRIM(user_id) = TRIM(%s)',
-                        (user_id,),
-                    )
-                    row = await cur.fetchone()
+            await get_session_store().create_session(token, user_id, AUTH_COOKIE_MAX_AGE)
         except Exception as e:
-            logging.exception("login: database error for user_id=%s: %s", user_id, e)
-            raise HTTPException(status_code=503, detail="Database error")
-        if not row:
-            raise HTTPException(status_code=401, detail="Invalid user_id or password")
-        stored_hash = (row.get("password") or row.get("PASSWORD") or "").strip()
-        if not verify_password(str(password), stored_hash):
-            raise HTTPException(status_code=401, detail="Invalid user_id or password")
-        token = secrets.token_hex(32)
-        _login_tokens[token] = user_id
+            logging.exception("login: session store error for user_id=%s: %s", user_id, e)
+            raise HTTPException(status_code=503, detail="Session store error")
+        # 이후 권한 확인은 캐시로 (비밀번호 해시는 보관하지 않음)
+        _cache_user(user_id, {k: v for k, v in row.items() if str(k).lower() != "password"}, version)
         raw_group = (row.get("group_name") or row.get("GROUP_NAME") or "user").strip() or "user"
         user_payload = {
             "id": row.get("user_id") or row.get("USER_ID") or user_id,
@@ -196,13 +417,12 @@ def register_auth_routes(app):
     @app.get("/api/auth/me")
     async def get_me(request: Request):
         """쿠키의 토큰으로 현재 로그인 사용자 정보 반환. 없거나 무효면 401."""
-        token = request.cookies.get(AUTH_COOKIE_NAME)
-        if not token or token not in _login_tokens:
+        user_id = await get_session_user_id(request)
+        if user_id is None:
             raise HTTPException(status_code=401, detail="Not authenticated")
-        user_id = _login_tokens[token]
         row = await _get_user_by_user_id(user_id)
         if not row:
-            del _login_tokens[token]
+            await get_session_store().delete_session(request.cookies.get(AUTH_COOKIE_NAME))
             raise HTTPException(status_code=401, detail="User not found")
         raw_group = (row.get("group_name") or row.get("GROUP_NAME") or "user").strip() or "user"
         return {
@@ -214,13 +434,18 @@ def register_auth_routes(app):
             },
         }
 
+    @app.get("/api/admin/sessions", dependencies=[Depends(require_admin_user)])
+    async def session_store_status():
+        """세션·넌스 저장소 상태, 넌스 카운터와 bcrypt 실행기 상태 (관리자 전용)"""
+        return {**get_session_store().get_status(), "bcrypt": get_bcrypt_status()}
+
     @app.post("/auth/logout")
     @app.post("/api/auth/logout")
     async def logout(request: Request):
         """쿠키 삭제 후 로그아웃 처리."""
         token = request.cookies.get(AUTH_COOKIE_NAME)
-        if token and token in _login_tokens:
-            del _login_tokens[token]
+        if token:
+            await get_session_store().delete_session(token)
         response = JSONResponse(content={"ok": True})
         response.delete_cookie(key=AUTH_COOKIE_NAME, path="/")
         return response
@@ -0,0 +1,93 @@
+"""
+로그인 폭주 시 이벤트 루프 지연 벤치마크: bcrypt 검증을 이벤트 루프에서 직접 실행할 때와 전용 실행기로 넘길 때 비교.
+
+기존 경로: async 핸들러 안에서 verify_password (bcrypt.checkpw) 동기 호출
+신규 경로: verify_password_async (BCRYPT_MAX_WORKERS개 스레드/프로세스 실행기 + 대기열 상한)
+
+동시에 --logins개 로그인 검증을 시작하고, 그동안 --tick-ms 간격으로 깨어나는 태스크의 지연(예정 시각 대비 늦은 시간)을 잰다.
+SSE 스트림·다른 API 요청이 같은 루프에서 얼마나 멈추는지에 해당한다.
+
+실행: cd backend && python benchmarks/bench_bcrypt_event_loop.py [--logins 16] [--rounds 12] [--tick-ms 10]
+DB 없이 임의 비밀번호의 bcrypt 해시를 만들어 사용한다 (BCRYPT_EXECUTOR / BCRYPT_MAX_WORKERS 환경 변수 반영).
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt  # noqa: E402
+
+import auth  # noqa: E402
+
+
+async def measure_lag(stop: asyncio.Event, tick: float, lags: list) -> None:
+    """tick마다 깨어나 예정 시각보다 늦은 시간(ms) 기록"""
+    while not stop.is_set():
+        expected = time.perf_counter() + tick
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def inline_login(plain: str, hashed: str) -> bool:
+    return auth.verify_password(plain, hashed)
+
+
+async def offloaded_login(plain: str, hashed: str) -> bool:
+    return await auth.verify_password_async(plain, hashed)
+
+
+async def run_case(login, logins: int, plain: str, hashed: str, tick: float):
+    stop = asyncio.Event()
+    lags: list = []
+    ticker = asyncio.create_task(measure_lag(stop, tick, lags))
+    await asyncio.sleep(tick * 3)  # 기준 지연 안정화
+    lags.clear()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login(plain, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    assert all(results)
+    return elapsed, lags
+
+
+def summarize(lags: list) -> str:
+    if not lags:
+        return "no ticks"
+    ordered = sorted(lags)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"ticks {len(lags):4d}  median {statistics.median(ordered):7.1f} ms  p99 {p99:7.1f} ms  max {ordered[-1]:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=16, help="동시 로그인 수")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (운영 해시와 같게)")
+    parser.add_argument("--tick-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # 로그인과 같은 형태: 클라이언트 SHA-256(평문) -> DB의 bcrypt(SHA-256(평문))와 비교
+    plain = hashlib.sha256(b"benchmark-password").hexdigest()
+    hashed = bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(args.rounds)).decode("utf-8")
+    tick = args.tick_ms / 1000
+
+    async def run():
+        inline = await run_case(inline_login, args.logins, plain, hashed, tick)
+        offloaded = await run_case(offloaded_login, args.logins, plain, hashed, tick)
+        return inline, offloaded
+
+    (inline_t, inline_lags), (off_t, off_lags) = asyncio.run(run())
+    auth.shutdown_bcrypt_executor()
+    print(f"{args.logins} concurrent logins, bcrypt cost {args.rounds}, tick {args.tick_ms:g} ms, "
+          f"executor={auth.BCRYPT_EXECUTOR} x{auth.BCRYPT_MAX_WORKERS} (cpu {os.cpu_count()})")
+    print(f"  inline verify_password        : total {inline_t * 1000:8.1f} ms  loop lag {summarize(inline_lags)}")
+    print(f"  verify_password_async         : total {off_t * 1000:8.1f} ms  loop lag {summarize(off_lags)}")
+
+
+if __name__ == "__main__":
+    main()
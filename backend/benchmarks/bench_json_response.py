@@ -0,0 +1,92 @@
+"""
+JSON 직렬화 마이크로 벤치마크: MGMT_CCTV 10,000행 페이로드 기준.
+
+기존 경로: dict_row -> 필드명 소문자 재구성 루프 -> jsonable_encoder -> JSONResponse(json.dumps)
+신규 경로: lower_dict_row -> FastJSONResponse(orjson 또는 json + json_default)
+
+실행: cd backend && python benchmarks/bench_json_response.py [--rows 10000] [--repeat 5]
+DB 없이 tables.py의 MGMT_CCTV 컬럼 타입으로 합성한 행을 사용한다.
+"""
+import argparse
+import datetime as dt
+import decimal
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import fast_json  # noqa: E402
+from fast_json import FastJSONResponse, lower_dict_row  # noqa: E402
+from tables import TABLES  # noqa: E402
+
+
+def _sample_value(field_type: str, i: int):
+    t = field_type.lower()
+    if t.startswith("numeric") or t.startswith("int") or t == "smallint":
+        return decimal.Decimal(i % 100000)
+    if t.startswith("timestamp"):
+        return dt.datetime(2026, 1, 1, 12, 0, 0) + dt.timedelta(seconds=i)
+    if t == "date":
+        return dt.date(2026, 1, 1) + dt.timedelta(days=i % 365)
+    return f"{i:08d}"[: 12]
+
+
+def make_rows(count: int):
+    fields = TABLES["MGMT_CCTV"].fields
+    names = [f.name for f in fields]
+    values = [tuple(_sample_value(f.type, i) for f in fields) for i in range(count)]
+    return names, values
+
+
+def old_path(names, values) -> bytes:
+    rows = [dict(zip(names, v)) for v in values]  # dict_row (DB 컬럼명 그대로)
+    result = []
+    for row in rows:
+        row_dict = {}
+        for key, value in row.items():
+            row_dict[key.lower()] = value
+        result.append(row_dict)
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def new_path(names, values) -> bytes:
+    cursor = SimpleNamespace(description=[SimpleNamespace(name=n) for n in names])
+    make_row = lower_dict_row(cursor)
+    result = [make_row(v) for v in values]
+    return FastJSONResponse(result).body
+
+
+def bench(fn, names, values, repeat: int):
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(names, values)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names, values = make_rows(args.rows)
+    old_t, old_size = bench(old_path, names, values, args.repeat)
+    new_t, new_size = bench(new_path, names, values, args.repeat)
+    encoder = "orjson" if fast_json.orjson is not None else "json (orjson 미설치)"
+    print(f"MGMT_CCTV {args.rows} rows x {len(names)} columns, median of {args.repeat}")
+    print(f"  jsonable_encoder + JSONResponse : {old_t * 1000:8.1f} ms  ({old_size:,} bytes)")
+    print(f"  lower_dict_row + FastJSONResponse[{encoder}] : {new_t * 1000:8.1f} ms  ({new_size:,} bytes)")
+    print(f"  speedup: x{old_t / new_t:.1f}")
+
+
+if __name__ == "__main__":
+    main()
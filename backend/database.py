@@ -1,17 +1,62 @@
+import asyncio
+import base64
+import json
 import os
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
-from fastapi import Request, HTTPException
+from fastapi import Depends, Request, Response, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
+from psycopg.errors import QueryCanceled
 from psycopg_pool import AsyncConnectionPool
-from psycopg.rows import dict_row
+from fast_json import FastJSONResponse, dumps as json_dumps, lower_dict_row
+from filters import compile_filters, compile_sort
 from dotenv import load_dotenv
 from tables import (
     TABLES,
     get_table_key as get_table_key_from_schema,
     is_table_exists as is_table_exists_in_schema
 )
-from auth import process_mgmt_user_password_body, get_current_user_from_request
+from auth import (
+    get_current_user_from_request,
+    has_session,
+    hash_mgmt_user_password,
+    is_admin_user,
+    process_mgmt_user_password_body,
+    require_admin_user,
+    run_with_admin_check,
+    take_mgmt_user_password,
+)
+from schema_cache import (
+    ensure_schema_cache,
+    get_all_table_meta,
+    get_schema_cache_status,
+    get_table_meta,
+    refresh_schema_cache,
+)
+from fms_rollup import refresh_month_rollups
+from index_advisor import observe_query
+from query_guard import (
+    GUARDS,
+    CostGuard,
+    check_row_limit,
+    get_guarded_connection,
+    guarded_connection,
+    statement_timeout_error,
+)
+from query_log import TimedAsyncCursor, timed_pipeline
+from result_cache import (
+    cached_result,
+    etag_matches,
+    get_result_cache_status,
+    make_cache_key,
+    make_etag,
+    notify_table_change,
+    set_table_version,
+)
 
 # 장치 관리 전용 테이블: admin이 아니면 REST 접근 403
 DEVICE_MANAGEMENT_TABLES = {
@@ -34,26 +79,112 @@ load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
 # PostgreSQL 연결 설정
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# 데이터베이스 연결 풀
+# 조회 행 수 제한: limit 미지정 시 기본 상한(넘으면 413), 지정 시 최대값 (프로세스 메모리 보호)
+try:
+    DB_ROWS_DEFAULT_LIMIT = int(os.getenv("DB_ROWS_DEFAULT_LIMIT") or "10000")
+except (TypeError, ValueError):
+    DB_ROWS_DEFAULT_LIMIT = 10000
+try:
+    DB_ROWS_MAX_LIMIT = int(os.getenv("DB_ROWS_MAX_LIMIT") or "50000")
+except (TypeError, ValueError):
+    DB_ROWS_MAX_LIMIT = 50000
+
+# 스트리밍 모드에서 서버 측 커서로 한 번에 가져오는 행 수
+try:
+    DB_STREAM_BATCH_SIZE = int(os.getenv("DB_STREAM_BATCH_SIZE") or "1000")
+except (TypeError, ValueError):
+    DB_STREAM_BATCH_SIZE = 1000
+
+# 일괄 조회(get-db-array/batch) 요청 1건의 최대 항목 수와 동시 실행 수 (풀 연결을 독점하지 않도록 제한)
+try:
+    DB_BATCH_MAX_ITEMS = int(os.getenv("DB_BATCH_MAX_ITEMS") or "50")
+except (TypeError, ValueError):
+    DB_BATCH_MAX_ITEMS = 50
+try:
+    DB_BATCH_CONCURRENCY = int(os.getenv("DB_BATCH_CONCURRENCY") or "4")
+except (TypeError, ValueError):
+    DB_BATCH_CONCURRENCY = 4
+
+# 일괄 쓰기(bulk) 요청 1건에 허용하는 최대 행 수 (insert + update + delete 합계)
+try:
+    BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS") or "1000")
+except (TypeError, ValueError):
+    BULK_MAX_ROWS = 1000
+
+# 페이지네이션 응답 헤더 (본문은 기존과 같은 배열 유지)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TRUNCATED_HEADER = "X-Result-Truncated"
+
+# 데이터베이스 연결 풀 레인: 지연에 민감한 경로가 대량 조회 뒤에 줄 서지 않도록 용도별로 풀을 나눈다.
+#   interactive: 사용자 조회·CRUD (db_pool), background: SSE 폴링·TCS7000·파티션 유지 관리, auth: 로그인·사용자 조회,
+#   stream: get-db-array 스트리밍 (느린 다운로드가 연결을 오래 잡아도 interactive 레인을 차지하지 않도록 별도 상한)
+# DB_POOL_<LANE>_MIN / _MAX / _TIMEOUT_SEC 로 크기와 연결 대기 상한 설정 (_MAX=0이면 interactive 풀 공유)
+@dataclass(frozen=True)
+class PoolLane:
+    name: str
+    min_size: int
+    max_size: int
+    timeout: float  # 연결 대기 상한 (초과 시 PoolTimeout)
+
+
+def _pool_lane(name: str, min_size: int, max_size: int, timeout: float) -> PoolLane:
+    prefix = f"DB_POOL_{name.upper()}_"
+    try:
+        min_size = int(os.getenv(prefix + "MIN") or min_size)
+    except (TypeError, ValueError):
+        pass
+    try:
+        max_size = int(os.getenv(prefix + "MAX") or max_size)
+    except (TypeError, ValueError):
+        pass
+    try:
+        timeout = float(os.getenv(prefix + "TIMEOUT_SEC") or timeout)
+    except (TypeError, ValueError):
+        pass
+    return PoolLane(name, max(0, min(min_size, max_size)), max(0, max_size), timeout)
+
+
+POOL_LANES: Dict[str, PoolLane] = {
+    lane.name: lane
+    for lane in (
+        _pool_lane("interactive", 1, 10, 30.0),
+        _pool_lane("background", 1, 3, 10.0),
+        _pool_lane("auth", 1, 2, 5.0),
+        _pool_lane("stream", 0, 2, 5.0),
+    )
+}
+
+# interactive 레인 풀 (기존 코드 호환을 위해 이름 유지)
 db_pool: Optional[AsyncConnectionPool] = None
+# 레인 이름 -> 풀 (공유 레인은 db_pool)
+db_pools: Dict[str, AsyncConnectionPool] = {}
 
 
 def init_db_pool():
-    """데이터베이스 연결 풀 인스턴스를 생성합니다. open=False 이므로 사용 전 open_db_pool() 호출 필요."""
+    """레인별 연결 풀 인스턴스를 생성합니다. open=False 이므로 사용 전 open_db_pool() 호출 필요."""
     global db_pool
     if db_pool is None:
         if not DATABASE_URL:
             raise RuntimeError(
                 "DATABASE_URL가 설정되지 않았습니다. backend/.env 파일에 DATABASE_URL=postgresql://... 를 넣어 주세요."
             )
-        db_pool = AsyncConnectionPool(DATABASE_URL, min_size=1, max_size=10, open=False)
+        for lane in POOL_LANES.values():
+            if lane.name != "interactive" and lane.max_size <= 0:
+                continue
+            # 모든 문 실행 시간 측정·느린 쿼리 기록 (query_log.py)
+            db_pools[lane.name] = AsyncConnectionPool(
+                DATABASE_URL, min_size=lane.min_size, max_size=max(1, lane.max_size), timeout=lane.timeout,
+                name=lane.name, open=False, kwargs={"cursor_factory": TimedAsyncCursor},
+            )
+        db_pool = db_pools["interactive"]
     return db_pool
 
 
 async def open_db_pool():
     """비동기 연결 풀을 엽니다. 앱 startup 시 한 번 호출."""
-    pool = init_db_pool()
-    await pool.open()
+    init_db_pool()
+    for pool in db_pools.values():
+        await pool.open()
 
 
 def get_db_pool() -> Optional[AsyncConnectionPool]:
@@ -61,12 +192,30 @@ def get_db_pool() -> Optional[AsyncConnectionPool]:
     return db_pool
 
 
+def get_lane_pool(lane: str) -> Optional[AsyncConnectionPool]:
+    """레인 풀 (별도 풀이 없으면 interactive 풀)"""
+    return db_pools.get(lane) or db_pool
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """레인별 풀 설정과 psycopg_pool 통계 (대기 요청 수, 누적 대기 시간 등)"""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for name, lane in POOL_LANES.items():
+        pool = db_pools.get(name)
+        entry: Dict[str, Any] = {"shared_with": None if pool else "interactive", "timeout": lane.timeout}
+        if pool is not None:
+            entry.update(pool.get_stats())
+        stats[name] = entry
+    return stats
+
+
 async def close_db_pool():
     """데이터베이스 연결 풀을 종료합니다."""
     global db_pool
-    if db_pool:
-        await db_pool.close()
-        db_pool = None
+    for pool in db_pools.values():
+        await pool.close()
+    db_pools.clear()
+    db_pool = None
 
 
 # PostgreSQL 헬퍼 함수들
@@ -169,96 +318,696 @@ def get_cs_list(vars: Dict, preserve_case: bool = False) -> str:
     return ", ".join(sets)
 
 
+# 바인딩 파라미터 기반 쿼리 빌더
+# 값은 %s 자리표시자로만 넣어 (테이블, 컬럼 집합, 연산자 형태)가 같으면 SQL 텍스트가 동일하다.
+# 동일 텍스트는 psycopg 서버 측 prepared statement로 재사용된다.
+def param_value(val: Any) -> Any:
+    """바인딩 파라미터 값 변환 (var_value와 동일하게 빈 문자열은 NULL)"""
+    if val is None or val == '':
+        return None
+    return val
+
+
+def escape_raw_sql(fragment: str) -> str:
+    """파라미터와 함께 실행되는 원문 SQL 조각(where/order)의 % 이스케이프"""
+    return fragment.replace('%', '%%')
+
+
+def get_conditions_params(vars: Dict, name_fn=var_name) -> tuple:
+    """
+    WHERE 절과 파라미터 목록 생성. 값이 여러 개인 키는 IN (%s, ...) 으로 변환.
+    vars: { 컬럼: 값 또는 값 리스트 }
+    """
+    conditions = []
+    params: List[Any] = []
+    for key, val in vars.items():
+        if key in ["dojo_preventCache", "SQL_ORDER"]:
+            continue
+        values = val if isinstance(val, list) else [val]
+        if len(values) > 1:
+            conditions.append(f'{name_fn(key)} IN ({", ".join(["%s"] * len(values))})')
+            params.extend(param_value(v) for v in values)
+        elif len(values) == 1:
+            conditions.append(f'{name_fn(key)} = %s')
+            params.append(param_value(values[0]))
+    return (" AND ".join(conditions) if conditions else "1=1"), params
+
+
+def get_query_key_values(query: Any) -> Dict[str, List[Any]]:
+    """
+    get-db-array query 목록을 키별 값 리스트로 변환 (같은 키에 값이 여러 개면 IN 조건 대상)
+    예: [{cctv_id: '1'}, {cctv_id: '2'}] -> {cctv_id: ['1', '2']}
+    """
+    key_values: Dict[str, List[Any]] = {}
+    items = query if isinstance(query, list) else [query] if isinstance(query, dict) else []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        for key, val in item.items():
+            if key in ["dojo_preventCache", "SQL_ORDER"]:
+                continue
+            if key not in key_values:
+                key_values[key] = []
+            if val not in key_values[key]:
+                key_values[key].append(val)
+    return key_values
+
+
+def quoted_actual_column(key: str, actual_by_lower: Dict[str, str]) -> str:
+    """DB 실제 컬럼명으로 따옴표 식별자 생성 (조회된 컬럼이 없으면 소문자, PostgreSQL 기본)"""
+    actual = actual_by_lower.get(str(key).lower(), str(key).lower())
+    return f'"{actual.lower()}"'
+
+
+def resolve_write_key(table_name: str, table_key: Union[str, List[str]]) -> Union[str, List[str]]:
+    """수정/삭제 시 사용할 키. MGMT_CODE는 그룹구분+코드 2개만 키로 사용 (그룹 코드 수정 가능)"""
+    if table_name and str(table_name).upper() == "MGMT_CODE":
+        return ["GRP_GBN", "CODE"]
+    return table_key
+
+
+def extract_body_keys(table_key: Union[str, List[str]], body: Dict) -> Dict[str, Any]:
+    """PUT body에서 키 필드 값 추출 (대소문자 무시). 없으면 400"""
+    # body 키를 소문자로 정규화하여 조회 (클라이언트가 grp_code 등 소문자로 보낼 수 있음)
+    body_lower = {str(k).lower(): k for k in body.keys()}
+    key_fields = table_key if isinstance(table_key, list) else [table_key]
+    keys = {}
+    for key_field in key_fields:
+        key_lower = key_field.lower()
+        if key_lower not in body_lower:
+            raise HTTPException(status_code=400, detail=f"Key field {key_field} not found")
+        keys[key_field] = body[body_lower[key_lower]]
+    return keys
+
+
+def extract_query_keys(table_key: Union[str, List[str]], query_params: Dict[str, str]) -> Dict[str, Any]:
+    """DELETE 쿼리 파라미터에서 키 값 추출. 복합 키는 키별 파라미터 또는 key=val1,val2 형식"""
+    # 쿼리 키 대소문자 무시 조회용 (일부 프록시/서버가 키를 정규화할 수 있음)
+    query_lower = {k.lower(): k for k in query_params.keys()}
+    if isinstance(table_key, list):
+        keys = {}
+        if all(qk in query_lower for qk in [k.lower() for k in table_key]):
+            for key_field in table_key:
+                actual = query_lower.get(key_field.lower())
+                if actual is not None:
+                    keys[key_field] = query_params[actual]
+        else:
+            key_param_name = query_lower.get("key")
+            key_val = query_params[key_param_name] if key_param_name else None
+            if key_val is None:
+                raise HTTPException(status_code=400, detail=f"Key field {table_key[0]} not found in query parameters")
+            parts = [p.strip() for p in str(key_val).split(",")]
+            if len(parts) != len(table_key):
+                raise HTTPException(status_code=400, detail=f"Key must have {len(table_key)} comma-separated values")
+            for i, key_field in enumerate(table_key):
+                keys[key_field] = parts[i]
+        return keys
+    key_param_name = query_lower.get("key")
+    if key_param_name is None:
+        raise HTTPException(status_code=400, detail="Key parameter not found")
+    return {table_key: query_params[key_param_name]}
+
+
+def build_key_where(table_name: str, keys: Dict[str, Any], actual_by_lower: Dict[str, str]) -> tuple:
+    """키 조건 WHERE 절과 파라미터. MGMT_CODE 2키는 CHAR/공백 패딩 시 매칭되도록 TRIM 비교"""
+    params: List[Any] = []
+    where_parts = []
+    is_code = bool(table_name) and str(table_name).upper() == "MGMT_CODE"
+    for k, v in keys.items():
+        if is_code:
+            where_parts.append(f"TRIM(CAST({quoted_actual_column(k, actual_by_lower)} AS TEXT)) = TRIM(CAST(%s AS TEXT))")
+            params.append(param_value(str(v).strip() if v is not None else ''))
+        else:
+            where_parts.append(f'{quoted_actual_column(k, actual_by_lower)} = %s')
+            params.append(param_value(v))
+    return " AND ".join(where_parts), params
+
+
+def build_insert_statement(table_name: str, body: Dict, actual_by_lower: Dict[str, str]) -> tuple:
+    """INSERT ... RETURNING * 문과 파라미터"""
+    columns = [var_name(actual_by_lower.get(str(k).lower(), str(k).lower())) for k in body.keys()]
+    params = [param_value(v) for v in body.values()]
+    placeholders = ", ".join(["%s"] * len(params))
+    sql = f'INSERT INTO {format_table_name(table_name)} ({", ".join(columns)}) VALUES ({placeholders}) RETURNING *'
+    return sql, params
+
+
+def apply_insert_defaults(table_name: str, body: Dict, actual_by_lower: Dict[str, str]) -> None:
+    """MGMT_TRANS / MGMT_PHYSICAL_SERVER 등록 시 reg_date 컬럼이 있고 값이 없으면 현재시간(timestamp) 설정"""
+    if str(table_name).upper() in ("MGMT_TRANS", "MGMT_PHYSICAL_SERVER") and "reg_date" in actual_by_lower:
+        if not any(k for k in body.keys() if str(k).lower() == "reg_date"):
+            from datetime import datetime
+            body["reg_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def build_update_statement(table_name: str, keys: Dict[str, Any], body: Dict, actual_by_lower: Dict[str, str]) -> tuple:
+    """UPDATE ... RETURNING * 문과 파라미터. 키 필드를 제외한 body 필드가 없으면 400"""
+    # 업데이트할 필드 추출 (키 필드 제외, 키는 대소문자 무시로 비교)
+    key_lowers = {k.lower() for k in keys.keys()}
+    update_fields = {k: v for k, v in body.items() if str(k).lower() not in key_lowers}
+    if not update_fields:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    set_clause = ", ".join(f'{quoted_actual_column(k, actual_by_lower)} = %s' for k in update_fields)
+    params = [param_value(v) for v in update_fields.values()]
+    where_clause, where_params = build_key_where(table_name, keys, actual_by_lower)
+    sql = f'UPDATE {format_table_name(table_name)} SET {set_clause} WHERE {where_clause} RETURNING *'
+    return sql, params + where_params
+
+
+def build_delete_statement(table_name: str, keys: Dict[str, Any], actual_by_lower: Dict[str, str]) -> tuple:
+    """DELETE ... RETURNING * 문과 파라미터"""
+    where_clause, params = build_key_where(table_name, keys, actual_by_lower)
+    sql = f'DELETE FROM {format_table_name(table_name)} WHERE {where_clause} RETURNING *'
+    return sql, params
+
+
 # DB에 저장된 실제 컬럼명 목록 조회 (대소문자 그대로)
 async def get_actual_column_names(table_name: str, schema: str = "public") -> List[str]:
-    """information_schema에서 해당 테이블의 컬럼명 목록을 반환"""
-    try:
-        async with db_pool.connection() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_schema = %s AND LOWER(table_name) = LOWER(%s)
-                    ORDER BY ordinal_position
-                """, (schema, table_name))
-                rows = await cur.fetchall()
-                return [row[0] for row in rows] if rows else []
-    except Exception:
+    """스키마 캐시에서 해당 테이블의 컬럼명 목록을 반환 (DB에서 확인되지 않은 테이블은 빈 목록)"""
+    await ensure_schema_cache()
+    meta = get_table_meta(table_name)
+    if meta is None or meta.source != "database":
         return []
+    return list(meta.columns)
 
 
 # DB에서 테이블 존재 여부 확인
 async def is_table_exists(table_name: str) -> bool:
-    """실제 DB에서 테이블 존재 여부 확인"""
+    """tables.py 정의 또는 스키마 캐시 기준 테이블 존재 여부 확인"""
     # 먼저 tables.py에 정의되어 있는지 확인
     if is_table_exists_in_schema(table_name):
         return True
-    
-    # DB에서 확인
-    try:
-        async with db_pool.connection() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_schema = 'public' 
-                        AND LOWER(table_name) = LOWER(%s)
-                    )
-                """, (table_name,))
-                result = await cur.fetchone()
-                return result[0] if result else False
-    except Exception:
-        return False
+    await ensure_schema_cache()
+    return get_table_meta(table_name) is not None
 
 
 # DB에서 PRIMARY KEY 조회
 async def get_table_key(table_name: str) -> Union[str, List[str]]:
-    """실제 DB에서 테이블의 PRIMARY KEY 조회"""
+    """테이블의 PRIMARY KEY 조회 (tables.py 정의 우선, 없으면 스키마 캐시)"""
     # 먼저 tables.py에 정의되어 있으면 사용
     if is_table_exists_in_schema(table_name):
         try:
             return get_table_key_from_schema(table_name)
         except ValueError:
-            pass  # tables.py에 없으면 DB에서 조회
-    
-    # DB에서 PRIMARY KEY 조회
+            pass  # tables.py에 없으면 캐시에서 조회
+
+    await ensure_schema_cache()
+    meta = get_table_meta(table_name)
+    if meta is None:
+        raise ValueError(f"Failed to get PRIMARY KEY for table {table_name}: table not found")
+    if meta.key is None:
+        raise ValueError(f"Table {table_name} has no PRIMARY KEY")
+    return meta.key
+
+
+# 키셋 페이지네이션 (limit 또는 after를 지정한 요청만, PRIMARY KEY 순 정렬, 마지막 행 키 값을 커서로 전달)
+def resolve_row_limit(limit: Optional[int], guard: CostGuard = GUARDS["read"]) -> int:
+    """
+    요청 limit을 실제 적용할 행 수로 변환 (라우트 최대 행 수 초과 시 413).
+    미지정 시 기본 상한: 페이지를 요청하지 않은 조회는 잘라 보내지 않고 상한을 넘으면 413 (too_many_rows_error)
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be a positive integer")
+    cap = check_row_limit(guard, limit, DB_ROWS_MAX_LIMIT)
+    return min(DB_ROWS_DEFAULT_LIMIT, cap) if limit is None else limit
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """키 값 목록 -> 커서 토큰 (URL-safe base64 JSON)"""
+    raw = json.dumps(values, default=str, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, key_count: int) -> List[Any]:
+    """커서 토큰 -> 키 값 목록. 형식이 맞지 않으면 400"""
     try:
-        async with db_pool.connection() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute("""
-                    SELECT column_name
-                    FROM information_schema.table_constraints tc
-                    JOIN information_schema.key_column_usage kcu
-                      ON tc.constraint_name = kcu.constraint_name
-                      AND tc.table_schema = kcu.table_schema
-                    WHERE tc.table_schema = 'public'
-                      AND LOWER(tc.table_name) = LOWER(%s)
-                      AND tc.constraint_type = 'PRIMARY KEY'
-                    ORDER BY kcu.ordinal_position
-                """, (table_name,))
-                rows = await cur.fetchall()
-                
-                if not rows:
-                    raise ValueError(f"Table {table_name} has no PRIMARY KEY")
-                
-                keys = [row[0] for row in rows]
-                
-                # 단일 키면 문자열로, 복합 키면 리스트로 반환
-                if len(keys) == 1:
-                    return keys[0]
-                else:
-                    return keys
-    except Exception as e:
-        raise ValueError(f"Failed to get PRIMARY KEY for table {table_name}: {str(e)}")
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != key_count:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+async def get_keyset_columns(table_name: str) -> Optional[List[str]]:
+    """키셋 정렬에 사용할 PRIMARY KEY 컬럼 목록 (키가 없으면 None)"""
+    try:
+        key = await get_table_key(table_name)
+    except ValueError:
+        return None
+    return list(key) if isinstance(key, list) else [key]
+
+
+def build_keyset_clause(key_columns: List[str], after: Optional[str]) -> tuple:
+    """(a, b) > (%s, %s) 조건과 파라미터, ORDER BY 절. after가 없으면 조건 없음"""
+    columns = ", ".join(var_name(k) for k in key_columns)
+    order_clause = f" ORDER BY {columns}"
+    if not after:
+        return "", [], order_clause
+    values = decode_cursor(after, len(key_columns))
+    placeholders = ", ".join(["%s"] * len(key_columns))
+    return f"({columns}) > ({placeholders})", values, order_clause
+
+
+def too_many_rows_error(row_limit: int) -> HTTPException:
+    """limit 없는 조회 결과가 기본 상한을 넘을 때: 일부만 보내지 않고 페이지 조회·스트리밍을 안내"""
+    return HTTPException(
+        status_code=413,
+        detail=f"Result exceeds {row_limit} rows; pass limit to page with the {NEXT_CURSOR_HEADER} header, or use stream",
+    )
+
+
+def next_cursor_from_row(row: Dict[str, Any], key_columns: List[str]) -> str:
+    """마지막 행(소문자 키)에서 다음 페이지 커서 생성"""
+    return encode_cursor([row.get(k.lower()) for k in key_columns])
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], truncated: bool) -> None:
+    """다음 페이지 커서 / 상한 초과 여부를 응답 헤더에 설정"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if truncated:
+        response.headers[TRUNCATED_HEADER] = "true"
 
 
 # 요청 모델
+def not_modified_response(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """If-None-Match가 현재 ETag와 일치하면 304 응답 (SELECT·직렬화 없이 반환), 아니면 None"""
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def set_etag_headers(response: Response, etag: Optional[str]) -> None:
+    """ETag 헤더 설정. no-cache: 브라우저가 저장하되 매번 If-None-Match로 재검증"""
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+
 class GetDbArrayRequest(BaseModel):
     target: str  # "/TABLE_NAME/" 형식
     layout: List[Any] = [{"field": "*"}]
     query: List[Any] = []
     where: str = ""
     order: str = ""
+    limit: Optional[int] = None  # 페이지 크기. 지정하면 키셋 페이지네이션 (미지정 시 DB_ROWS_DEFAULT_LIMIT 초과면 413)
+    after: Optional[str] = None  # 이전 응답의 X-Next-Cursor 값
+    stream: Optional[str] = None  # "ndjson" | "json": 서버 측 커서로 배치 조회하며 스트리밍 (행 상한 미적용)
+    format: Optional[str] = None  # "columnar": { columns: [...], rows: [[...], ...] } (컬럼명 1회만 전송)
+    filters: List[Any] = []  # 구조화 필터 (filters.py): [{ field, op, value }, { or: [...] }, ...]
+    sort: List[Any] = []  # 구조화 정렬: [{ field, dir }, "field", "-field"] (order와 함께 사용 불가)
+
+
+class GetDbArrayBatchItem(GetDbArrayRequest):
+    key: Optional[str] = None  # 결과 맵 키 (미지정 시 테이블명)
+    if_none_match: Optional[str] = None  # 이전 결과의 etag (일치하면 status 304, data 생략)
+
+
+class GetDbArrayBatchRequest(BaseModel):
+    requests: List[GetDbArrayBatchItem]
+
+
+# 응답 형식: 기본(행마다 {컬럼: 값}) / columnar(컬럼 목록 1회 + 값 배열)
+COLUMNAR_FORMAT = "columnar"
+
+
+def validate_format(value: Optional[str]) -> bool:
+    """format 파라미터 검증. columnar 여부 반환"""
+    if not value or value == "rows":
+        return False
+    if value != COLUMNAR_FORMAT:
+        raise HTTPException(status_code=400, detail="format must be 'rows' or 'columnar'")
+    return True
+
+
+async def run_page_query(sql: str, params: List[Any], prepare: Optional[bool], row_limit: int,
+                         key_columns: Optional[List[str]], columnar: bool,
+                         admin_request: Optional[Request] = None, guard: CostGuard = GUARDS["read"],
+                         paged: bool = True, hidden_columns: Optional[List[str]] = None) -> tuple:
+    """
+    row_limit + 1행을 조회하는 SELECT 실행 후 (payload, next_cursor, truncated) 반환.
+    연결 대기·실행 시간은 guard로 제한 (초과 시 504).
+    payload: 소문자 키 dict 리스트, columnar면 { columns, rows }
+    admin_request가 있으면 사용자 조회를 같은 연결에서 파이프라인으로 함께 보내 admin이 아니면 403.
+    paged가 아니면(limit·after 미지정) row_limit을 넘을 때 413.
+    hidden_columns: 커서 생성용으로 SELECT에 덧붙인 키 컬럼 (소문자, 응답에서 제거)
+    """
+    async def fetch():
+        # 필드명 소문자 dict는 row factory가 바로 생성
+        async with conn.cursor(row_factory=None if columnar else lower_dict_row) as cur:
+            await cur.execute(sql, params, prepare=prepare)
+            return await cur.fetchall(), [d.name.lower() for d in (cur.description or [])]
+
+    async with guarded_connection(db_pool, guard) as conn:
+        if admin_request is not None:
+            rows, columns = await run_with_admin_check(conn, admin_request, fetch)
+        else:
+            rows, columns = await fetch()
+    has_more = len(rows) > row_limit
+    if has_more and not paged:
+        raise too_many_rows_error(row_limit)
+    if has_more:
+        del rows[row_limit:]
+    if columnar:
+        last = dict(zip(columns, rows[-1])) if rows else None
+    else:
+        last = rows[-1] if rows else None
+    next_cursor = next_cursor_from_row(last, key_columns) if has_more and key_columns and last else None
+    if hidden_columns:
+        if columnar:
+            keep = [i for i, c in enumerate(columns) if c not in hidden_columns]
+            columns = [columns[i] for i in keep]
+            rows = [[row[i] for i in keep] for row in rows]
+        else:
+            for row in rows:
+                for c in hidden_columns:
+                    row.pop(c, None)
+    payload: Any = {"columns": columns, "rows": rows} if columnar else rows
+    return payload, next_cursor, has_more and not next_cursor
+
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def build_db_array_select(table: str, body: GetDbArrayRequest, key_columns: Optional[List[str]],
+                          row_limit: Optional[int]) -> tuple:
+    """
+    get-db-array SELECT 문, 파라미터, prepare 여부, 덧붙인 키 컬럼(소문자, 응답에서 제거) 생성.
+    key_columns가 있으면 키 순 정렬 + after 커서 조건, row_limit이 있으면 LIMIT row_limit.
+    """
+    # 필드 목록 생성 (키셋 커서 생성을 위해 요청에 없는 키 컬럼은 덧붙이고 응답에서 뺀다)
+    fields = get_field_list(body.layout)
+    hidden: List[str] = []
+    if key_columns and fields != "*":
+        selected = {f.strip() for f in fields.split(",")}
+        missing = [k for k in key_columns if var_name(k) not in selected]
+        if missing:
+            fields = ", ".join([fields] + [var_name(k) for k in missing])
+            hidden = [k.lower() for k in missing]
+
+    # WHERE 절 생성 (where 원문은 그대로, query·filters는 바인딩 파라미터로)
+    params: List[Any] = []
+    if body.where:
+        condition = f"({escape_raw_sql(body.where)})"
+    else:
+        # 같은 키에 대해 여러 값이 있으면 IN 절로 변환
+        condition, params = get_conditions_params(get_query_key_values(body.query))
+    filter_condition, filter_params = compile_filters(table, body.filters)
+    if filter_condition:
+        condition = filter_condition if condition == "1=1" else f"{condition} AND {filter_condition}"
+        params = params + filter_params
+
+    # ORDER BY 절 ('$' 원문 정렬은 이스케이프, sort는 검증된 컬럼). 사용자 정렬이 없으면 키 순
+    order_clause = ""
+    if body.order:
+        order_clause = f" ORDER BY {escape_raw_sql(get_quoted_order(body.order))}"
+    elif body.sort:
+        order_clause = f" ORDER BY {compile_sort(table, body.sort)}"
+    elif key_columns:
+        keyset_condition, keyset_params, order_clause = build_keyset_clause(key_columns, body.after)
+        if keyset_condition:
+            condition = keyset_condition if condition == "1=1" else f"{condition} AND {keyset_condition}"
+            params = params + keyset_params
+
+    where_clause = f" WHERE {condition}" if condition and condition != "1=1" else ""
+    sql = f'SELECT {fields} FROM {format_table_name(table)}{where_clause}{order_clause}'
+    if row_limit is not None:
+        sql += " LIMIT %s"
+        params = params + [row_limit]
+    # where/'$' 원문이 없는 요청만 강제 prepare (원문은 요청마다 텍스트가 달라 자동 판단에 맡김)
+    prepare = None if body.where or body.order.startswith('$') else True
+    return sql, params, prepare, hidden
+
+
+@dataclass
+class DbArrayPlan:
+    """get-db-array 조회 계획 (SQL 생성 결과와 응답 형식)"""
+    table: str
+    sql: str
+    params: List[Any]
+    prepare: Optional[bool]
+    row_limit: Optional[int]
+    key_columns: Optional[List[str]]
+    columnar: bool
+    cache_key: Optional[str]  # 결과 캐시·ETag 키 (where 원문 조회는 None)
+    paged: bool = True  # limit·after 지정 (아니면 상한 초과 시 413)
+    hidden_columns: Optional[List[str]] = None  # 커서용으로 덧붙인 키 컬럼 (응답에서 제거)
+
+
+async def plan_db_array_read(table: str, body: GetDbArrayRequest) -> DbArrayPlan:
+    """
+    get-db-array 요청 검증 후 SELECT 계획 생성 (DB 조회 없음, 권한 확인은 호출부).
+    스트리밍이 아니면 다음 페이지 존재 확인용으로 row_limit + 1행을 조회하는 SQL을 만든다.
+    페이지네이션은 limit 또는 after를 지정한 요청만: 그 외에는 키 순 정렬을 강제하지 않고 상한 초과 시 413.
+    """
+    if body.stream and body.stream not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="stream must be 'ndjson' or 'json'")
+    columnar = validate_format(body.format)
+    # 스트리밍은 메모리가 행 수와 무관하므로 명시한 limit만 적용
+    if body.stream:
+        row_limit = resolve_row_limit(body.limit, GUARDS["stream"]) if body.limit is not None else None
+    else:
+        row_limit = resolve_row_limit(body.limit)
+    if body.order and body.sort:
+        raise HTTPException(status_code=400, detail="Use either order or sort, not both")
+    paged = body.limit is not None or bool(body.after)
+    # 사용자 정렬이 있으면 키셋 불가 (상한만 적용)
+    key_columns = None if body.order or body.sort or not paged or body.stream else await get_keyset_columns(table)
+    if body.after and not key_columns:
+        raise HTTPException(status_code=400, detail="after cursor requires key order (omit order)")
+
+    query_limit = row_limit if body.stream else row_limit + 1
+    sql, params, prepare, hidden = build_db_array_select(table, body, key_columns, query_limit)
+    # where 원문은 다른 테이블을 참조할 수 있어 결과 캐시·ETag 제외
+    cache_key = None if body.where or body.stream else make_cache_key(table, sql, params, columnar)
+    return DbArrayPlan(table, sql, params, prepare, row_limit, key_columns, columnar, cache_key, paged, hidden)
+
+
+async def execute_db_array_read(plan: DbArrayPlan, admin_request: Optional[Request] = None) -> tuple:
+    """
+    계획 실행 (참조 테이블은 결과 캐시 사용). (payload, next_cursor, truncated) 반환.
+    admin_request가 있으면 권한 확인을 SELECT와 함께 파이프라인으로 보내며 결과 캐시를 쓰지 않는다.
+    """
+    async def load():
+        start = time.perf_counter()
+        result = await run_page_query(plan.sql, plan.params, plan.prepare, plan.row_limit, plan.key_columns,
+                                      plan.columnar, admin_request, paged=plan.paged,
+                                      hidden_columns=plan.hidden_columns)
+        observe_query(plan.table, plan.sql, (time.perf_counter() - start) * 1000)
+        return result
+
+    if plan.cache_key is None or admin_request is not None:
+        return await load()
+    return await cached_result(plan.table, plan.cache_key, load)
+
+
+async def check_admin_session(request: Request) -> None:
+    """유효한 세션이 없으면 사용자 조회 없이 403 (권한 확인 자체는 쿼리와 함께 파이프라인으로)"""
+    if not await has_session(request):
+        raise HTTPException(status_code=403, detail="Admin role required for this resource")
+
+
+async def execute_write(conn, sql: str, params: List[Any], table_name: str) -> tuple:
+    """쓰기 문과 변경 알림(pg_notify)을 함께 보내고 (RETURNING 행, 새 버전 토큰) 반환"""
+    async with conn.cursor(row_factory=lower_dict_row) as cur, conn.cursor() as notify_cur:
+        await cur.execute(sql, params, prepare=True)
+        version = await notify_table_change(notify_cur, table_name)
+        row = await cur.fetchone()
+    return row, version
+
+
+async def run_write(request: Request, table_name: str, sql: str, params: List[Any], require_row: bool) -> Dict[str, Any]:
+    """
+    단건 쓰기 실행: (관리 테이블이면) 사용자 조회 + 쓰기 + 변경 알림을 한 연결에서 파이프라인으로 한 번에 전송.
+    admin이 아니거나 require_row인데 대상 행이 없으면 예외로 트랜잭션을 롤백한다 (알림도 전달되지 않음).
+    커밋 후 로컬 버전을 바꿔 결과 캐시·ETag를 무효화한다.
+    """
+    async def run():
+        row, version = await execute_write(conn, sql, params, table_name)
+        if require_row and not row:
+            raise HTTPException(status_code=404, detail="Record not found")
+        # 시간별 FMS 통계면 같은 트랜잭션에서 해당 월 롤업 갱신
+        rollup = await refresh_month_rollups(conn, table_name, [row])
+        return row, version, rollup
+
+    async with guarded_connection(db_pool, GUARDS["write"]) as conn:
+        async with timed_pipeline(conn):
+            if table_name.upper() in ADMIN_ONLY_TABLES:
+                row, version, rollup = await run_with_admin_check(conn, request, run)
+            else:
+                row, version, rollup = await run()
+    set_table_version(table_name, version)
+    if rollup:
+        set_table_version(*rollup)
+    return row
+
+
+class _StreamConnection:
+    """스트림이 빌린 연결: 생성기 종료·응답 후 작업·오류 경로 중 먼저 도달한 쪽이 한 번만 반납"""
+
+    def __init__(self, pool: AsyncConnectionPool, conn) -> None:
+        self.pool = pool
+        self.conn = conn
+
+    async def release(self) -> None:
+        """서버 측 커서 트랜잭션을 롤백(읽기 전용)한 뒤 풀에 반납 (이미 반납했으면 무시)"""
+        conn, self.conn = self.conn, None
+        if conn is None:
+            return
+        try:
+            await conn.rollback()
+        except Exception:
+            pass  # 반납 시 풀이 상태를 다시 정리
+        finally:
+            await self.pool.putconn(conn)
+
+
+async def stream_db_array(sql: str, params: List[Any], stream_format: str, columnar: bool = False) -> StreamingResponse:
+    """
+    이름 있는 서버 측 커서로 DB_STREAM_BATCH_SIZE행씩 가져와 NDJSON 또는 JSON 배열로 스트리밍.
+    columnar면 컬럼 목록을 먼저 한 번 보내고 각 행은 값 배열로 보낸다
+    (ndjson: 첫 줄 {"columns": [...]}, json: {"columns": [...], "rows": [...]}).
+    쿼리 오류는 첫 바이트 전에 500(statement_timeout 초과는 504)으로 반환한다.
+    연결은 stream 레인에서 빌리고, 스트림 종료·클라이언트 끊김(생성기 finally) 또는 생성기가 시작되지 않은 채
+    응답이 끝난 경우(BackgroundTask) 중 먼저 도달한 쪽에서 반납한다.
+    """
+    guard = GUARDS["stream"]
+    pool = get_lane_pool("stream")
+    owner = _StreamConnection(pool, await get_guarded_connection(pool, guard))
+    conn = owner.conn
+    try:
+        cur = conn.cursor(name="get_db_array_stream", row_factory=None if columnar else lower_dict_row)
+        await cur.execute(sql, params)
+        first_batch = await cur.fetchmany(DB_STREAM_BATCH_SIZE)
+        columns = [d.name.lower() for d in (cur.description or [])]
+    except QueryCanceled:
+        await owner.release()
+        raise statement_timeout_error(guard) from None
+    except Exception:
+        await owner.release()
+        raise
+
+    header = json_dumps(columns)
+    if stream_format == "json":
+        opening, closing = (b'{"columns":' + header + b',"rows":[', b"]}") if columnar else (b"[", b"]")
+    else:
+        opening, closing = (b'{"columns":' + header + b'}\n' if columnar else b"", b"")
+
+    async def body_gen():
+        try:
+            batch = first_batch
+            first = True
+            if opening:
+                yield opening
+            while batch:
+                if stream_format == "json":
+                    chunk = b",".join(json_dumps(row) for row in batch)
+                    yield chunk if first else b"," + chunk
+                else:
+                    yield b"".join(json_dumps(row) + b"\n" for row in batch)
+                first = False
+                if len(batch) < DB_STREAM_BATCH_SIZE:
+                    break
+                batch = await cur.fetchmany(DB_STREAM_BATCH_SIZE)
+            if closing:
+                yield closing
+        finally:
+            await owner.release()
+
+    try:
+        return StreamingResponse(
+            body_gen(), media_type=STREAM_MEDIA_TYPES[stream_format], background=BackgroundTask(owner.release)
+        )
+    except BaseException:
+        await owner.release()
+        raise
+
+
+class BulkWriteRequest(BaseModel):
+    insert: List[Dict[str, Any]] = []  # 등록할 행 (POST body와 동일)
+    update: List[Dict[str, Any]] = []  # 수정할 행 (PUT body와 동일, 키 필드 포함)
+    delete: List[Any] = []  # 삭제할 키: 단일 키 값, "val1,val2" 또는 { 키필드: 값 } 객체
+
+
+BULK_OPERATIONS = ("insert", "update", "delete")
+
+
+async def build_bulk_statements(table_name: str, body: BulkWriteRequest, table_key: Union[str, List[str]],
+                                actual_by_lower: Dict[str, str]) -> Dict[str, List[tuple]]:
+    """
+    bulk 요청을 작업별 (sql, params) 목록으로 변환 (단건 POST/PUT/DELETE와 같은 문 생성 함수 사용).
+    검증 오류가 하나라도 있으면 실행 전에 행 위치와 함께 400으로 반환.
+    MGMT_USER 비밀번호 넌스는 모든 행이 검증된 뒤에만 소비한다 (검증 실패 시 넌스가 남아 재시도 가능).
+    """
+    statements: Dict[str, List[tuple]] = {op: [] for op in BULK_OPERATIONS}
+    errors = []
+    passwords = []  # (작업, 행 위치, 행, 비밀번호 키, 넌스)
+
+    def build_row(op: str, row: Dict[str, Any]) -> tuple:
+        if op == "insert":
+            apply_insert_defaults(table_name, row, actual_by_lower)
+            if not row:
+                raise HTTPException(status_code=400, detail="No fields to insert")
+            return build_insert_statement(table_name, row, actual_by_lower)
+        keys = extract_body_keys(table_key, row)
+        return build_update_statement(table_name, keys, row, actual_by_lower)
+
+    for op in ("insert", "update"):
+        for index, row in enumerate(getattr(body, op)):
+            try:
+                password = take_mgmt_user_password(row, table_name)
+                statements[op].append(build_row(op, row))
+                if password is not None:
+                    passwords.append((op, index, row) + password)
+            except HTTPException as e:
+                errors.append({"op": op, "index": index, "error": e.detail})
+    for index, key in enumerate(body.delete):
+        try:
+            if isinstance(key, dict):
+                keys = extract_body_keys(table_key, key)
+            else:
+                keys = extract_query_keys(table_key, {"key": str(key)})
+            statements["delete"].append(build_delete_statement(table_name, keys, actual_by_lower))
+        except HTTPException as e:
+            errors.append({"op": "delete", "index": index, "error": e.detail})
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+    # 검증이 끝난 뒤 넌스 소비 + 해시, 해시된 값으로 해당 행의 문을 다시 생성
+    for op, index, row, pw_key, nonce in passwords:
+        try:
+            await hash_mgmt_user_password(row, pw_key, nonce)
+        except HTTPException as e:
+            if e.status_code != 400:
+                raise  # bcrypt 대기열 초과(503) 등은 그대로
+            errors.append({"op": op, "index": index, "error": e.detail})
+            continue
+        statements[op][index] = build_row(op, row)
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+    return statements
+
+
+async def execute_bulk_statements(cur, statements: List[tuple]) -> List[Optional[Dict[str, Any]]]:
+    """
+    같은 SQL 문끼리 묶어 executemany(returning=True)로 실행 (psycopg가 파이프라인 모드로 전송).
+    입력 순서대로 RETURNING 행(없으면 None) 목록 반환.
+    """
+    groups: Dict[str, List[int]] = {}
+    for index, (sql, _) in enumerate(statements):
+        groups.setdefault(sql, []).append(index)
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(statements)
+    for sql, indexes in groups.items():
+        await cur.executemany(sql, [statements[i][1] for i in indexes], returning=True)
+        for i in indexes:
+            rows[i] = await cur.fetchone()
+            cur.nextset()
+    return rows
 
 
 def register_database_routes(app):
@@ -271,7 +1020,10 @@ def register_database_routes(app):
         """
         PHP get-db-array.php와 동일한 기능
         POST /get-db-array
-        Body: { target: "/TABLE_NAME/", layout: [...], query: [], where: "", order: "" }
+        Body: { target: "/TABLE_NAME/", layout: [...], query: [], where: "", order: "", limit?, after?, stream? }
+        order 미지정 시 PRIMARY KEY 순 키셋 페이지네이션: 다음 페이지가 있으면 X-Next-Cursor 헤더 반환
+        stream="ndjson"|"json" 이면 서버 측 커서 기반 StreamingResponse
+        format="columnar" 이면 { columns: [...], rows: [[...], ...] }
         """
         try:
             # 테이블 이름 추출 (앞뒤 '/' 제거)
@@ -280,86 +1032,88 @@ def register_database_routes(app):
             # 테이블 존재 확인
             if not await is_table_exists(table):
                 raise HTTPException(status_code=404, detail=f"Table {table} not found")
-            if table.upper() in ADMIN_ONLY_TABLES:
-                user_row = await get_current_user_from_request(req)
-                group_name = ((user_row.get("group_name") or user_row.get("GROUP_NAME")) or "").strip().lower() if user_row else ""
-                if group_name != "admin":
-                    raise HTTPException(status_code=403, detail="Admin role required for this resource")
+            admin_only = table.upper() in ADMIN_ONLY_TABLES
+            if admin_only:
+                await check_admin_session(req)
             
-            # 필드 목록 생성
-            fields = get_field_list(body.layout)
+            plan = await plan_db_array_read(table, body)
+            if body.stream:
+                # 스트리밍은 연결을 오래 점유하므로 권한을 먼저 확인
+                if admin_only:
+                    await require_admin_user(req)
+                return await stream_db_array(plan.sql, plan.params, body.stream, plan.columnar)
             
-            # WHERE 절 생성
-            if body.where:
-                condition = body.where
-            else:
-                # query를 처리하여 WHERE 절 생성
-                # IN 절 처리: 같은 키에 대해 여러 값이 있으면 IN 절로 변환
-                # 예: [{cctv_id: '1'}, {cctv_id: '2'}] -> cctv_id IN ('1', '2')
-                key_values: Dict[str, List[Any]] = {}
-                
-                if isinstance(body.query, list):
-                    # 리스트인 경우: 각 항목에서 키-값 쌍 추출
-                    for item in body.query:
-                        if isinstance(item, dict):
-                            for key, val in item.items():
-                                if key not in ["dojo_preventCache", "SQL_ORDER"]:
-                                    if key not in key_values:
-                                        key_values[key] = []
-                                    if val not in key_values[key]:
-                                        key_values[key].append(val)
-                elif isinstance(body.query, dict):
-                    # 딕셔너리인 경우: 기존 방식 사용
-                    for key, val in body.query.items():
-                        if key not in ["dojo_preventCache", "SQL_ORDER"]:
-                            if key not in key_values:
-                                key_values[key] = []
-                            if val not in key_values[key]:
-                                key_values[key].append(val)
-                
-                # 조건 생성
-                conditions = []
-                for key, values in key_values.items():
-                    if len(values) > 1:
-                        # 여러 값이면 IN 절 생성 (SQL Injection 방지: var_value 사용)
-                        quoted_values = [var_value(val) for val in values]
-                        conditions.append(f'{var_name(key)} IN ({", ".join(quoted_values)})')
-                    elif len(values) == 1:
-                        # 단일 값은 등호 조건 사용
-                        conditions.append(f'{var_name(key)} = {var_value(values[0])}')
-                
-                condition = " AND ".join(conditions) if conditions else "1=1"
-            
-            # ORDER BY 절
-            order_clause = ""
-            if body.order:
-                order_clause = f" ORDER BY {get_quoted_order(body.order)}"
-            
-            # SQL 생성
-            where_clause = f" WHERE {condition}" if condition and condition != "1=1" else ""
-            sql = f'SELECT {fields} FROM {format_table_name(table)}{where_clause}{order_clause}'
-            
-            # 쿼리 실행
-            async with db_pool.connection() as conn:
-                async with conn.cursor(row_factory=dict_row) as cur:
-                    await cur.execute(sql)
-                    rows = await cur.fetchall()
-                    
-                    # 결과를 딕셔너리 리스트로 변환 (필드명 소문자로)
-                    result = []
-                    for row in rows:
-                        row_dict = {}
-                        for key, value in row.items():
-                            row_dict[key.lower()] = value
-                        result.append(row_dict)
-                    
-                    return result
+            etag = make_etag(table, plan.cache_key) if plan.cache_key else None
+            if etag and etag_matches(req.headers.get("if-none-match"), etag):
+                if admin_only:
+                    await require_admin_user(req)
+                return not_modified_response(req, etag)
+            # 관리 테이블은 권한 확인을 SELECT와 함께 파이프라인으로
+            payload, next_cursor, truncated = await execute_db_array_read(plan, req if admin_only else None)
+            response = FastJSONResponse(payload)
+            set_page_headers(response, next_cursor, truncated)
+            set_etag_headers(response, etag)
+            return response
                 
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
+    @app.post("/api/get-db-array/batch")
+    @app.post("/get-db-array/batch")
+    async def get_db_array_batch(body: GetDbArrayBatchRequest, req: Request):
+        """
+        여러 get-db-array 조회를 한 요청으로 처리 (화면 첫 로딩 시 스토어별 요청을 1회 왕복으로)
+        POST /get-db-array/batch
+        Body: { requests: [{ key?, target, layout, query, where, order, limit?, after?, format?, if_none_match? }, ...] }
+        응답: { results: { key: { status: 200, data, next_cursor, truncated, etag } | { status: 304, etag }
+                              | { status: 4xx/5xx, detail } } }
+        항목은 DB_BATCH_CONCURRENCY개씩 동시에 풀 연결로 실행하고, 권한 확인(사용자 조회)은 요청당 1회.
+        stream은 지원하지 않는다.
+        """
+        if len(body.requests) > DB_BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Too many requests in batch (max {DB_BATCH_MAX_ITEMS})")
+        keys = [item.key or item.target.strip('/') for item in body.requests]
+        if len(set(keys)) != len(keys):
+            raise HTTPException(status_code=400, detail="Duplicate batch keys (set key for repeated tables)")
+
+        is_admin: Optional[bool] = None
+        admin_lock = asyncio.Lock()
+
+        async def check_admin() -> bool:
+            nonlocal is_admin
+            async with admin_lock:
+                if is_admin is None:
+                    is_admin = is_admin_user(await get_current_user_from_request(req))
+            return is_admin
+
+        semaphore = asyncio.Semaphore(max(1, DB_BATCH_CONCURRENCY))
+
+        async def run_item(item: GetDbArrayBatchItem) -> Dict[str, Any]:
+            try:
+                table = item.target.strip('/')
+                if not await is_table_exists(table):
+                    raise HTTPException(status_code=404, detail=f"Table {table} not found")
+                if table.upper() in ADMIN_ONLY_TABLES and not await check_admin():
+                    raise HTTPException(status_code=403, detail="Admin role required for this resource")
+                if item.stream:
+                    raise HTTPException(status_code=400, detail="stream is not supported in batch")
+                plan = await plan_db_array_read(table, item)
+                etag = make_etag(table, plan.cache_key) if plan.cache_key else None
+                if etag and etag_matches(item.if_none_match, etag):
+                    return {"status": 304, "etag": etag}
+                async with semaphore:
+                    payload, next_cursor, truncated = await execute_db_array_read(plan)
+                return {"status": 200, "data": payload, "next_cursor": next_cursor, "truncated": truncated, "etag": etag}
+            except HTTPException as e:
+                return {"status": e.status_code, "detail": e.detail}
+            except Exception as e:
+                return {"status": 500, "detail": str(e)}
+
+        results = await asyncio.gather(*(run_item(item) for item in body.requests))
+        return FastJSONResponse({"results": dict(zip(keys, results))})
+
     # rest-access-page.php 기능 (프론트가 /api/rest-access-page 호출 시 대응)
     @app.get("/api/rest-access-page/{table_name}")
     @app.get("/rest-access-page/{table_name}")
@@ -367,40 +1121,69 @@ def register_database_routes(app):
         """
         PHP rest-access-page.php GET 기능
         GET /rest-access-page/{table_name}?param1=value1&param2=value2
+        SQL_LIMIT(페이지 크기), SQL_AFTER(이전 응답의 X-Next-Cursor)로 키셋 페이지네이션.
+        둘 다 없으면 정렬을 강제하지 않고 결과가 DB_ROWS_DEFAULT_LIMIT행을 넘으면 413
+        SQL_FORMAT=columnar 이면 { columns, rows } 형식
         """
         try:
             if not await is_table_exists(table_name):
                 raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
-            if table_name.upper() in ADMIN_ONLY_TABLES:
-                user_row = await get_current_user_from_request(request)
-                group_name = ((user_row.get("group_name") or user_row.get("GROUP_NAME")) or "").strip().lower() if user_row else ""
-                if group_name != "admin":
-                    raise HTTPException(status_code=403, detail="Admin role required for this resource")
+            admin_only = table_name.upper() in ADMIN_ONLY_TABLES
+            if admin_only:
+                await check_admin_session(request)
             # 쿼리 파라미터를 Dict로 변환
             query_params = dict(request.query_params)
-            order = get_quoted_order(query_params.pop("SQL_ORDER", ""))
+            raw_order = query_params.pop("SQL_ORDER", "")
+            order = escape_raw_sql(get_quoted_order(raw_order))
+            raw_limit = query_params.pop("SQL_LIMIT", None)
+            after = query_params.pop("SQL_AFTER", None)
+            columnar = validate_format(query_params.pop("SQL_FORMAT", None))
+            try:
+                row_limit = resolve_row_limit(int(raw_limit) if raw_limit else None)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="SQL_LIMIT must be a positive integer")
+            paged = bool(raw_limit) or bool(after)
+            key_columns = None if order or not paged else await get_keyset_columns(table_name)
+            if after and not key_columns:
+                raise HTTPException(status_code=400, detail="SQL_AFTER requires key order (omit SQL_ORDER)")
             
             # WHERE 절 생성
-            condition = get_conditions(table_name, query_params, len(query_params))
+            condition, params = get_conditions_params(query_params)
             
-            # SQL 생성
+            # SQL 생성 (페이지 요청이고 사용자 정렬이 없으면 키 순, 다음 페이지·상한 초과 확인용으로 1행 더 조회)
             order_clause = f" ORDER BY {order}" if order else ""
-            sql = f'SELECT * FROM {format_table_name(table_name)} WHERE {condition}{order_clause}'
+            if key_columns:
+                keyset_condition, keyset_params, order_clause = build_keyset_clause(key_columns, after)
+                if keyset_condition:
+                    condition = f"{condition} AND {keyset_condition}"
+                    params = params + keyset_params
+            sql = f'SELECT * FROM {format_table_name(table_name)} WHERE {condition}{order_clause} LIMIT %s'
+            params = params + [row_limit + 1]
             
-            # 쿼리 실행
-            async with db_pool.connection() as conn:
-                async with conn.cursor(row_factory=dict_row) as cur:
-                    await cur.execute(sql)
-                    rows = await cur.fetchall()
-                    
-                    result = []
-                    for row in rows:
-                        row_dict = {}
-                        for key, value in row.items():
-                            row_dict[key.lower()] = value
-                        result.append(row_dict)
-                    
-                    return result
+            # 쿼리 실행 (참조 테이블은 결과 캐시 사용, 관리 테이블은 권한 확인을 SELECT와 함께 파이프라인으로)
+            async def load():
+                start = time.perf_counter()
+                result = await run_page_query(
+                    sql, params, None if raw_order.startswith('$') else True, row_limit, key_columns, columnar,
+                    request if admin_only else None, paged=paged
+                )
+                observe_query(table_name, sql, (time.perf_counter() - start) * 1000)
+                return result
+
+            cache_key = make_cache_key(table_name, sql, params, columnar)
+            etag = make_etag(table_name, cache_key)
+            if etag and etag_matches(request.headers.get("if-none-match"), etag):
+                if admin_only:
+                    await require_admin_user(request)
+                return not_modified_response(request, etag)
+            if admin_only:
+                payload, next_cursor, truncated = await load()
+            else:
+                payload, next_cursor, truncated = await cached_result(table_name, cache_key, load)
+            response = FastJSONResponse(payload)
+            set_page_headers(response, next_cursor, truncated)
+            set_etag_headers(response, etag)
+            return response
                 
         except HTTPException:
             raise
@@ -418,45 +1201,23 @@ def register_database_routes(app):
         try:
             if not await is_table_exists(table_name):
                 raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+            # 권한 확인은 쓰기와 함께 파이프라인으로 (쿠키가 없으면 바로 403)
             if table_name.upper() in ADMIN_ONLY_TABLES:
-                user_row = await get_current_user_from_request(request)
-                group_name = ((user_row.get("group_name") or user_row.get("GROUP_NAME")) or "").strip().lower() if user_row else ""
-                if group_name != "admin":
-                    raise HTTPException(status_code=403, detail="Admin role required for this resource")
+                await check_admin_session(request)
             
             body = await request.json()
-            process_mgmt_user_password_body(body, table_name)
+            await process_mgmt_user_password_body(body, table_name)
 
             # DB 실제 컬럼명 사용 (PostgreSQL은 따옴표 없이 생성 시 소문자)
             actual_columns = await get_actual_column_names(table_name)
             actual_by_lower = {c.lower(): c for c in actual_columns} if actual_columns else {}
-            # MGMT_TRANS / MGMT_PHYSICAL_SERVER 등록 시 reg_date 컬럼이 있고 값이 없으면 현재시간(timestamp) 설정
-            if str(table_name).upper() in ("MGMT_TRANS", "MGMT_PHYSICAL_SERVER") and "reg_date" in actual_by_lower:
-                if not any(k for k in body.keys() if str(k).lower() == "reg_date"):
-                    from datetime import datetime
-                    body["reg_date"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            keys = []
-            values = []
-            for key, val in body.items():
-                key_lower = str(key).lower()
-                actual = actual_by_lower.get(key_lower, key_lower)
-                keys.append(var_name(actual))
-                values.append(var_value(val))
-            
-            sql = f'INSERT INTO {format_table_name(table_name)} ({", ".join(keys)}) VALUES ({", ".join(values)}) RETURNING *'
+            apply_insert_defaults(table_name, body, actual_by_lower)
+
+            sql, params = build_insert_statement(table_name, body, actual_by_lower)
             
             # 쿼리 실행
-            async with db_pool.connection() as conn:
-                async with conn.cursor(row_factory=dict_row) as cur:
-                    await cur.execute(sql)
-                    row = await cur.fetchone()
-                    
-                    result = {}
-                    for key, value in row.items():
-                        result[key.lower()] = value
-                    
-                    return result
+            row = await run_write(request, table_name, sql, params, require_row=False)
+            return FastJSONResponse(row)
                 
         except HTTPException:
             raise
@@ -474,82 +1235,24 @@ def register_database_routes(app):
         try:
             if not await is_table_exists(table_name):
                 raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+            # 권한 확인은 쓰기와 함께 파이프라인으로 (쿠키가 없으면 바로 403)
             if table_name.upper() in ADMIN_ONLY_TABLES:
-                user_row = await get_current_user_from_request(request)
-                group_name = ((user_row.get("group_name") or user_row.get("GROUP_NAME")) or "").strip().lower() if user_row else ""
-                if group_name != "admin":
-                    raise HTTPException(status_code=403, detail="Admin role required for this resource")
+                await check_admin_session(request)
             body = await request.json()
-            process_mgmt_user_password_body(body, table_name)
+            await process_mgmt_user_password_body(body, table_name)
 
-            table_key = await get_table_key(table_name)
             # MGMT_CODE: 수정 시 그룹구분+코드 2개만 키로 사용 (그룹 코드 수정 가능)
-            if table_name and str(table_name).upper() == "MGMT_CODE":
-                table_key = ["GRP_GBN", "CODE"]
-            # body 키를 소문자로 정규화하여 조회 (클라이언트가 grp_code 등 소문자로 보낼 수 있음)
-            body_lower = {str(k).lower(): k for k in body.keys()}
-            
-            # 키 필드 추출 (대소문자 무시)
-            if isinstance(table_key, list):
-                # 복합 키
-                keys = {}
-                for key_field in table_key:
-                    key_lower = key_field.lower()
-                    if key_lower not in body_lower:
-                        raise HTTPException(status_code=400, detail=f"Key field {key_field} not found")
-                    actual_key = body_lower[key_lower]
-                    keys[key_field] = body[actual_key]
-            else:
-                # 단일 키
-                key_lower = table_key.lower()
-                if key_lower not in body_lower:
-                    raise HTTPException(status_code=400, detail=f"Key field {table_key} not found")
-                actual_key = body_lower[key_lower]
-                keys = {table_key: body[actual_key]}
-            
-            # 업데이트할 필드 추출 (키 필드 제외, 키는 대소문자 무시로 비교)
-            key_lowers = {k.lower() for k in keys.keys()}
-            update_fields = {k: v for k, v in body.items() if k.lower() not in key_lowers}
-            
-            if not update_fields:
-                raise HTTPException(status_code=400, detail="No fields to update")
+            table_key = resolve_write_key(table_name, await get_table_key(table_name))
+            keys = extract_body_keys(table_key, body)
             
             # DB에 저장된 실제 컬럼명 사용 (소문자 테이블은 컬럼도 소문자일 수 있음)
             actual_columns = await get_actual_column_names(table_name)
             actual_by_lower = {c.lower(): c for c in actual_columns} if actual_columns else {}
+            sql, params = build_update_statement(table_name, keys, body, actual_by_lower)
             
-            def quoted_actual(key: str) -> str:
-                # 조회된 컬럼이 없으면 소문자 사용(PostgreSQL 기본). 따옴표 없이 생성된 컬럼은 소문자
-                actual = actual_by_lower.get(key.lower(), key.lower())
-                return f'"{actual.lower()}"'
-            
-            set_parts = [f'{quoted_actual(k)} = {var_value(v)}' for k, v in update_fields.items()]
-            # MGMT_CODE 2키: CHAR/공백 패딩 시 매칭되도록 TRIM 비교
-            if table_name and str(table_name).upper() == "MGMT_CODE":
-                where_parts = [
-                    f"TRIM(CAST({quoted_actual(k)} AS TEXT)) = TRIM(CAST({var_value(str(v).strip() if v is not None else '')} AS TEXT))"
-                    for k, v in keys.items()
-                ]
-            else:
-                where_parts = [f'{quoted_actual(k)} = {var_value(v)}' for k, v in keys.items()]
-            set_clause = ", ".join(set_parts)
-            where_clause = " AND ".join(where_parts)
-            sql = f'UPDATE {format_table_name(table_name)} SET {set_clause} WHERE {where_clause} RETURNING *'
-            
-            # 쿼리 실행
-            async with db_pool.connection() as conn:
-                async with conn.cursor(row_factory=dict_row) as cur:
-                    await cur.execute(sql)
-                    row = await cur.fetchone()
-                    
-                    if not row:
-                        raise HTTPException(status_code=404, detail="Record not found")
-                    
-                    result = {}
-                    for key, value in row.items():
-                        result[key.lower()] = value
-                    
-                    return result
+            # 쿼리 실행 (대상 행이 없으면 404)
+            row = await run_write(request, table_name, sql, params, require_row=True)
+            return FastJSONResponse(row)
                 
         except HTTPException:
             raise
@@ -567,79 +1270,88 @@ def register_database_routes(app):
         try:
             if not await is_table_exists(table_name):
                 raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+            # 권한 확인은 쓰기와 함께 파이프라인으로 (쿠키가 없으면 바로 403)
             if table_name.upper() in ADMIN_ONLY_TABLES:
-                user_row = await get_current_user_from_request(request)
-                group_name = ((user_row.get("group_name") or user_row.get("GROUP_NAME")) or "").strip().lower() if user_row else ""
-                if group_name != "admin":
-                    raise HTTPException(status_code=403, detail="Admin role required for this resource")
-            table_key = await get_table_key(table_name)
+                await check_admin_session(request)
             # MGMT_CODE: 삭제 시 그룹구분+코드 2개만 키로 사용
-            if table_name and str(table_name).upper() == "MGMT_CODE":
-                table_key = ["GRP_GBN", "CODE"]
-            query_params = dict(request.query_params)
-            # 쿼리 키 대소문자 무시 조회용 (일부 프록시/서버가 키를 정규화할 수 있음)
-            query_lower = {k.lower(): k for k in query_params.keys()}
-            
-            # 키 파라미터 처리
-            if isinstance(table_key, list):
-                # 복합 키: GRP_GBN=...&CODE=... 형식 또는 key=val1,val2 형식
-                keys = {}
-                if all(qk in query_lower for qk in [k.lower() for k in table_key]):
-                    for key_field in table_key:
-                        actual = query_lower.get(key_field.lower())
-                        if actual is not None:
-                            keys[key_field] = query_params[actual]
-                elif all(k in query_params for k in table_key):
-                    for key_field in table_key:
-                        keys[key_field] = query_params[key_field]
-                else:
-                    key_param_name = query_lower.get("key")
-                    key_val = query_params[key_param_name] if key_param_name else None
-                    if key_val is not None:
-                        parts = [p.strip() for p in key_val.split(",")]
-                        if len(parts) != len(table_key):
-                            raise HTTPException(status_code=400, detail=f"Key must have {len(table_key)} comma-separated values")
-                        for i, key_field in enumerate(table_key):
-                            keys[key_field] = parts[i]
-                    else:
-                        raise HTTPException(status_code=400, detail=f"Key field {table_key[0]} not found in query parameters")
-            else:
-                # 단일 키
-                key_param_name = query_lower.get("key")
-                if key_param_name is None:
-                    raise HTTPException(status_code=400, detail="Key parameter not found")
-                keys = {table_key: query_params[key_param_name]}
+            table_key = resolve_write_key(table_name, await get_table_key(table_name))
+            # 복합 키: GRP_GBN=...&CODE=... 형식 또는 key=val1,val2 형식
+            keys = extract_query_keys(table_key, dict(request.query_params))
             
             # DELETE 쿼리 생성 (실제 컬럼명 사용, PostgreSQL은 따옴표 없이 생성된 컬럼은 소문자)
             actual_columns = await get_actual_column_names(table_name)
             actual_by_lower = {c.lower(): c for c in actual_columns} if actual_columns else {}
-            def quoted_actual(key: str) -> str:
-                actual = actual_by_lower.get(key.lower(), key.lower())
-                return f'"{actual.lower()}"'
-            where_parts = [f'{quoted_actual(k)} = {var_value(v)}' for k, v in keys.items()]
-            where_clause = " AND ".join(where_parts)
-            sql = f'DELETE FROM {format_table_name(table_name)} WHERE {where_clause} RETURNING *'
+            sql, params = build_delete_statement(table_name, keys, actual_by_lower)
             
-            # 쿼리 실행
-            async with db_pool.connection() as conn:
-                async with conn.cursor(row_factory=dict_row) as cur:
-                    await cur.execute(sql)
-                    row = await cur.fetchone()
-                    
-                    if not row:
-                        raise HTTPException(status_code=404, detail="Record not found")
-                    
-                    result = {}
-                    for key, value in row.items():
-                        result[key.lower()] = value
-                    
-                    return result
+            # 쿼리 실행 (대상 행이 없으면 404)
+            row = await run_write(request, table_name, sql, params, require_row=True)
+            return FastJSONResponse(row)
                 
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
     
+    @app.post("/api/rest-access-page/{table_name}/bulk")
+    @app.post("/rest-access-page/{table_name}/bulk")
+    async def rest_access_bulk(table_name: str, body: BulkWriteRequest, request: Request):
+        """
+        여러 행 등록/수정/삭제를 한 트랜잭션으로 처리
+        POST /rest-access-page/{table_name}/bulk
+        Body: { insert: [{...}], update: [{키필드, ...}], delete: [키 값 또는 {키필드: 값}] }
+        실행 순서는 insert -> update -> delete. 수정/삭제 대상이 없는 행은 ok=false로 표시하고,
+        DB 오류가 나면 전체를 롤백한다.
+        """
+        try:
+            if not await is_table_exists(table_name):
+                raise HTTPException(status_code=404, detail=f"Table {table_name} not found")
+            if table_name.upper() in ADMIN_ONLY_TABLES:
+                await require_admin_user(request)
+            total = len(body.insert) + len(body.update) + len(body.delete)
+            if total > BULK_MAX_ROWS:
+                raise HTTPException(status_code=413, detail=f"Too many rows (max {BULK_MAX_ROWS})")
+
+            # 키는 insert만 있는 요청이면 조회하지 않음 (MGMT_CODE는 그룹구분+코드 2개)
+            table_key = resolve_write_key(table_name, await get_table_key(table_name)) if body.update or body.delete else None
+            actual_columns = await get_actual_column_names(table_name)
+            actual_by_lower = {c.lower(): c for c in actual_columns} if actual_columns else {}
+            statements = await build_bulk_statements(table_name, body, table_key, actual_by_lower)
+
+            results: Dict[str, List[Dict[str, Any]]] = {}
+            version = None
+            rollup = None
+            async with guarded_connection(db_pool, GUARDS["bulk"]) as conn:
+                async with conn.transaction():
+                    async with conn.cursor(row_factory=lower_dict_row) as cur:
+                        for op in BULK_OPERATIONS:
+                            rows = await execute_bulk_statements(cur, statements[op]) if statements[op] else []
+                            results[op] = [
+                                {"ok": True, "row": row} if row else {"ok": False, "error": "Record not found"}
+                                for row in rows
+                            ]
+                        if any(r["ok"] for op_results in results.values() for r in op_results):
+                            version = await notify_table_change(cur, table_name)
+                            rollup = await refresh_month_rollups(
+                                conn, table_name,
+                                (r["row"] for op_results in results.values() for r in op_results if r["ok"]),
+                            )
+            if version:
+                set_table_version(table_name, version)
+            if rollup:
+                set_table_version(*rollup)
+
+            return FastJSONResponse({
+                "inserted": sum(1 for r in results["insert"] if r["ok"]),
+                "updated": sum(1 for r in results["update"] if r["ok"]),
+                "deleted": sum(1 for r in results["delete"] if r["ok"]),
+                "results": results,
+            })
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     @app.get("/health")
     async def health_check():
         """헬스 체크"""
@@ -666,45 +1378,45 @@ def register_database_routes(app):
             for name, schema in TABLES.items()
         ]
         
-        # DB의 모든 테이블 조회
-        db_tables = []
-        try:
-            async with db_pool.connection() as conn:
-                async with conn.cursor() as cur:
-                    await cur.execute("""
-                        SELECT table_name
-                        FROM information_schema.tables
-                        WHERE table_schema = 'public'
-                        AND table_type = 'BASE TABLE'
-                        ORDER BY table_name
-                    """)
-                    rows = await cur.fetchall()
-                    
-                    for row in rows:
-                        table_name_db = row[0]
-                        # tables.py에 없는 테이블만 추가
-                        if not is_table_exists_in_schema(table_name_db):
-                            try:
-                                key = await get_table_key(table_name_db)
-                                db_tables.append({
-                                    "name": table_name_db,
-                                    "key": key,
-                                    "comment": "",
-                                    "field_count": 0,
-                                    "source": "database"
-                                })
-                            except Exception:
-                                # PRIMARY KEY가 없거나 조회 실패한 경우
-                                db_tables.append({
-                                    "name": table_name_db,
-                                    "key": None,
-                                    "comment": "",
-                                    "field_count": 0,
-                                    "source": "database"
-                                })
-        except Exception as e:
-            pass  # DB 조회 실패 시 무시
+        # DB의 모든 테이블 (스키마 캐시 사용, 테이블별 PK 조회 없음)
+        await ensure_schema_cache()
+        db_tables = [
+            {
+                "name": meta.name,
+                "key": meta.key,
+                "comment": "",
+                "field_count": 0,
+                "source": "database"
+            }
+            for meta in get_all_table_meta()
+            # tables.py에 없는 테이블만 추가
+            if meta.source == "database" and not is_table_exists_in_schema(meta.name)
+        ]
         
         return {
             "tables": schema_tables + db_tables
         }
+
+    @app.get("/api/admin/schema-cache", dependencies=[Depends(require_admin_user)])
+    async def schema_cache_status():
+        """스키마 메타데이터 캐시 상태 (관리자 전용)"""
+        return get_schema_cache_status()
+
+    @app.get("/api/admin/result-cache", dependencies=[Depends(require_admin_user)])
+    async def result_cache_status():
+        """참조 테이블 결과 캐시 상태 (관리자 전용)"""
+        return get_result_cache_status()
+
+    @app.get("/api/admin/db-pools", dependencies=[Depends(require_admin_user)])
+    async def db_pool_status():
+        """레인별 연결 풀 설정·통계 (관리자 전용)"""
+        return get_pool_stats()
+
+    @app.post("/api/admin/schema-cache/refresh", dependencies=[Depends(require_admin_user)])
+    async def schema_cache_refresh():
+        """스키마 메타데이터 캐시 즉시 재적재 (테이블/컬럼 변경 직후 사용, 관리자 전용)"""
+        try:
+            await refresh_schema_cache()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return get_schema_cache_status()
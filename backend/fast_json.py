@@ -0,0 +1,71 @@
+"""
+빠른 JSON 직렬화: psycopg 반환 값(Decimal, date, datetime, inet 등)을 jsonable_encoder 없이 바로 인코딩.
+
+- orjson이 설치되어 있으면 사용하고, 없으면 표준 json + json_default로 동작한다.
+- 출력 형태는 FastAPI 기본 경로(jsonable_encoder + JSONResponse)와 동일하게 맞춘다.
+- lower_dict_row: 컬럼명을 소문자 키로 바로 만드는 psycopg row factory (행마다 키 재구성 불필요).
+"""
+import datetime as dt
+import decimal
+import json
+import uuid
+from typing import Any, Sequence
+
+from fastapi.responses import JSONResponse
+from psycopg.rows import no_result
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 표준 json 사용
+    orjson = None
+
+
+def json_default(value: Any) -> Any:
+    """기본 인코더가 처리하지 못하는 값을 FastAPI jsonable_encoder와 같은 형태로 변환"""
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, dt.timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode("utf-8", errors="replace")
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    # inet/cidr(ipaddress) 등 나머지는 문자열
+    return str(value)
+
+
+if orjson is not None:
+    # orjson은 datetime/date/time/UUID를 isoformat 문자열로 직접 처리, 나머지만 json_default 호출
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        """content -> UTF-8 JSON bytes"""
+        return orjson.dumps(content, default=json_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        """content -> UTF-8 JSON bytes"""
+        return json.dumps(
+            content, default=json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """jsonable_encoder를 거치지 않고 dumps로 바로 인코딩하는 JSON 응답"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def lower_dict_row(cursor: Any):
+    """psycopg row factory: 컬럼명을 소문자로 한 dict 행 (기존 key.lower() 재구성 루프 대체)"""
+    description = cursor.description
+    if description is None:
+        return no_result
+    names = [d.name.lower() for d in description]
+
+    def lower_dict_row_(values: Sequence[Any]) -> dict:
+        return dict(zip(names, values))
+
+    return lower_dict_row_
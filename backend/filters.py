@@ -0,0 +1,184 @@
+"""
+get-db-array 구조화 필터: 범위/IN/LIKE/IS NULL 조건과 정렬을 컬럼명 검증 후 바인딩 파라미터 SQL로 변환.
+
+필터 (filters, 조건은 AND로 결합):
+    {"field": "reg_date", "op": "between", "value": ["2024-01-01", "2024-01-31"]}
+    {"field": "hq_code", "op": "in", "value": ["01", "02"]}
+    {"field": "cctv_name", "op": "icontains", "value": "터널"}
+    {"or": [조건, ...]} / {"and": [조건, ...]}  (그룹 중첩)
+연산자: eq, ne, lt, lte, gt, gte, between, in, not_in, like, ilike, prefix, iprefix, contains, icontains, is_null
+    like / prefix / contains는 대소문자 구분(LIKE), ilike / iprefix / icontains는 구분 안 함(ILIKE).
+    prefix·contains 계열은 값의 %, _를 문자 그대로 비교한다.
+
+정렬 (sort): [{"field": "reg_date", "dir": "desc"}, "cctv_id", "-alive"]
+
+컬럼명은 스키마 캐시에서 DB에 있는 것으로 확인된 컬럼만 허용하며 (tables.py에만 있는 컬럼은 SQL 오류가 되므로 제외),
+알 수 없는 컬럼·연산자는 400.
+"""
+from typing import Any, Dict, List, Set, Tuple
+
+from fastapi import HTTPException
+
+from schema_cache import get_table_meta
+
+MAX_FILTER_CONDITIONS = 50
+MAX_FILTER_DEPTH = 4
+MAX_IN_VALUES = 1000
+
+_COMPARE_OPS = {
+    "eq": "=",
+    "ne": "<>",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+}
+
+
+# LIKE 계열 연산자 -> (SQL 연산자, 값 앞 와일드카드, 값 뒤 와일드카드). like/ilike는 값을 패턴 그대로 사용
+_LIKE_OPS: Dict[str, Tuple[str, str, str]] = {
+    "prefix": ("LIKE", "", "%"),
+    "iprefix": ("ILIKE", "", "%"),
+    "contains": ("LIKE", "%", "%"),
+    "icontains": ("ILIKE", "%", "%"),
+}
+
+
+def get_filterable_columns(table_name: str) -> Set[str]:
+    """필터·정렬에 사용할 수 있는 컬럼 (소문자): 스키마 캐시에서 DB에 있는 것으로 확인된 컬럼"""
+    meta = get_table_meta(table_name)
+    if meta is None or meta.source != "database":
+        return set()
+    return {c.lower() for c in meta.columns}
+
+
+def _bad_filter(detail: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Invalid filter: {detail}")
+
+
+def _column(field: Any, columns: Set[str]) -> str:
+    """검증된 컬럼 식별자 (따옴표, 소문자)"""
+    if not isinstance(field, str) or field.lower() not in columns:
+        raise _bad_filter(f"unknown column {field!r}")
+    return f'"{field.lower()}"'
+
+
+_SCALAR_TYPES = (str, int, float)
+
+
+def _scalar(op: str, value: Any, allow_null: bool = False) -> Any:
+    """비교 값은 문자열·숫자·불리언만 (객체·배열은 psycopg에서 500이 되므로 400)"""
+    if value is None and allow_null:
+        return value
+    if not isinstance(value, _SCALAR_TYPES):
+        raise _bad_filter(f"'{op}' value must be a string, number or boolean")
+    return value
+
+
+def _escape_like(value: str) -> str:
+    """LIKE 와일드카드(%, _)와 이스케이프 문자를 문자 그대로 비교하도록 이스케이프"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _compile_condition(cond: Any, columns: Set[str], params: List[Any], depth: int, count: List[int]) -> str:
+    if not isinstance(cond, dict):
+        raise _bad_filter("condition must be an object")
+    count[0] += 1
+    if count[0] > MAX_FILTER_CONDITIONS:
+        raise _bad_filter(f"too many conditions (max {MAX_FILTER_CONDITIONS})")
+
+    for group_op in ("and", "or"):
+        if group_op in cond:
+            if depth >= MAX_FILTER_DEPTH:
+                raise _bad_filter(f"groups nested too deep (max {MAX_FILTER_DEPTH})")
+            items = cond[group_op]
+            if not isinstance(items, list) or not items:
+                raise _bad_filter(f"'{group_op}' must be a non-empty list")
+            parts = [_compile_condition(c, columns, params, depth + 1, count) for c in items]
+            return "(" + f" {group_op.upper()} ".join(parts) + ")"
+
+    column = _column(cond.get("field"), columns)
+    op = str(cond.get("op") or "eq").lower()
+    value = cond.get("value")
+
+    if op in _COMPARE_OPS:
+        if value is None:
+            if op in ("eq", "ne"):
+                return f"{column} IS {'NOT ' if op == 'ne' else ''}NULL"
+            raise _bad_filter(f"'{op}' requires a value")
+        params.append(_scalar(op, value))
+        return f"{column} {_COMPARE_OPS[op]} %s"
+    if op == "between":
+        if not isinstance(value, list) or len(value) != 2:
+            raise _bad_filter("'between' requires [low, high]")
+        low, high = (_scalar(op, v, allow_null=True) for v in value)
+        parts = []
+        # 한쪽이 null이면 열린 구간
+        if low is not None:
+            parts.append(f"{column} >= %s")
+            params.append(low)
+        if high is not None:
+            parts.append(f"{column} <= %s")
+            params.append(high)
+        if not parts:
+            raise _bad_filter("'between' requires at least one bound")
+        return "(" + " AND ".join(parts) + ")"
+    if op in ("in", "not_in"):
+        if not isinstance(value, list) or not value:
+            raise _bad_filter(f"'{op}' requires a non-empty list")
+        if len(value) > MAX_IN_VALUES:
+            raise _bad_filter(f"'{op}' list too long (max {MAX_IN_VALUES})")
+        params.extend(_scalar(op, v) for v in value)
+        keyword = "NOT IN" if op == "not_in" else "IN"
+        return f'{column} {keyword} ({", ".join(["%s"] * len(value))})'
+    if op in ("like", "ilike") or op in _LIKE_OPS:
+        if not isinstance(value, str):
+            raise _bad_filter(f"'{op}' requires a string")
+        if op in _LIKE_OPS:
+            keyword, before, after = _LIKE_OPS[op]
+            params.append(before + _escape_like(value) + after)
+            return f"CAST({column} AS TEXT) {keyword} %s"
+        params.append(value)
+        return f"CAST({column} AS TEXT) {op.upper()} %s"
+    if op == "is_null":
+        if value is not None and not isinstance(value, bool):
+            raise _bad_filter("'is_null' value must be true, false or null")
+        return f"{column} IS {'' if value is None or value else 'NOT '}NULL"
+    raise _bad_filter(f"unknown operator {op!r}")
+
+
+def compile_filters(table_name: str, filters: List[Any]) -> Tuple[str, List[Any]]:
+    """필터 목록 → (AND로 결합한 WHERE 조건, 파라미터). 필터가 없으면 ("", [])"""
+    if not filters:
+        return "", []
+    if not isinstance(filters, list):
+        raise _bad_filter("filters must be a list")
+    columns = get_filterable_columns(table_name)
+    params: List[Any] = []
+    count = [0]
+    parts = [_compile_condition(cond, columns, params, 0, count) for cond in filters]
+    return " AND ".join(parts), params
+
+
+def compile_sort(table_name: str, sort: List[Any]) -> str:
+    """정렬 목록 → ORDER BY 뒤에 붙일 절 (없으면 "")"""
+    if not sort:
+        return ""
+    if not isinstance(sort, list):
+        raise _bad_filter("sort must be a list")
+    columns = get_filterable_columns(table_name)
+    parts = []
+    for item in sort:
+        if isinstance(item, str):
+            descending = item.startswith("-")
+            field = item[1:] if descending else item
+        elif isinstance(item, dict):
+            field = item.get("field")
+            direction = str(item.get("dir") or "asc").lower()
+            if direction not in ("asc", "desc"):
+                raise _bad_filter("sort dir must be 'asc' or 'desc'")
+            descending = direction == "desc"
+        else:
+            raise _bad_filter("sort item must be a string or object")
+        parts.append(f"{_column(field, columns)}{' DESC' if descending else ''}")
+    return ", ".join(parts)
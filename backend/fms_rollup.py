@@ -0,0 +1,218 @@
+"""
+미디어 서버 월간 롤업: 시간별 MGMT_FMS_HIT / MGMT_FMS_TRAFFIC에서 MGMT_FMS_HIT_MONTH / MGMT_FMS_TRAFFIC_MONTH를 유지.
+
+- migrations/005_fms_month_rollup_trigger.sql의 문장 트리거가 시간별 테이블의 모든 INSERT/UPDATE/DELETE에서
+  영향받은 (YYYY, MM, SVC, VOL) 월 행만 다시 계산해 upsert한다 (시간별 행이 모두 지워졌으면 월 행 삭제).
+  수집기가 DB에 직접 적재해도 같은 트랜잭션에서 반영되며, 쓰기 API는 트리거가 있으면 버전 토큰만 갱신한다.
+- 트리거가 아직 설치되지 않은 DB에서는 쓰기 API(rest-access-page POST/PUT/DELETE/bulk)가 같은 계산을 대신 수행한다.
+- 최초 구성 시나 트리거 설치 전 적재분은 backfill 명령으로 월 단위 재계산:
+    cd backend && python fms_rollup.py backfill [--from 2024-01] [--to 2024-12] [--table hit|traffic]
+  (범위 미지정 시 시간별 테이블에 있는 모든 월, --to만 주면 가장 이른 월부터. 월마다 별도 트랜잭션)
+
+집계 규칙: HIT/CONN/T_BYTE는 합계, MAX_TRAF는 최대, MIN_TRAF는 최소.
+"""
+import argparse
+import asyncio
+import datetime as dt
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fast_json import lower_dict_row
+from query_log import auxiliary_statements
+from result_cache import notify_table_change
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    source: str                        # 시간별 테이블
+    target: str                        # 월간 테이블
+    measures: Tuple[Tuple[str, str], ...]  # (컬럼, 집계 함수)
+
+
+# 시간별 테이블 -> 월간 롤업 정의
+ROLLUPS: Dict[str, RollupSpec] = {
+    "MGMT_FMS_HIT": RollupSpec(
+        source="MGMT_FMS_HIT",
+        target="MGMT_FMS_HIT_MONTH",
+        measures=(("hit", "SUM"), ("conn", "SUM")),
+    ),
+    "MGMT_FMS_TRAFFIC": RollupSpec(
+        source="MGMT_FMS_TRAFFIC",
+        target="MGMT_FMS_TRAFFIC_MONTH",
+        measures=(("t_byte", "SUM"), ("max_traf", "MAX"), ("min_traf", "MIN")),
+    ),
+}
+MONTH_KEY = ("yyyy", "mm", "svc", "vol")
+MonthKey = Tuple[str, str, str, str]
+
+# 롤업 트리거 설치 여부 (없으면 주기적으로 재확인)
+_TRIGGER_RECHECK_SEC = 300.0
+_trigger_state: Tuple[Optional[bool], float] = (None, 0.0)
+
+
+def get_rollup_spec(table_name: str) -> Optional[RollupSpec]:
+    """시간별 롤업 원본 테이블이면 롤업 정의, 아니면 None"""
+    return ROLLUPS.get(str(table_name).upper())
+
+
+def _table(name: str) -> str:
+    from database import format_table_name
+    return format_table_name(name)
+
+
+def build_rollup_upsert(spec: RollupSpec, key_filter: str) -> str:
+    """시간별 행을 월 단위로 집계해 월간 테이블에 upsert하는 SQL (key_filter: 시간별 테이블 WHERE 조건)"""
+    key_cols = ", ".join(f'"{c}"' for c in MONTH_KEY)
+    measure_cols = ", ".join(f'"{c}"' for c, _ in spec.measures)
+    aggregates = ", ".join(f'{fn}("{c}")' for c, fn in spec.measures)
+    updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c, _ in spec.measures)
+    return (
+        f"INSERT INTO {_table(spec.target)} ({key_cols}, {measure_cols}) "
+        f"SELECT {key_cols}, {aggregates} FROM {_table(spec.source)} WHERE {key_filter} "
+        f"GROUP BY {key_cols} "
+        f"ON CONFLICT ({key_cols}) DO UPDATE SET {updates}"
+    )
+
+
+def build_orphan_delete(spec: RollupSpec, key_filter: str) -> str:
+    """시간별 행이 하나도 남지 않은 월 행 삭제 SQL (key_filter: 월간 테이블 m 기준 WHERE 조건)"""
+    matches = " AND ".join(f'h."{c}" = m."{c}"' for c in MONTH_KEY)
+    return (
+        f"DELETE FROM {_table(spec.target)} m WHERE {key_filter} "
+        f"AND NOT EXISTS (SELECT 1 FROM {_table(spec.source)} h WHERE {matches})"
+    )
+
+
+_KEY_FILTER = " AND ".join(f'"{c}" = %s' for c in MONTH_KEY)
+_MONTH_KEY_FILTER = " AND ".join(f'm."{c}" = %s' for c in MONTH_KEY)
+_MONTH_FILTER = '"yyyy" = %s AND "mm" = %s'
+_MONTH_ONLY_FILTER = 'm."yyyy" = %s AND m."mm" = %s'
+
+
+def month_keys_from_rows(rows: Iterable[Optional[Dict[str, Any]]]) -> Set[MonthKey]:
+    """RETURNING 행(소문자 키)에서 영향받은 (YYYY, MM, SVC, VOL) 목록"""
+    keys: Set[MonthKey] = set()
+    for row in rows:
+        if not row:
+            continue
+        values = tuple(row.get(c) for c in MONTH_KEY)
+        if all(v is not None for v in values):
+            keys.add(values)  # type: ignore[arg-type]
+    return keys
+
+
+async def _has_rollup_trigger(conn) -> bool:
+    """vms_fms_month_refresh 트리거 함수 존재 여부 (마이그레이션 005 적용 확인)"""
+    global _trigger_state
+    exists, checked_at = _trigger_state
+    if exists or (exists is False and time.monotonic() - checked_at < _TRIGGER_RECHECK_SEC):
+        return bool(exists)
+    async with conn.cursor(row_factory=lower_dict_row) as cur:
+        await cur.execute("SELECT to_regprocedure('vms_fms_month_refresh()') IS NOT NULL AS found")
+        row = await cur.fetchone()
+    exists = bool(row and row.get("found"))
+    _trigger_state = (exists, time.monotonic())
+    return exists
+
+
+async def refresh_month_rollups(conn, table_name: str, rows: Iterable[Optional[Dict[str, Any]]]) -> Optional[Tuple[str, str]]:
+    """
+    쓰기 트랜잭션 안에서 호출: 변경된 시간별 행이 속한 월 행을 갱신하고 월간 테이블 버전을 받는다.
+    DB 트리거가 설치되어 있으면 계산은 트리거에 맡기고, 없으면 영향받은 월 행만 여기서 다시 계산한다.
+    롤업 대상이 아니거나 영향받은 행이 없으면 None, 아니면 (월간 테이블, 새 버전 토큰) —
+    커밋 후 set_table_version으로 결과 캐시·ETag를 무효화한다.
+    """
+    spec = get_rollup_spec(table_name)
+    if spec is None:
+        return None
+    keys = sorted(month_keys_from_rows(rows))
+    if not keys:
+        return None
+    # 호출부 쓰기 문 대신 느린 쿼리로 기록되지 않도록 보조 문으로 표시
+    with auxiliary_statements():
+        has_trigger = await _has_rollup_trigger(conn)
+        async with conn.cursor() as cur:
+            if not has_trigger:
+                await cur.executemany(build_rollup_upsert(spec, _KEY_FILTER), keys)
+                await cur.executemany(build_orphan_delete(spec, _MONTH_KEY_FILTER), keys)
+            version = await notify_table_change(cur, spec.target)
+    return spec.target, version
+
+
+async def backfill_month(conn, spec: RollupSpec, yyyy: str, mm: str) -> None:
+    """한 달치 월간 행 전체 재계산 (시간별 테이블 PRIMARY KEY의 YYYY, MM 접두사로 범위 조회)"""
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            await cur.execute(build_rollup_upsert(spec, _MONTH_FILTER), (yyyy, mm))
+            await cur.execute(build_orphan_delete(spec, _MONTH_ONLY_FILTER), (yyyy, mm))
+            await notify_table_change(cur, spec.target)
+
+
+async def list_source_months(conn, spec: RollupSpec) -> List[Tuple[str, str]]:
+    """시간별 테이블에 있는 (YYYY, MM) 목록"""
+    async with conn.cursor() as cur:
+        await cur.execute(f'SELECT DISTINCT "yyyy", "mm" FROM {_table(spec.source)} ORDER BY 1, 2')
+        return [(str(y).strip(), str(m).strip()) for y, m in await cur.fetchall()]
+
+
+def iter_months(start: str, end: str) -> List[Tuple[str, str]]:
+    """'YYYY-MM' 범위의 (YYYY, MM) 목록 (양 끝 포함)"""
+    first = dt.datetime.strptime(start, "%Y-%m")
+    last = dt.datetime.strptime(end, "%Y-%m")
+    months = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        months.append((f"{year:04d}", f"{month:02d}"))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+async def backfill(tables: List[str], start: Optional[str], end: Optional[str]) -> None:
+    import psycopg
+    from database import DATABASE_URL
+
+    if not DATABASE_URL:
+        raise SystemExit("DATABASE_URL is not set")
+    # autocommit: 월 목록 조회가 트랜잭션을 열어 두지 않게 해서 backfill_month의 conn.transaction()이
+    # 세이브포인트가 아닌 월별 실제 트랜잭션이 되도록 한다
+    async with await psycopg.AsyncConnection.connect(DATABASE_URL, autocommit=True) as conn:
+        for table in tables:
+            spec = ROLLUPS[table]
+            if start:
+                months = iter_months(start, end or dt.date.today().strftime("%Y-%m"))
+            else:
+                # --to만 주면 시간별 테이블의 가장 이른 월부터
+                last = dt.datetime.strptime(end, "%Y-%m").strftime("%Y-%m") if end else None
+                months = [
+                    (yyyy, mm) for yyyy, mm in await list_source_months(conn, spec)
+                    if last is None or f"{yyyy}-{mm}" <= last
+                ]
+            for yyyy, mm in months:
+                await backfill_month(conn, spec, yyyy, mm)
+                print(f"{spec.target} {yyyy}-{mm} done")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    bf = sub.add_parser("backfill", help="월간 롤업 테이블 재계산")
+    bf.add_argument("--from", dest="start", help="시작 월 (YYYY-MM, 기본: 시간별 테이블의 가장 이른 월)")
+    bf.add_argument("--to", dest="end", help="종료 월 (YYYY-MM, 기본: 이번 달)")
+    bf.add_argument("--table", choices=["hit", "traffic"], help="대상 (기본: 둘 다)")
+    args = parser.parse_args()
+
+    tables = {"hit": ["MGMT_FMS_HIT"], "traffic": ["MGMT_FMS_TRAFFIC"]}.get(args.table, list(ROLLUPS))
+    # Windows에서 SelectorEventLoop 사용 (psycopg 호환성)
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(backfill(tables, args.start, args.end))
+    except ValueError as e:
+        print(f"invalid month: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+인덱스 어드바이저: get-db-array / rest-access-page GET에서 실제로 들어온 조건·정렬 형태를 테이블별로 모아
+pg_indexes의 기존 인덱스와 비교해 CREATE INDEX 제안을 순위대로 보여 준다.
+
+- 형태(shape): 등호 조건 컬럼(=, IN, IS NULL), 범위 조건 컬럼(<, >, BETWEEN), ORDER BY 컬럼. 값은 보지 않는다.
+  생성된 SQL에서 추출하며 where 원문도 최대한 해석한다 (컬럼은 filters.get_filterable_columns로 검증).
+- 형태별 호출 수·평균/최대 지연(DB 조회 시간, 결과 캐시 적중 제외)을 보관 (INDEX_ADVISOR_MAX_SHAPES, 기본 2000개).
+- 제안 컬럼: 등호 컬럼 + 첫 범위 컬럼 (범위가 없으면 정렬 컬럼). 같은 선두 컬럼의 btree 인덱스가 있으면 제외.
+  총 지연 시간(호출 수 × 평균) 순, 추정 행 수가 INDEX_ADVISOR_MIN_ROWS(기본 1000) 미만인 테이블은 뒤로.
+- 적용: INDEX_ADVISOR_APPLY=1일 때만 POST /api/admin/index-advisor/apply 로 CREATE INDEX CONCURRENTLY 실행
+  (별도 autocommit 연결, 백그라운드, 실패 시 INVALID 인덱스 삭제).
+  파티션 테이블(이력 테이블)은 부모에 CONCURRENTLY를 쓸 수 없으므로 CREATE INDEX ON ONLY로 부모 인덱스를 만들고
+  파티션마다 CONCURRENTLY로 만든 뒤 ALTER INDEX ... ATTACH PARTITION (모두 붙으면 부모 인덱스가 유효해지고,
+  이후 생성되는 파티션에는 자동 생성). 실패하면 해당 파티션 인덱스만 삭제하고 다시 적용하면 이어서 진행한다.
+"""
+import asyncio
+import datetime as dt
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import Depends, HTTPException
+from pydantic import BaseModel
+
+from filters import get_filterable_columns
+
+logger = logging.getLogger("index_advisor")
+
+try:
+    INDEX_ADVISOR_MAX_SHAPES = int(os.getenv("INDEX_ADVISOR_MAX_SHAPES") or "2000")
+except (TypeError, ValueError):
+    INDEX_ADVISOR_MAX_SHAPES = 2000
+try:
+    INDEX_ADVISOR_MIN_CALLS = int(os.getenv("INDEX_ADVISOR_MIN_CALLS") or "3")
+except (TypeError, ValueError):
+    INDEX_ADVISOR_MIN_CALLS = 3
+try:
+    INDEX_ADVISOR_MIN_ROWS = int(os.getenv("INDEX_ADVISOR_MIN_ROWS") or "1000")
+except (TypeError, ValueError):
+    INDEX_ADVISOR_MIN_ROWS = 1000
+INDEX_ADVISOR_APPLY = (os.getenv("INDEX_ADVISOR_APPLY") or "").strip().lower() in ("1", "true", "yes")
+
+_PREDICATE_RE = re.compile(
+    r'(?:CAST\(\s*)?"?([A-Za-z_][A-Za-z0-9_]*)"?(?:\s+AS\s+\w+\))?\s*'
+    r"(<=|>=|<>|!=|=|<|>|\bNOT\s+IN\b|\bIN\b|\bNOT\s+I?LIKE\b|\bI?LIKE\b|\bBETWEEN\b|\bIS\b)",
+    re.IGNORECASE,
+)
+# 키셋 커서 조건 ("a", "b") > (%s, %s) — PRIMARY KEY라 제외
+_KEYSET_RE = re.compile(r"\(([^()]*)\)\s*>\s*\(([^()]*)\)")
+_ORDER_ITEM_RE = re.compile(r'^\s*"?([A-Za-z_][A-Za-z0-9_]*)"?\s*(ASC|DESC)?', re.IGNORECASE)
+_INDEXDEF_RE = re.compile(r"USING (\w+) \((.*)\)\s*(WHERE .*)?$", re.IGNORECASE | re.DOTALL)
+_EQ_OPS = {"=", "IN", "IS"}
+_RANGE_OPS = {"<", ">", "<=", ">=", "BETWEEN"}
+
+# (테이블, 등호 컬럼, 범위 컬럼, 정렬) -> 통계
+ShapeKey = Tuple[str, Tuple[str, ...], Tuple[str, ...], Tuple[Tuple[str, bool], ...]]
+
+
+@dataclass
+class ShapeStats:
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: Optional[str] = None
+
+
+@dataclass
+class ApplyJob:
+    name: str
+    sql: str
+    table: str = ""
+    columns: List[str] = field(default_factory=list)
+    partitioned: bool = False  # 파티션 테이블이면 파티션별 CONCURRENTLY + ATTACH
+    state: str = "running"
+    started: str = field(default_factory=lambda: dt.datetime.now().isoformat(timespec="seconds"))
+    finished: Optional[str] = None
+    error: Optional[str] = None
+
+
+_shapes: Dict[ShapeKey, ShapeStats] = {}
+_dropped_shapes = 0
+_jobs: Dict[str, ApplyJob] = {}
+_job_tasks: set = set()
+
+
+def _split_top_level(text: str) -> List[str]:
+    """괄호 밖 쉼표 기준 분리"""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def extract_shape(table: str, sql: str) -> Optional[ShapeKey]:
+    """SELECT 문에서 조건·정렬 형태 추출 (조건·정렬이 없으면 None)"""
+    upper = sql.upper()
+    where_at = upper.find(" WHERE ")
+    order_at = upper.rfind(" ORDER BY ")
+    limit_at = upper.rfind(" LIMIT ")
+    end = len(sql)
+    for pos in (order_at, limit_at):
+        if pos != -1:
+            end = min(end, pos)
+    columns = get_filterable_columns(table)
+
+    eq, rng = set(), set()
+    if where_at != -1:
+        where = _KEYSET_RE.sub(" ", sql[where_at + 7:end])
+        for name, op in _PREDICATE_RE.findall(where):
+            column = name.lower()
+            op = " ".join(op.upper().split())
+            if column not in columns:
+                continue
+            if op in _EQ_OPS:
+                eq.add(column)
+            elif op in _RANGE_OPS:
+                rng.add(column)
+    rng -= eq
+
+    order: List[Tuple[str, bool]] = []
+    if order_at != -1:
+        order_end = limit_at if limit_at > order_at else len(sql)
+        for item in _split_top_level(sql[order_at + 10:order_end]):
+            m = _ORDER_ITEM_RE.match(item)
+            if not m or m.group(1).lower() not in columns:
+                break  # 식 정렬 이후 컬럼은 인덱스 정렬에 쓸 수 없음
+            order.append((m.group(1).lower(), (m.group(2) or "").upper() == "DESC"))
+
+    if not eq and not rng and not order:
+        return None
+    return (str(table).upper(), tuple(sorted(eq)), tuple(sorted(rng)), tuple(order))
+
+
+def observe_query(table: str, sql: str, elapsed_ms: float) -> None:
+    """조회 1회 기록 (해석 실패는 무시)"""
+    global _dropped_shapes
+    try:
+        key = extract_shape(table, sql)
+    except Exception:
+        return
+    if key is None:
+        return
+    stats = _shapes.get(key)
+    if stats is None:
+        if len(_shapes) >= INDEX_ADVISOR_MAX_SHAPES:
+            _dropped_shapes += 1
+            return
+        stats = _shapes[key] = ShapeStats()
+    stats.calls += 1
+    stats.total_ms += elapsed_ms
+    stats.max_ms = max(stats.max_ms, elapsed_ms)
+    stats.last_seen = dt.datetime.now().isoformat(timespec="seconds")
+
+
+def candidate_columns(key: ShapeKey) -> List[str]:
+    """제안 인덱스 컬럼: 등호 컬럼 + 첫 범위 컬럼, 범위가 없으면 + 정렬 컬럼"""
+    _, eq, rng, order = key
+    columns = list(eq)
+    if rng:
+        columns.append(rng[0])
+    else:
+        columns.extend(c for c, _ in order if c not in eq)
+    return columns
+
+
+def parse_index_columns(indexdef: str) -> Optional[List[str]]:
+    """btree 일반 인덱스의 컬럼 목록 (부분·식·btree 외 인덱스는 None)"""
+    m = _INDEXDEF_RE.search(indexdef)
+    if not m or m.group(1).lower() != "btree" or m.group(3):
+        return None
+    columns = []
+    for part in _split_top_level(m.group(2)):
+        name = part.strip().split()[0] if part.strip() else ""
+        if "(" in name:
+            break
+        columns.append(name.strip('"').lower())
+    return columns or None
+
+
+def is_covered(candidate: List[str], eq_count: int, indexes: List[List[str]]) -> bool:
+    """기존 인덱스 선두가 (등호 컬럼 집합, 이어지는 범위/정렬 컬럼 순서)와 맞는지"""
+    eq_set = set(candidate[:eq_count])
+    rest = candidate[eq_count:]
+    for cols in indexes:
+        if len(cols) < len(candidate):
+            continue
+        if set(cols[:eq_count]) == eq_set and cols[eq_count:eq_count + len(rest)] == rest:
+            return True
+    return False
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    name = f"ix_{table.lower()}_{'_'.join(columns)}"
+    if len(name) > 63:
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:54]}_{digest}"
+    return name
+
+
+async def _load_catalog(tables: List[str]) -> Tuple[Dict[str, List[Tuple[str, List[str]]]], Dict[str, int], Set[str]]:
+    """테이블별 유효한 (인덱스 이름, 컬럼) 목록, 추정 행 수(파티션 테이블은 파티션 합계), 파티션 테이블 목록"""
+    import database
+    lower = [t.lower() for t in tables]
+    indexes: Dict[str, List[Tuple[str, List[str]]]] = {t: [] for t in lower}
+    rows: Dict[str, int] = {}
+    partitioned: Set[str] = set()
+    async with database.db_pool.connection() as conn:
+        async with conn.cursor() as cur:
+            # INVALID 인덱스(실패한 CONCURRENTLY, 파티션이 덜 붙은 부모 인덱스)는 없는 것으로 본다
+            await cur.execute(
+                "SELECT t.relname, i.relname, pg_catalog.pg_get_indexdef(x.indexrelid) "
+                "FROM pg_catalog.pg_index x "
+                "JOIN pg_catalog.pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_catalog.pg_class t ON t.oid = x.indrelid "
+                "JOIN pg_catalog.pg_namespace n ON n.oid = t.relnamespace "
+                "WHERE n.nspname = 'public' AND t.relname = ANY(%s) AND x.indisvalid",
+                (lower,),
+            )
+            for table, name, indexdef in await cur.fetchall():
+                columns = parse_index_columns(indexdef)
+                if columns:
+                    indexes.setdefault(table, []).append((name, columns))
+            await cur.execute(
+                "SELECT c.relname, c.relkind, CASE WHEN c.relkind = 'p' THEN ("
+                "  SELECT COALESCE(sum(GREATEST(p.reltuples, 0)), 0) FROM pg_catalog.pg_inherits h "
+                "  JOIN pg_catalog.pg_class p ON p.oid = h.inhrelid WHERE h.inhparent = c.oid"
+                ") ELSE c.reltuples END::bigint "
+                "FROM pg_catalog.pg_class c "
+                "JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = 'public' AND c.relname = ANY(%s)",
+                (lower,),
+            )
+            for table, relkind, reltuples in await cur.fetchall():
+                rows[table] = int(reltuples)
+                if relkind == "p":
+                    partitioned.add(table)
+    return indexes, rows, partitioned
+
+
+async def build_suggestions() -> List[Dict[str, Any]]:
+    """관측된 형태 중 기존 인덱스로 처리되지 않는 것을 CREATE INDEX 제안으로 (순위 순)"""
+    shapes = [(k, s) for k, s in _shapes.items() if s.calls >= INDEX_ADVISOR_MIN_CALLS]
+    if not shapes:
+        return []
+    indexes, est_rows, partitioned = await _load_catalog(sorted({k[0] for k, _ in shapes}))
+
+    # 같은 제안 컬럼으로 모이는 형태는 합산
+    merged: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+    for key, stats in shapes:
+        table = key[0].lower()
+        columns = candidate_columns(key)
+        if not columns:
+            continue
+        existing = [cols for _, cols in indexes.get(table, [])]
+        if is_covered(columns, len(key[1]), existing):
+            continue
+        entry = merged.setdefault((table, tuple(columns)), {
+            "table": key[0],
+            "columns": columns,
+            "shapes": [],
+            "calls": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+        })
+        entry["shapes"].append({
+            "eq": list(key[1]), "range": list(key[2]),
+            "order": [f"{c} DESC" if desc else c for c, desc in key[3]],
+            "calls": stats.calls, "avg_ms": round(stats.total_ms / stats.calls, 1),
+        })
+        entry["calls"] += stats.calls
+        entry["total_ms"] += stats.total_ms
+        entry["max_ms"] = max(entry["max_ms"], stats.max_ms)
+
+    suggestions = []
+    for (table, columns), entry in merged.items():
+        rows = est_rows.get(table, -1)
+        name = index_name(table, list(columns))
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        if table in partitioned:
+            # 부모는 ON ONLY로 만들고 파티션별 CONCURRENTLY 인덱스를 ATTACH (_apply_partitioned_index)
+            sql = f'CREATE INDEX IF NOT EXISTS "{name}" ON ONLY "{table}" ({quoted})'
+        else:
+            sql = f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ({quoted})'
+        entry.update({
+            "name": name,
+            "sql": sql,
+            "partitioned": table in partitioned,
+            "estimated_rows": rows,
+            "small_table": 0 <= rows < INDEX_ADVISOR_MIN_ROWS,
+            "avg_ms": round(entry["total_ms"] / entry["calls"], 1),
+            "total_ms": round(entry["total_ms"], 1),
+            "max_ms": round(entry["max_ms"], 1),
+        })
+        suggestions.append(entry)
+    suggestions.sort(key=lambda s: (s["small_table"], -s["total_ms"]))
+    return suggestions
+
+
+async def _create_index_concurrently(conn, name: str, sql: str) -> None:
+    try:
+        await conn.execute(sql)
+    except Exception:
+        # 실패한 CONCURRENTLY는 INVALID 인덱스를 남김
+        await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        raise
+
+
+async def _apply_partitioned_index(conn, job: ApplyJob) -> None:
+    """
+    파티션 테이블: 부모 인덱스(ON ONLY, 처음엔 INVALID) 생성 후 파티션마다 CONCURRENTLY로 만들어 ATTACH.
+    이미 붙은 파티션 인덱스는 IF NOT EXISTS / ATTACH가 아무것도 하지 않으므로 재실행하면 이어서 진행한다.
+    """
+    quoted = ", ".join(f'"{c}"' for c in job.columns)
+    await conn.execute(job.sql)
+    cur = await conn.execute(
+        "SELECT c.relname, c.relkind FROM pg_catalog.pg_inherits i "
+        "JOIN pg_catalog.pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+        (f"public.{job.table}",),
+    )
+    for partition, relkind in await cur.fetchall():
+        if relkind != "r":
+            raise RuntimeError(f"{partition} is itself partitioned; create its index manually")
+        child = index_name(partition, job.columns)
+        await _create_index_concurrently(
+            conn, child, f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{child}" ON "{partition}" ({quoted})'
+        )
+        await conn.execute(f'ALTER INDEX "{job.name}" ATTACH PARTITION "{child}"')
+
+
+async def _apply_index(job: ApplyJob) -> None:
+    """CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서만 실행되므로 별도 autocommit 연결 사용"""
+    import psycopg
+    from database import DATABASE_URL
+    try:
+        async with await psycopg.AsyncConnection.connect(DATABASE_URL, autocommit=True) as conn:
+            if job.partitioned:
+                await _apply_partitioned_index(conn, job)
+            else:
+                await _create_index_concurrently(conn, job.name, job.sql)
+        job.state = "done"
+    except Exception as e:
+        job.state = "failed"
+        job.error = str(e)
+        logger.warning("index advisor apply failed (%s): %s", job.name, e)
+    finally:
+        job.finished = dt.datetime.now().isoformat(timespec="seconds")
+
+
+class IndexApplyRequest(BaseModel):
+    name: str  # 제안 목록의 name
+
+
+def get_index_advisor_status() -> Dict[str, Any]:
+    return {
+        "shapes": len(_shapes),
+        "dropped_shapes": _dropped_shapes,
+        "min_calls": INDEX_ADVISOR_MIN_CALLS,
+        "apply_enabled": INDEX_ADVISOR_APPLY,
+        "jobs": [vars(j) for j in _jobs.values()],
+    }
+
+
+def register_index_advisor_routes(app):
+    """인덱스 어드바이저 관리자 라우트 등록"""
+    from auth import require_admin_user
+
+    @app.get("/api/admin/index-advisor", dependencies=[Depends(require_admin_user)])
+    async def index_advisor_report():
+        """관측된 조건·정렬 형태 기반 인덱스 제안 (관리자 전용)"""
+        try:
+            suggestions = await build_suggestions()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"status": get_index_advisor_status(), "suggestions": suggestions}
+
+    @app.post("/api/admin/index-advisor/apply", status_code=202, dependencies=[Depends(require_admin_user)])
+    async def index_advisor_apply(body: IndexApplyRequest):
+        """제안 인덱스를 CREATE INDEX CONCURRENTLY로 생성 (INDEX_ADVISOR_APPLY=1일 때만, 관리자 전용)"""
+        if not INDEX_ADVISOR_APPLY:
+            raise HTTPException(status_code=403, detail="Index apply is disabled (set INDEX_ADVISOR_APPLY=1)")
+        job = _jobs.get(body.name)
+        if job is not None and job.state == "running":
+            raise HTTPException(status_code=409, detail=f"{body.name} is already being created")
+        suggestion = next((s for s in await build_suggestions() if s["name"] == body.name), None)
+        if suggestion is None:
+            raise HTTPException(status_code=404, detail=f"No current suggestion named {body.name}")
+        job = _jobs[body.name] = ApplyJob(
+            name=body.name, sql=suggestion["sql"], table=suggestion["table"].lower(),
+            columns=list(suggestion["columns"]), partitioned=suggestion["partitioned"],
+        )
+        # 요청이 끊겨도 취소되지 않도록 백그라운드로 실행 (상태는 GET 응답의 jobs)
+        task = asyncio.get_running_loop().create_task(_apply_index(job))
+        _job_tasks.add(task)
+        task.add_done_callback(_job_tasks.discard)
+        return vars(job)
@@ -17,12 +17,27 @@ load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """앱 시작 시 DB 풀 초기화, 종료 시 정리."""
+    """앱 시작 시 DB 풀 초기화·세션 저장소 준비·스키마 캐시 적재·결과 캐시 무효화 알림 수신·이력 파티션 유지 관리, 종료 시 정리."""
     from database import init_db_pool, open_db_pool, close_db_pool
+    from schema_cache import ensure_schema_cache
+    from result_cache import start_invalidation_listener, stop_invalidation_listener
+    from partition_manager import start_partition_maintenance, stop_partition_maintenance
+    from session_store import open_session_store, close_session_store
+    from auth import shutdown_bcrypt_executor
+    from query_log import close_explain_connection
     init_db_pool()
     await open_db_pool()
+    await open_session_store()
+    await ensure_schema_cache()
+    start_invalidation_listener()
+    start_partition_maintenance()
     yield
     from prometheus import close_prometheus_client
+    await stop_partition_maintenance()
+    await stop_invalidation_listener()
+    await close_session_store()
+    shutdown_bcrypt_executor()
+    await close_explain_connection()
     await close_db_pool()
     await close_prometheus_client()
 
@@ -41,6 +56,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 키셋 페이지네이션 커서·ETag 헤더를 프론트에서 읽을 수 있도록 노출
+    expose_headers=["X-Next-Cursor", "X-Result-Truncated", "ETag"],
 )
 
 # 데이터베이스 관련 코드는 database.py로 분리됨
@@ -55,11 +72,31 @@ from auth import register_auth_routes
 from prometheus import register_prometheus_routes
 from server_status import register_server_status_routes
 from tcs7000 import register_tcs_routes
+# 서버 측 집계 API는 aggregates.py
+from aggregates import register_aggregate_routes
+# 서버 상태 이력 롤업은 monitor_history.py
+from monitor_history import register_monitor_history_routes
+# 이력 테이블 파티션 관리는 partition_manager.py
+from partition_manager import register_partition_routes
+# 느린 쿼리 로그는 query_log.py
+from query_log import register_query_log_routes
+# 인덱스 어드바이저는 index_advisor.py
+from index_advisor import register_index_advisor_routes
 
 # 인증 라우트 등록 (넌스 등)
 register_auth_routes(app)
 # 데이터베이스 라우트 등록
 register_database_routes(app)
+# 집계 라우트 등록 (COUNT / GROUP BY 등)
+register_aggregate_routes(app)
+# 서버 상태 이력 롤업 라우트 등록
+register_monitor_history_routes(app)
+# 파티션 관리(관리자) 라우트 등록
+register_partition_routes(app)
+# 느린 쿼리 로그(관리자) 라우트 등록
+register_query_log_routes(app)
+# 인덱스 어드바이저(관리자) 라우트 등록
+register_index_advisor_routes(app)
 
 # 프로메테우스 라우트 등록 (range-chart 등)
 register_prometheus_routes(app)
@@ -81,4 +118,17 @@ if __name__ == "__main__":
             return True
 
     logging.getLogger("uvicorn.access").addFilter(SuppressAuthMe401())
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # 워커 수 (2 이상이면 세션·넌스를 공유해야 하므로 SESSION_STORE=postgres 필요)
+    try:
+        workers = int(os.getenv("UVICORN_WORKERS") or "1")
+    except (TypeError, ValueError):
+        workers = 1
+    if workers > 1:
+        from session_store import get_session_store
+        if not get_session_store().shared:
+            sys.exit("UVICORN_WORKERS > 1 requires SESSION_STORE=postgres (sessions must be shared between workers)")
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)))
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
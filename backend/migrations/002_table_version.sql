@@ -0,0 +1,56 @@
+-- 테이블 변경 버전 카운터 (조건부 GET ETag / 결과 캐시 무효화용)
+-- 장치가 API를 거치지 않고 ALIVE 컬럼 등을 직접 수정해도 트리거가 버전을 올리고
+-- vms_table_changed 채널로 알림을 보낸다. (payload: '-:<TABLE>:v<version>')
+-- 실행: psql $DATABASE_URL -f backend/migrations/002_table_version.sql
+
+CREATE TABLE IF NOT EXISTS vms_table_version (
+    table_name  VARCHAR(64) PRIMARY KEY,   -- 대문자 테이블명
+    version     BIGINT      NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMP   NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION vms_bump_table_version() RETURNS trigger AS $$
+DECLARE
+    v BIGINT;
+BEGIN
+    INSERT INTO vms_table_version (table_name, version, updated_at)
+    VALUES (upper(TG_TABLE_NAME), 1, NOW())
+    ON CONFLICT (table_name) DO UPDATE
+        SET version = vms_table_version.version + 1, updated_at = NOW()
+    RETURNING version INTO v;
+    PERFORM pg_notify('vms_table_changed', '-:' || upper(TG_TABLE_NAME) || ':v' || v);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 문장 단위 트리거 설치 대상:
+--   ALIVE 계열 컬럼(alive, ch_alive, hls_alive 등)이 있는 테이블
+--   결과 캐시·ETag 대상 참조 테이블 (RESULT_CACHE_TABLES 기본값) — psql·마이그레이션 수정도 ETag에 반영
+DO $$
+DECLARE
+    t RECORD;
+BEGIN
+    FOR t IN
+        SELECT DISTINCT c.relname
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+        WHERE n.nspname = 'public'
+          AND c.relkind IN ('r', 'p')
+          AND NOT c.relispartition
+          AND (
+              lower(a.attname) LIKE '%alive'
+              OR upper(c.relname) IN ('MGMT_CODE', 'MGMT_MENU', 'MGMT_MENU_MAP', 'MGMT_CONFIG', 'MGMT_VERSION')
+          )
+    LOOP
+        INSERT INTO vms_table_version (table_name) VALUES (upper(t.relname))
+        ON CONFLICT (table_name) DO NOTHING;
+        EXECUTE format('DROP TRIGGER IF EXISTS vms_table_version_trg ON %I', t.relname);
+        EXECUTE format(
+            'CREATE TRIGGER vms_table_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION vms_bump_table_version()',
+            t.relname
+        );
+    END LOOP;
+END;
+$$;
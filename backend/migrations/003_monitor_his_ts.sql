@@ -0,0 +1,31 @@
+-- *_MONITOR_HIS 이력 테이블 시간 구간 조회용 타임스탬프 함수와 표현식 인덱스
+-- T_DAY(YYYYMMDD) / T_TIME(HH24MISS) 문자 컬럼을 timestamp로 합친 값에 인덱스를 걸어
+-- monitor_history.py 롤업 조회(서버 ID + 시간 범위)가 여러 주 범위에서도 인덱스 범위 스캔을 쓰게 한다.
+-- 실행: psql $DATABASE_URL -f backend/migrations/003_monitor_his_ts.sql
+-- (운영 중 테이블이 크면 아래 인덱스를 CONCURRENTLY로 개별 생성)
+
+-- 인덱스 식에 쓰려면 IMMUTABLE이어야 하므로 to_timestamp(타임존 의존) 대신 make_timestamp 사용.
+-- 숫자 형식이 아니면 NULL. 잘못된 일·시각 값으로 인덱스 생성이 실패하지 않도록 월 초 + 구간 덧셈으로 계산.
+-- T_SSS는 구간 집계에 영향이 없어 제외.
+CREATE OR REPLACE FUNCTION vms_his_ts(t_day TEXT, t_time TEXT) RETURNS TIMESTAMP AS $$
+    SELECT CASE WHEN t_day ~ '^\d{8}$' AND t_time ~ '^\d{6}$' THEN
+        CASE WHEN substr(t_day, 1, 4)::int >= 1 AND substr(t_day, 5, 2)::int BETWEEN 1 AND 12 THEN
+            make_timestamp(substr(t_day, 1, 4)::int, substr(t_day, 5, 2)::int, 1, 0, 0, 0)
+            + (substr(t_day, 7, 2)::int - 1) * INTERVAL '1 day'
+            + substr(t_time, 1, 2)::int * INTERVAL '1 hour'
+            + substr(t_time, 3, 2)::int * INTERVAL '1 minute'
+            + substr(t_time, 5, 2)::int * INTERVAL '1 second'
+        END
+    END
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE INDEX IF NOT EXISTS mgmt_trans_monitor_his_ts_idx
+    ON mgmt_trans_monitor_his (trans_id, vms_his_ts(t_day, t_time));
+CREATE INDEX IF NOT EXISTS mgmt_fms_monitor_his_ts_idx
+    ON mgmt_fms_monitor_his (fms_ch_id, vms_his_ts(t_day, t_time));
+CREATE INDEX IF NOT EXISTS mgmt_fc_monitor_his_ts_idx
+    ON mgmt_fc_monitor_his (fc_id, vms_his_ts(t_day, t_time));
+
+ANALYZE mgmt_trans_monitor_his;
+ANALYZE mgmt_fms_monitor_his;
+ANALYZE mgmt_fc_monitor_his;
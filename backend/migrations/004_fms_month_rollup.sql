@@ -0,0 +1,29 @@
+-- 미디어 서버 월간 롤업(fms_rollup.py) upsert용 고유 키
+-- MGMT_FMS_HIT_MONTH / MGMT_FMS_TRAFFIC_MONTH에 (yyyy, mm, svc, vol) PRIMARY KEY 또는 고유 인덱스가 없으면 만든다.
+-- 실행: psql $DATABASE_URL -f backend/migrations/004_fms_month_rollup.sql
+-- 이후 월간 테이블 재계산: cd backend && python fms_rollup.py backfill
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['mgmt_fms_hit_month', 'mgmt_fms_traffic_month'] LOOP
+        IF to_regclass('public.' || t) IS NULL THEN
+            CONTINUE;
+        END IF;
+        IF NOT EXISTS (
+            SELECT 1
+            FROM pg_catalog.pg_index i
+            WHERE i.indrelid = ('public.' || t)::regclass
+              AND i.indisunique
+              AND (
+                  SELECT array_agg(lower(a.attname::text) ORDER BY a.attname)
+                  FROM pg_catalog.pg_attribute a
+                  WHERE a.attrelid = i.indrelid AND a.attnum = ANY (i.indkey)
+              ) = ARRAY['mm', 'svc', 'vol', 'yyyy']
+        ) THEN
+            EXECUTE format('CREATE UNIQUE INDEX %I ON %I (yyyy, mm, svc, vol)', t || '_key_idx', t);
+        END IF;
+    END LOOP;
+END;
+$$;
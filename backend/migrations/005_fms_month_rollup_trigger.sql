@@ -0,0 +1,89 @@
+-- 미디어 서버 월간 롤업을 DB 트리거로 유지 (fms_rollup.py)
+-- 수집기가 API를 거치지 않고 MGMT_FMS_HIT / MGMT_FMS_TRAFFIC에 직접 적재·수정·삭제해도
+-- 같은 트랜잭션에서 영향받은 (yyyy, mm, svc, vol) 월 행만 다시 계산해 upsert하고, 시간별 행이 없어진 월 행은 삭제한다.
+-- 문장 단위 트리거 + 전이 테이블(new_rows / old_rows)이라 대량 적재도 문장마다 한 번만 계산한다.
+-- 선행: 004_fms_month_rollup.sql (월간 테이블 고유 키). 적용되면 앱은 5분 안에 이를 감지해 API 쓰기 경로의 롤업 계산을 생략한다.
+-- 실행: psql $DATABASE_URL -f backend/migrations/005_fms_month_rollup_trigger.sql
+-- 이후 기존 데이터 재계산: cd backend && python fms_rollup.py backfill
+
+CREATE OR REPLACE FUNCTION vms_fms_month_refresh() RETURNS trigger AS $$
+DECLARE
+    source  TEXT := lower(TG_TABLE_NAME);
+    target  TEXT := lower(TG_TABLE_NAME) || '_month';
+    cols    TEXT;
+    aggs    TEXT;
+    updates TEXT;
+    keys    TEXT;
+BEGIN
+    -- 집계 규칙: HIT/CONN/T_BYTE 합계, MAX_TRAF 최대, MIN_TRAF 최소 (fms_rollup.ROLLUPS와 동일)
+    IF source = 'mgmt_fms_hit' THEN
+        cols := 'hit, conn';
+        aggs := 'SUM(h.hit), SUM(h.conn)';
+        updates := 'hit = EXCLUDED.hit, conn = EXCLUDED.conn';
+    ELSE
+        cols := 't_byte, max_traf, min_traf';
+        aggs := 'SUM(h.t_byte), MAX(h.max_traf), MIN(h.min_traf)';
+        updates := 't_byte = EXCLUDED.t_byte, max_traf = EXCLUDED.max_traf, min_traf = EXCLUDED.min_traf';
+    END IF;
+    keys := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT yyyy, mm, svc, vol FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT yyyy, mm, svc, vol FROM old_rows'
+        ELSE 'SELECT yyyy, mm, svc, vol FROM new_rows UNION SELECT yyyy, mm, svc, vol FROM old_rows'
+    END;
+
+    EXECUTE format(
+        'INSERT INTO %1$I (yyyy, mm, svc, vol, %2$s) '
+        'SELECT h.yyyy, h.mm, h.svc, h.vol, %3$s FROM %4$I h '
+        'WHERE (h.yyyy, h.mm, h.svc, h.vol) IN (%5$s) '
+        'GROUP BY h.yyyy, h.mm, h.svc, h.vol '
+        'ON CONFLICT (yyyy, mm, svc, vol) DO UPDATE SET %6$s',
+        target, cols, aggs, source, keys, updates
+    );
+    EXECUTE format(
+        'DELETE FROM %1$I m WHERE (m.yyyy, m.mm, m.svc, m.vol) IN (%2$s) '
+        'AND NOT EXISTS (SELECT 1 FROM %3$I h '
+        'WHERE h.yyyy = m.yyyy AND h.mm = m.mm AND h.svc = m.svc AND h.vol = m.vol)',
+        target, keys, source
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 전이 테이블을 쓰는 트리거는 이벤트 하나씩만 지정할 수 있어 INSERT / UPDATE / DELETE를 따로 만든다
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['mgmt_fms_hit', 'mgmt_fms_traffic'] LOOP
+        IF to_regclass('public.' || t) IS NULL OR to_regclass('public.' || t || '_month') IS NULL THEN
+            CONTINUE;
+        END IF;
+        EXECUTE format('DROP TRIGGER IF EXISTS vms_fms_month_ins ON %I', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS vms_fms_month_upd ON %I', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS vms_fms_month_del ON %I', t);
+        EXECUTE format(
+            'CREATE TRIGGER vms_fms_month_ins AFTER INSERT ON %I '
+            'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vms_fms_month_refresh()', t
+        );
+        EXECUTE format(
+            'CREATE TRIGGER vms_fms_month_upd AFTER UPDATE ON %I '
+            'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION vms_fms_month_refresh()', t
+        );
+        EXECUTE format(
+            'CREATE TRIGGER vms_fms_month_del AFTER DELETE ON %I '
+            'REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION vms_fms_month_refresh()', t
+        );
+        -- 002_table_version.sql이 적용되어 있으면 월간 테이블 변경도 결과 캐시·ETag 버전에 반영
+        IF to_regprocedure('vms_bump_table_version()') IS NOT NULL THEN
+            INSERT INTO vms_table_version (table_name) VALUES (upper(t || '_month'))
+            ON CONFLICT (table_name) DO NOTHING;
+            EXECUTE format('DROP TRIGGER IF EXISTS vms_table_version_trg ON %I', t || '_month');
+            EXECUTE format(
+                'CREATE TRIGGER vms_table_version_trg AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+                'FOR EACH STATEMENT EXECUTE FUNCTION vms_bump_table_version()',
+                t || '_month'
+            );
+        END IF;
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,34 @@
+-- MGMT_USER.USER_ID 앞뒤 공백 정규화 (auth.py 사용자 조회)
+-- 사용자 조회는 PRIMARY KEY 인덱스를 타도록 컬럼에 TRIM을 씌우지 않고 `user_id = %s`(입력은 앞뒤 공백 제거)로 비교한다.
+-- 공백이 붙어 저장된 ID는 이 비교로 찾을 수 없으므로 저장값을 한 번 정리하고,
+-- 이후 API·psql·장치 어느 경로로 넣어도 BEFORE 트리거가 앞뒤 공백을 제거해 저장한다.
+-- 정리 후 같은 ID가 되는 행이 있으면 아무것도 바꾸지 않고 중단한다 (해당 계정을 먼저 정리).
+-- 실행: psql $DATABASE_URL -f backend/migrations/006_mgmt_user_trim.sql
+
+DO $$
+DECLARE
+    dup TEXT;
+BEGIN
+    SELECT string_agg(DISTINCT btrim(user_id), ', ') INTO dup
+    FROM mgmt_user
+    WHERE btrim(user_id) IN (
+        SELECT btrim(user_id) FROM mgmt_user GROUP BY btrim(user_id) HAVING count(*) > 1
+    );
+    IF dup IS NOT NULL THEN
+        RAISE EXCEPTION 'mgmt_user: user_id values collide after trimming: %', dup;
+    END IF;
+
+    UPDATE mgmt_user SET user_id = btrim(user_id) WHERE user_id::text <> btrim(user_id);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION vms_trim_user_id() RETURNS trigger AS $$
+BEGIN
+    NEW.user_id := btrim(NEW.user_id);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vms_trim_user_id_trg ON mgmt_user;
+CREATE TRIGGER vms_trim_user_id_trg BEFORE INSERT OR UPDATE OF user_id ON mgmt_user
+    FOR EACH ROW EXECUTE FUNCTION vms_trim_user_id();
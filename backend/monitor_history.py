@@ -0,0 +1,156 @@
+"""
+서버 상태 이력(*_MONITOR_HIS) 시간 구간 롤업 API: 구간별 CPU/MEM/BW 최소·평균·최대를 SQL에서 집계.
+
+GET /api/monitor-history/{kind}?server_id=TR0001&start=2024-05-01T00:00:00&end=2024-05-08T00:00:00&bucket=3600
+    kind: trans (MGMT_TRANS_MONITOR_HIS) | fms (MGMT_FMS_MONITOR_HIS) | fc (MGMT_FC_MONITOR_HIS)
+응답: { server_id, start, end, bucket_sec, buckets: [{ bucket, samples, cpu_min, cpu_avg, cpu_max, ... }] }
+
+- T_DAY/T_TIME 문자 컬럼은 vms_his_ts(t_day, t_time) 함수로 timestamp로 합친다.
+  migrations/003_monitor_his_ts.sql이 함수와 (서버 ID, 타임스탬프) 표현식 인덱스를 만든다.
+  함수가 없으면(마이그레이션 미적용) 같은 식을 인라인으로 쓰고 T_DAY 범위 조건으로 PRIMARY KEY 인덱스를 탄다.
+"""
+import datetime as dt
+import os
+import time
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from fast_json import FastJSONResponse, lower_dict_row
+from query_guard import GUARDS, guarded_connection
+
+try:
+    MONITOR_HISTORY_MAX_BUCKETS = int(os.getenv("MONITOR_HISTORY_MAX_BUCKETS") or "2000")
+except (TypeError, ValueError):
+    MONITOR_HISTORY_MAX_BUCKETS = 2000
+MIN_BUCKET_SEC = 60
+MAX_BUCKET_SEC = 7 * 86400
+DEFAULT_RANGE = dt.timedelta(days=1)
+
+# kind -> (테이블, 서버 ID 컬럼)
+HISTORY_TABLES = {
+    "trans": ("MGMT_TRANS_MONITOR_HIS", "trans_id"),
+    "fms": ("MGMT_FMS_MONITOR_HIS", "fms_ch_id"),
+    "fc": ("MGMT_FC_MONITOR_HIS", "fc_id"),
+}
+METRICS = ("cpu", "mem", "bw_in", "bw_out")
+
+_TS_FUNCTION_EXPR = "vms_his_ts(t_day, t_time)"
+# 마이그레이션 전 대체 식 (003_monitor_his_ts.sql의 vms_his_ts와 같은 계산, 인덱스 없음)
+_TS_INLINE_EXPR = (
+    "CASE WHEN t_day ~ '^\\d{8}$' AND t_time ~ '^\\d{6}$' THEN "
+    "to_timestamp(t_day || t_time, 'YYYYMMDDHH24MISS')::timestamp END"
+)
+_TS_FUNCTION_RECHECK_SEC = 300.0
+# (함수 존재 여부, 확인 시각)
+_ts_function_state: Tuple[Optional[bool], float] = (None, 0.0)
+
+
+def parse_history_time(value: Optional[str], name: str) -> Optional[dt.datetime]:
+    """ISO 8601(2024-05-01T00:00:00) 또는 YYYYMMDD[HHMMSS] 문자열 → naive datetime (잘못되면 400)"""
+    if value is None or value == "":
+        return None
+    text = value.strip()
+    try:
+        if text.isdigit() and len(text) in (8, 14):
+            return dt.datetime.strptime(text, "%Y%m%d%H%M%S" if len(text) == 14 else "%Y%m%d")
+        parsed = dt.datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value!r}")
+    # T_DAY/T_TIME은 서버 현지 시각이므로 타임존이 붙어 있으면 현지 시각으로 변환
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+async def _has_ts_function(conn) -> bool:
+    """vms_his_ts 함수 존재 여부 (마이그레이션 적용 확인, 없으면 주기적으로 재확인)"""
+    global _ts_function_state
+    exists, checked_at = _ts_function_state
+    if exists or (exists is False and time.monotonic() - checked_at < _TS_FUNCTION_RECHECK_SEC):
+        return bool(exists)
+    async with conn.cursor(row_factory=lower_dict_row) as cur:
+        await cur.execute("SELECT to_regprocedure('vms_his_ts(text,text)') IS NOT NULL AS found")
+        row = await cur.fetchone()
+    exists = bool(row and row.get("found"))
+    _ts_function_state = (exists, time.monotonic())
+    return exists
+
+
+def build_history_rollup(kind: str, ts_expr: str) -> Tuple[str, str]:
+    """(롤업 SQL, 테이블명). 파라미터 순서: bucket, bucket, server_id, start, end, start_day, end_day"""
+    from database import format_table_name
+
+    if kind not in HISTORY_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown history kind {kind!r} (trans, fms, fc)")
+    table, id_column = HISTORY_TABLES[kind]
+    metric_parts = []
+    for m in METRICS:
+        metric_parts.append(f'MIN("{m}") AS "{m}_min"')
+        metric_parts.append(f'ROUND(AVG("{m}"), 2) AS "{m}_avg"')
+        metric_parts.append(f'MAX("{m}") AS "{m}_max"')
+    sql = (
+        f"SELECT TIMESTAMP 'epoch' + make_interval(secs => FLOOR(EXTRACT(EPOCH FROM ts) / %s) * %s) AS bucket, "
+        f"COUNT(*) AS samples, {', '.join(metric_parts)} "
+        f"FROM (SELECT {ts_expr} AS ts, {', '.join(METRICS)} FROM {format_table_name(table)} "
+        f'WHERE "{id_column}" = %s AND {ts_expr} >= %s AND {ts_expr} < %s '
+        f"AND t_day BETWEEN %s AND %s) s "
+        f"GROUP BY 1 ORDER BY 1"
+    )
+    return sql, table
+
+
+def register_monitor_history_routes(app):
+    """서버 상태 이력 롤업 라우트 등록"""
+
+    @app.get("/api/monitor-history/{kind}")
+    async def monitor_history(
+        kind: str,
+        server_id: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        bucket: int = 300,
+    ):
+        """서버 1대의 시간 구간별 CPU/MEM/BW 최소·평균·최대 (차트용, 원본 행 대신 구간 수만큼만 반환)"""
+        import database
+
+        kind = kind.lower()
+        if kind not in HISTORY_TABLES:
+            raise HTTPException(status_code=404, detail=f"Unknown history kind {kind!r} (trans, fms, fc)")
+        if not server_id.strip():
+            raise HTTPException(status_code=400, detail="server_id is required")
+        if not MIN_BUCKET_SEC <= bucket <= MAX_BUCKET_SEC:
+            raise HTTPException(status_code=400, detail=f"bucket must be {MIN_BUCKET_SEC}..{MAX_BUCKET_SEC} seconds")
+        end_at = parse_history_time(end, "end") or dt.datetime.now().replace(microsecond=0)
+        start_at = parse_history_time(start, "start") or end_at - DEFAULT_RANGE
+        if start_at >= end_at:
+            raise HTTPException(status_code=400, detail="start must be earlier than end")
+        if (end_at - start_at).total_seconds() / bucket > MONITOR_HISTORY_MAX_BUCKETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many buckets (max {MONITOR_HISTORY_MAX_BUCKETS}); use a wider bucket or shorter range",
+            )
+
+        try:
+            async with guarded_connection(database.db_pool, GUARDS["history"]) as conn:
+                ts_expr = _TS_FUNCTION_EXPR if await _has_ts_function(conn) else _TS_INLINE_EXPR
+                sql, _ = build_history_rollup(kind, ts_expr)
+                params: List[Any] = [
+                    bucket, bucket, server_id.strip(), start_at, end_at,
+                    start_at.strftime("%Y%m%d"), end_at.strftime("%Y%m%d"),
+                ]
+                async with conn.cursor(row_factory=lower_dict_row) as cur:
+                    await cur.execute(sql, params, prepare=True)
+                    rows = await cur.fetchall()
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        return FastJSONResponse({
+            "server_id": server_id.strip(),
+            "start": start_at,
+            "end": end_at,
+            "bucket_sec": bucket,
+            "buckets": rows,
+        })
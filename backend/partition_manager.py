@@ -0,0 +1,456 @@
+"""
+서버 상태 이력(*_MONITOR_HIS) 파티션 관리: T_DAY 기준 범위 파티션 전환, 미래 파티션 미리 생성, 보존 기간 지난 파티션 분리/삭제.
+
+- 전환(최초 1회, 테이블 잠금·전체 복사이므로 점검 시간에 실행):
+    cd backend && python partition_manager.py convert [--table trans|fms|fc] [--interval month|day] [--drop-legacy]
+  기존 테이블을 <table>_legacy로 바꾸고 같은 구조의 파티션 테이블을 만든 뒤 행을 옮긴다.
+  T_DAY가 YYYYMMDD 형식이 아니거나 비어 있는 행은 DEFAULT 파티션(<table>_default)으로 간다.
+- 유지 관리: 앱이 PARTITION_MAINTENANCE_INTERVAL_SEC(기본 3600초)마다 실행 (여러 워커 중 1개만, advisory lock)
+    - 현재 구간부터 PARTITION_PREMAKE(기본 3)개 구간 앞까지 파티션 생성
+    - DEFAULT 파티션이 없으면 생성. 미리 만든 구간 밖의 날짜로 DEFAULT에 들어온 행은
+      해당 구간 파티션을 만들어 옮긴다 (보존 기간 안의 구간만, T_DAY 형식이 잘못된 행은 DEFAULT에 남음)
+    - 상한이 보존 기간(MONITOR_HIS_RETENTION_DAYS, 기본 365일, 0이면 무기한)보다 오래된 파티션을
+      MONITOR_HIS_RETENTION_ACTION(detach | drop, 기본 detach)에 따라 분리 또는 삭제
+      (분리한 파티션은 <파티션>_detached로 이름을 바꿔 스키마 캐시·테이블 목록에서 제외)
+  파티션 테이블로 전환되지 않은 테이블은 건너뛴다. 수동 실행: python partition_manager.py maintain
+- 파티션 이름: <table>_pYYYYMM (월) / <table>_pYYYYMMDD (일). 구간 단위는 기존 파티션에서 판별한다.
+"""
+import argparse
+import asyncio
+import datetime as dt
+import hashlib
+import logging
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+
+from monitor_history import HISTORY_TABLES
+
+logger = logging.getLogger("partition_manager")
+
+try:
+    PARTITION_PREMAKE = int(os.getenv("PARTITION_PREMAKE") or "3")
+except (TypeError, ValueError):
+    PARTITION_PREMAKE = 3
+try:
+    MONITOR_HIS_RETENTION_DAYS = int(os.getenv("MONITOR_HIS_RETENTION_DAYS") or "365")
+except (TypeError, ValueError):
+    MONITOR_HIS_RETENTION_DAYS = 365
+MONITOR_HIS_RETENTION_ACTION = (os.getenv("MONITOR_HIS_RETENTION_ACTION") or "detach").strip().lower()
+try:
+    PARTITION_MAINTENANCE_INTERVAL_SEC = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL_SEC") or "3600")
+except (TypeError, ValueError):
+    PARTITION_MAINTENANCE_INTERVAL_SEC = 3600.0
+DEFAULT_INTERVAL = (os.getenv("PARTITION_INTERVAL") or "month").strip().lower()
+
+# 파티션 생성·분리 시 쓰기 대기를 길게 막지 않도록 잠금 대기 상한
+_LOCK_TIMEOUT = "5s"
+_ADVISORY_LOCK_KEY = "vms_partition_maintenance"
+_BOUND_RE = re.compile(r"'(\d{8})'")
+# 파티션으로 옮길 수 있는 T_DAY 값 (YYYYMMDD)
+_VALID_DAY = r"t_day ~ '^\d{8}$'"
+# 보존 기간이 지나 분리한 파티션 이름 접미사 (schema_cache 카탈로그 조회에서 DETACHED_PATTERN으로 제외)
+DETACHED_SUFFIX = "_detached"
+DETACHED_PATTERN = r"_monitor_his_p[0-9]{6}([0-9]{2})?_detached$"
+DEFAULT_SUFFIX = "_default"
+
+_maintenance_task: Optional[asyncio.Task] = None
+_last_run: Dict[str, Any] = {}
+
+
+def _period_start(day: dt.date, interval: str) -> dt.date:
+    return day.replace(day=1) if interval == "month" else day
+
+
+def _next_period(start: dt.date, interval: str) -> dt.date:
+    if interval == "day":
+        return start + dt.timedelta(days=1)
+    return (start.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+
+
+def _partition_name(table: str, start: dt.date, interval: str) -> str:
+    return f"{table.lower()}_p{start.strftime('%Y%m' if interval == 'month' else '%Y%m%d')}"
+
+
+def _bounds(start: dt.date, interval: str) -> str:
+    end = _next_period(start, interval)
+    return f"FOR VALUES FROM ('{start.strftime('%Y%m%d')}') TO ('{end.strftime('%Y%m%d')}')"
+
+
+def _create_partition_sql(table: str, start: dt.date, interval: str) -> str:
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{_partition_name(table, start, interval)}" '
+        f'PARTITION OF "{table.lower()}" {_bounds(start, interval)}'
+    )
+
+
+def _default_partition_name(table: str) -> str:
+    return f"{table.lower()}{DEFAULT_SUFFIX}"
+
+
+def _create_default_partition_sql(table: str) -> str:
+    return f'CREATE TABLE IF NOT EXISTS "{_default_partition_name(table)}" PARTITION OF "{table.lower()}" DEFAULT'
+
+
+def _legacy_index_name(index_name: str) -> str:
+    """기존 인덱스의 _legacy 이름. 63자를 넘으면 잘라낸 뒤 원래 이름 해시를 붙여 서로 겹치지 않게 한다"""
+    name = f"{index_name}_legacy"
+    if len(name) <= 63:
+        return name
+    digest = hashlib.md5(index_name.encode()).hexdigest()[:8]
+    return f"{index_name[:63 - len(digest) - 8]}_{digest}_legacy"
+
+
+async def _move_default_rows(cur, table: str, start: dt.date, interval: str) -> int:
+    """
+    DEFAULT 파티션에 들어온 구간 행을 새 파티션으로 옮기며 생성. DEFAULT에 해당 구간 행이 있으면
+    PARTITION OF 생성이 실패하므로 같은 구조의 테이블을 만들어 행을 옮긴 뒤 ATTACH한다 (인덱스는 ATTACH 시 생성).
+    """
+    name = _partition_name(table, start, interval)
+    end = _next_period(start, interval)
+    await cur.execute(
+        f'CREATE TABLE "{name}" (LIKE "{table.lower()}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS)'
+    )
+    await cur.execute(
+        f'WITH moved AS (DELETE FROM "{_default_partition_name(table)}" '
+        f"WHERE {_VALID_DAY} AND t_day >= %s AND t_day < %s RETURNING *) "
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        (start.strftime("%Y%m%d"), end.strftime("%Y%m%d")),
+    )
+    moved = cur.rowcount
+    await cur.execute(f'ALTER TABLE "{table.lower()}" ATTACH PARTITION "{name}" {_bounds(start, interval)}')
+    return moved
+
+
+async def _default_periods(cur, table: str, interval: str) -> List[dt.date]:
+    """DEFAULT 파티션에 있는 YYYYMMDD 형식 행의 구간 시작일 목록 (달력에 없는 날짜는 제외)"""
+    await cur.execute(f'SELECT DISTINCT t_day FROM "{_default_partition_name(table)}" WHERE {_VALID_DAY}')
+    periods = set()
+    for (value,) in await cur.fetchall():
+        try:
+            periods.add(_period_start(dt.datetime.strptime(value, "%Y%m%d").date(), interval))
+        except ValueError:
+            continue
+    return sorted(periods)
+
+
+async def _is_partitioned(cur, table: str) -> bool:
+    await cur.execute(
+        "SELECT c.relkind FROM pg_catalog.pg_class c WHERE c.oid = to_regclass(%s)",
+        (f"public.{table.lower()}",),
+    )
+    row = await cur.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+async def list_partitions(cur, table: str) -> List[Tuple[str, dt.date, dt.date]]:
+    """(파티션 이름, 시작일, 종료일(미포함)) 목록, 시작일 순"""
+    await cur.execute(
+        "SELECT c.relname, pg_catalog.pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_catalog.pg_inherits i JOIN pg_catalog.pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%s)",
+        (f"public.{table.lower()}",),
+    )
+    partitions = []
+    for name, bound in await cur.fetchall():
+        values = _BOUND_RE.findall(bound or "")
+        if len(values) != 2:
+            continue  # DEFAULT 파티션 등
+        start, end = (dt.datetime.strptime(v, "%Y%m%d").date() for v in values)
+        partitions.append((name, start, end))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _detect_interval(partitions: List[Tuple[str, dt.date, dt.date]]) -> str:
+    """기존 파티션 폭으로 구간 단위 판별 (없으면 PARTITION_INTERVAL)"""
+    if not partitions:
+        return DEFAULT_INTERVAL
+    _, start, end = partitions[-1]
+    return "month" if (end - start).days >= 28 else "day"
+
+
+async def maintain_table(conn, table: str, today: Optional[dt.date] = None) -> Dict[str, Any]:
+    """한 테이블의 미래 파티션 생성 + 보존 기간 지난 파티션 분리/삭제 (테이블별 트랜잭션)"""
+    today = today or dt.date.today()
+    result: Dict[str, Any] = {
+        "table": table, "created": [], "detached": [], "dropped": [], "moved_from_default": 0,
+    }
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            if not await _is_partitioned(cur, table):
+                result["skipped"] = "not partitioned"
+                return result
+            await cur.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", (f"{_ADVISORY_LOCK_KEY}:{table}",))
+            if not (await cur.fetchone())[0]:
+                result["skipped"] = "locked by another worker"
+                return result
+            await cur.execute(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'")
+
+            partitions = await list_partitions(cur, table)
+            interval = _detect_interval(partitions)
+            existing = {start for _, start, _ in partitions}
+            cutoff = today - dt.timedelta(days=MONITOR_HIS_RETENTION_DAYS) if MONITOR_HIS_RETENTION_DAYS > 0 else None
+            await cur.execute(_create_default_partition_sql(table))
+
+            # 미리 만들 구간 + DEFAULT로 들어온 행의 구간 (보존 기간이 지난 구간은 만들지 않음)
+            in_default = set(await _default_periods(cur, table, interval))
+            wanted = set(in_default)
+            start = _period_start(today, interval)
+            for _ in range(PARTITION_PREMAKE + 1):
+                wanted.add(start)
+                start = _next_period(start, interval)
+            for start in sorted(wanted - existing):
+                if cutoff is not None and _next_period(start, interval) <= cutoff:
+                    continue
+                if start in in_default:
+                    result["moved_from_default"] += await _move_default_rows(cur, table, start, interval)
+                else:
+                    await cur.execute(_create_partition_sql(table, start, interval))
+                result["created"].append(_partition_name(table, start, interval))
+
+            await cur.execute(f'SELECT count(*) FROM "{_default_partition_name(table)}"')
+            result["left_in_default"] = (await cur.fetchone())[0]
+
+            if cutoff is not None:
+                for name, _, end in partitions:
+                    if end > cutoff:
+                        continue
+                    if MONITOR_HIS_RETENTION_ACTION == "drop":
+                        await cur.execute(f'DROP TABLE "{name}"')
+                        result["dropped"].append(name)
+                    else:
+                        detached = f"{name[:63 - len(DETACHED_SUFFIX)]}{DETACHED_SUFFIX}"
+                        await cur.execute(f'ALTER TABLE "{table.lower()}" DETACH PARTITION "{name}"')
+                        await cur.execute(f'ALTER TABLE "{name}" RENAME TO "{detached}"')
+                        result["detached"].append(detached)
+    return result
+
+
+async def run_maintenance(conn) -> List[Dict[str, Any]]:
+    """모든 이력 테이블 유지 관리. 한 테이블 실패(잠금 대기 초과 등)는 기록만 하고 다음 테이블 진행"""
+    results = []
+    for table, _ in HISTORY_TABLES.values():
+        try:
+            results.append(await maintain_table(conn, table))
+        except Exception as e:
+            logger.warning("partition maintenance failed for %s: %s", table, e)
+            results.append({"table": table, "error": str(e)})
+    _last_run.update({"at": dt.datetime.now().isoformat(timespec="seconds"), "results": results})
+    return results
+
+
+def _parse_day(table: str, label: str, value: Any) -> Optional[dt.date]:
+    """T_DAY 값(YYYYMMDD) -> date. 비어 있으면 None, 날짜가 아니면 400"""
+    text = str(value).strip() if value is not None else ""
+    if not text:
+        return None
+    try:
+        return dt.datetime.strptime(text, "%Y%m%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{table}: {label} t_day {text!r} is not a valid YYYYMMDD date") from None
+
+
+async def convert_table(conn, table: str, id_column: str, interval: str, drop_legacy: bool) -> Dict[str, Any]:
+    """일반 테이블을 T_DAY 범위 파티션 테이블로 전환 (한 트랜잭션, 실패 시 원상태)"""
+    name = table.lower()
+    legacy = f"{name}_legacy"
+    today = dt.date.today()
+    async with conn.transaction():
+        async with conn.cursor() as cur:
+            if await _is_partitioned(cur, table):
+                return {"table": table, "skipped": "already partitioned"}
+            await cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"public.{legacy}",))
+            if (await cur.fetchone())[0]:
+                raise RuntimeError(f"{legacy} already exists; drop or rename it first")
+
+            await cur.execute(f'LOCK TABLE "{name}" IN ACCESS EXCLUSIVE MODE')
+            # 기본 키 컬럼 (새 테이블에 그대로, 파티션 키 t_day 포함 필요)
+            await cur.execute(
+                "SELECT a.attname FROM pg_catalog.pg_index i "
+                "JOIN pg_catalog.pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY (i.indkey) "
+                "WHERE i.indrelid = to_regclass(%s) AND i.indisprimary ORDER BY array_position(i.indkey::int2[], a.attnum)",
+                (f"public.{name}",),
+            )
+            pk_columns = [r[0] for r in await cur.fetchall()]
+            await cur.execute(f'SELECT min(t_day), max(t_day) FROM "{name}" WHERE {_VALID_DAY}')
+            min_day, max_day = await cur.fetchone()
+            first = _parse_day(table, "min", min_day) or today
+            last = _parse_day(table, "max", max_day) or today
+
+            # 인덱스 이름은 스키마 단위로 고유하므로 기존 인덱스를 먼저 _legacy로 변경
+            await cur.execute(
+                "SELECT c.relname FROM pg_catalog.pg_index i JOIN pg_catalog.pg_class c ON c.oid = i.indexrelid "
+                "WHERE i.indrelid = to_regclass(%s)",
+                (f"public.{name}",),
+            )
+            for (index_name,) in await cur.fetchall():
+                await cur.execute(f'ALTER INDEX "{index_name}" RENAME TO "{_legacy_index_name(index_name)}"')
+            await cur.execute(f'ALTER TABLE "{name}" RENAME TO "{legacy}"')
+            await cur.execute(
+                f'CREATE TABLE "{name}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS) '
+                f"PARTITION BY RANGE (t_day)"
+            )
+            if pk_columns and "t_day" in pk_columns:
+                await cur.execute(f'ALTER TABLE "{name}" ADD PRIMARY KEY ({", ".join(pk_columns)})')
+
+            start = _period_start(min(first, today), interval)
+            stop = _period_start(max(last, today), interval)
+            for _ in range(PARTITION_PREMAKE):
+                stop = _next_period(stop, interval)
+            created = 0
+            while start <= stop:
+                await cur.execute(_create_partition_sql(table, start, interval))
+                created += 1
+                start = _next_period(start, interval)
+            # T_DAY 형식이 잘못되었거나 비어 있는 행, 미리 만든 구간 밖의 이후 적재 행
+            await cur.execute(_create_default_partition_sql(table))
+
+            # migrations/003 타임스탬프 표현식 인덱스 (함수가 있을 때만, 파티션에 자동 생성)
+            await cur.execute("SELECT to_regprocedure('vms_his_ts(text,text)') IS NOT NULL")
+            if (await cur.fetchone())[0]:
+                await cur.execute(
+                    f'CREATE INDEX "{name}_ts_idx" ON "{name}" ("{id_column}", vms_his_ts(t_day, t_time))'
+                )
+
+            await cur.execute(f'INSERT INTO "{name}" SELECT * FROM "{legacy}"')
+            moved = cur.rowcount
+            await cur.execute(f'SELECT count(*) FROM "{_default_partition_name(table)}"')
+            in_default = (await cur.fetchone())[0]
+            if drop_legacy:
+                await cur.execute(f'DROP TABLE "{legacy}"')
+    return {"table": table, "partitions": created, "moved": moved, "in_default": in_default,
+            "legacy": None if drop_legacy else legacy}
+
+
+async def get_partition_status(conn) -> Dict[str, Any]:
+    """관리자 엔드포인트용: 테이블별 파티션 여부·구간·목록과 마지막 유지 관리 결과"""
+    tables = []
+    async with conn.cursor() as cur:
+        for table, _ in HISTORY_TABLES.values():
+            partitioned = await _is_partitioned(cur, table)
+            partitions = await list_partitions(cur, table) if partitioned else []
+            tables.append({
+                "table": table,
+                "partitioned": partitioned,
+                "interval": _detect_interval(partitions) if partitioned else None,
+                "partitions": [
+                    {"name": n, "from": s.isoformat(), "to": e.isoformat()} for n, s, e in partitions
+                ],
+            })
+    return {
+        "premake": PARTITION_PREMAKE,
+        "retention_days": MONITOR_HIS_RETENTION_DAYS,
+        "retention_action": MONITOR_HIS_RETENTION_ACTION,
+        "interval_sec": PARTITION_MAINTENANCE_INTERVAL_SEC,
+        "tables": tables,
+        "last_run": _last_run or None,
+    }
+
+
+async def _maintenance_loop() -> None:
+    import database
+    while True:
+        try:
+            async with database.get_lane_pool("background").connection() as conn:
+                await run_maintenance(conn)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("partition maintenance failed: %s", e)
+        await asyncio.sleep(PARTITION_MAINTENANCE_INTERVAL_SEC)
+
+
+def start_partition_maintenance() -> None:
+    """앱 시작 시 주기 유지 관리 태스크 시작 (PARTITION_MAINTENANCE_INTERVAL_SEC <= 0 이면 비활성)"""
+    global _maintenance_task
+    from database import DATABASE_URL
+    if not DATABASE_URL or PARTITION_MAINTENANCE_INTERVAL_SEC <= 0 or _maintenance_task is not None:
+        return
+    _maintenance_task = asyncio.get_running_loop().create_task(_maintenance_loop())
+
+
+async def stop_partition_maintenance() -> None:
+    """앱 종료 시 유지 관리 태스크 정리"""
+    global _maintenance_task
+    if _maintenance_task is None:
+        return
+    _maintenance_task.cancel()
+    try:
+        await _maintenance_task
+    except (asyncio.CancelledError, Exception):
+        pass
+    _maintenance_task = None
+
+
+def register_partition_routes(app):
+    """파티션 관리 관리자 라우트 등록"""
+    from auth import require_admin_user
+
+    @app.get("/api/admin/partitions", dependencies=[Depends(require_admin_user)])
+    async def partition_status():
+        """이력 테이블 파티션 상태 (관리자 전용)"""
+        import database
+        try:
+            async with database.db_pool.connection() as conn:
+                return await get_partition_status(conn)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.post("/api/admin/partitions/maintain", dependencies=[Depends(require_admin_user)])
+    async def partition_maintain():
+        """미래 파티션 생성·보존 기간 정리 즉시 실행 (관리자 전용)"""
+        import database
+        try:
+            async with database.db_pool.connection() as conn:
+                return {"results": await run_maintenance(conn)}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _cli(args) -> None:
+    import psycopg
+    from database import DATABASE_URL
+
+    if not DATABASE_URL:
+        raise SystemExit("DATABASE_URL is not set")
+    kinds = [args.table] if getattr(args, "table", None) else list(HISTORY_TABLES)
+    async with await psycopg.AsyncConnection.connect(DATABASE_URL) as conn:
+        if args.command == "convert":
+            for kind in kinds:
+                table, id_column = HISTORY_TABLES[kind]
+                try:
+                    print(await convert_table(conn, table, id_column, args.interval, args.drop_legacy))
+                except HTTPException as e:
+                    print(e.detail, file=sys.stderr)
+                    sys.exit(2)
+        elif args.command == "maintain":
+            for result in await run_maintenance(conn):
+                print(result)
+        else:
+            status = await get_partition_status(conn)
+            for t in status["tables"]:
+                print(f"{t['table']}: partitioned={t['partitioned']} interval={t['interval']} partitions={len(t['partitions'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    conv = sub.add_parser("convert", help="일반 테이블을 T_DAY 범위 파티션 테이블로 전환")
+    conv.add_argument("--table", choices=list(HISTORY_TABLES), help="대상 (기본: 전체)")
+    conv.add_argument("--interval", choices=["month", "day"], default=DEFAULT_INTERVAL)
+    conv.add_argument("--drop-legacy", action="store_true", help="전환 후 기존 테이블(<table>_legacy) 삭제")
+    sub.add_parser("maintain", help="미래 파티션 생성 + 보존 기간 정리")
+    sub.add_parser("status", help="파티션 상태 출력")
+    args = parser.parse_args()
+
+    # Windows에서 SelectorEventLoop 사용 (psycopg 호환성)
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(_cli(args))
+
+
+if __name__ == "__main__":
+    main()
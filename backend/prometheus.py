@@ -2,9 +2,11 @@
 Prometheus 연동: query/query_range API 호출 및 range 차트 REST.
 SSE 스트림(서버별 현황)은 server_status 모듈에서 DB와 조합해 제공한다.
 """
+import asyncio
 import os
+import re
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
 import httpx
 from dotenv import load_dotenv
 
@@ -14,6 +16,12 @@ PROMETHEUS_URL = (os.getenv("PROMETHEUS_URL") or "").strip()
 NODE_EXPORTER_PORT = 9100
 # 차트 range 쿼리 step (예: "1m", "5m"). 환경변수 PROMETHEUS_STEP
 PROMETHEUS_STEP = (os.getenv("PROMETHEUS_STEP") or "1m").strip() or "1m"
+# instant 일괄 조회 시 instance 정규식 매처 최대 길이. 넘는 IP는 다음 묶음으로 나눠 조회.
+# memory/disk 식은 매처가 두 번 들어가고 URL 인코딩으로 1.5~2배가 되므로 기본 1500이면 GET URL이 8KB 안쪽
+try:
+    PROMETHEUS_MATCHER_MAX_LEN = int(os.getenv("PROMETHEUS_MATCHER_MAX_LEN") or "1500")
+except (TypeError, ValueError):
+    PROMETHEUS_MATCHER_MAX_LEN = 1500
 _prometheus_client: Optional[httpx.AsyncClient] = None
 
 
@@ -83,27 +91,57 @@ async def query_prometheus_range(
         return {"status": "error", "error": str(e), "errorType": "request_error"}
 
 
-def _instance_matcher(ip: str) -> str:
-    if not ip:
-        return ""
-    return f'instance="{ip}:{NODE_EXPORTER_PORT}"'
+# 단일 IP 또는 IP 목록 (목록이면 instance=~ 정규식 매처 하나로 조회)
+InstanceTarget = Union[str, Sequence[str]]
+
+
+def _ip_pattern(ip: str) -> str:
+    """IP를 PromQL 문자열 안의 정규식으로 (정규식 특수문자와 따옴표·역슬래시 이스케이프)"""
+    return re.escape(ip).replace("\\", "\\\\").replace('"', '\\"')
 
 
-def _promql_cpu(ip: str) -> str:
+def _instance_matcher(ip: InstanceTarget) -> str:
+    if not ip:
+        return ""
+    if isinstance(ip, str):
+        return f'instance="{ip}:{NODE_EXPORTER_PORT}"'
+    # Prometheus 정규식 매처는 전체 일치라 "10.0.0.1"이 "10.0.0.11"과 섞이지 않음
+    alternatives = "|".join(_ip_pattern(x) for x in ip)
+    return f'instance=~"({alternatives}):{NODE_EXPORTER_PORT}"'
+
+
+def _chunk_ips_for_matcher(ips: Sequence[str], max_len: int) -> List[List[str]]:
+    """정규식 매처 길이가 max_len을 넘지 않도록 IP 목록 분할 (IP 하나가 넘으면 단독 묶음)"""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for ip in ips:
+        cost = len(_ip_pattern(ip)) + 1
+        if current and size + cost > max_len:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(ip)
+        size += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _promql_cpu(ip: InstanceTarget) -> str:
     m = _instance_matcher(ip)
     if not m:
         return ""
     return f'round(avg by (instance) (irate(node_cpu_seconds_total{{{m}, mode!="idle"}}[1m])) * 100, 0.1)'
 
 
-def _promql_memory(ip: str) -> str:
+def _promql_memory(ip: InstanceTarget) -> str:
     m = _instance_matcher(ip)
     if not m:
         return ""
     return f"100 * (1 - (node_memory_MemAvailable_bytes{{{m}}} / node_memory_MemTotal_bytes{{{m}}}))"
 
 
-def _promql_disk(ip: str) -> str:
+def _promql_disk(ip: InstanceTarget) -> str:
     m = _instance_matcher(ip)
     if not m:
         return ""
@@ -111,14 +149,14 @@ def _promql_disk(ip: str) -> str:
     return f'100 * (1 - (node_filesystem_avail_bytes{{mountpoint="/",{fs},{m}}} / node_filesystem_size_bytes{{mountpoint="/",{fs},{m}}}))'
 
 
-def _promql_memory_used_gb(ip: str) -> str:
+def _promql_memory_used_gb(ip: InstanceTarget) -> str:
     m = _instance_matcher(ip)
     if not m:
         return ""
     return f"(node_memory_MemTotal_bytes{{{m}}} - node_memory_MemAvailable_bytes{{{m}}}) / 1024 / 1024 / 1024"
 
 
-def _promql_disk_used_gb(ip: str) -> str:
+def _promql_disk_used_gb(ip: InstanceTarget) -> str:
     m = _instance_matcher(ip)
     if not m:
         return ""
@@ -126,14 +164,14 @@ def _promql_disk_used_gb(ip: str) -> str:
     return f'(node_filesystem_size_bytes{{mountpoint="/",{fs},{m}}} - node_filesystem_avail_bytes{{mountpoint="/",{fs},{m}}}) / 1024 / 1024 / 1024'
 
 
-def _promql_network(ip: str) -> str:
+def _promql_network(ip: InstanceTarget) -> str:
     m = _instance_matcher(ip)
     if not m:
         return ""
     return f'sum by (instance) (rate(node_network_receive_bytes_total{{{m},device!~"lo|veth.*"}}[5m])) / 1024 / 1024'
 
 
-def _promql_network_transmit(ip: str) -> str:
+def _promql_network_transmit(ip: InstanceTarget) -> str:
     m = _instance_matcher(ip)
     if not m:
         return ""
@@ -166,20 +204,38 @@ def _clamp_0_100(v: float) -> float:
     return max(0.0, min(100.0, v)) if isinstance(v, (int, float)) else 0.0
 
 
+async def _fetch_instant_maps(ips: List[str]) -> List[Dict[str, float]]:
+    """IP 묶음 하나에 대해 CPU/Memory/Disk/Network 식을 한 번씩 동시에 조회 -> 메트릭별 ip -> value"""
+    responses = await asyncio.gather(
+        query_prometheus(_promql_cpu(ips)),
+        query_prometheus(_promql_memory(ips)),
+        query_prometheus(_promql_disk(ips)),
+        query_prometheus(_promql_network(ips)),
+    )
+    return [_parse_vector_by_ip(res) for res in responses]
+
+
 async def fetch_instant_metrics_for_ips(ips: List[str]) -> Dict[str, Dict[str, float]]:
-    """IP별 CPU/Memory/Disk/Network instant 메트릭. 연결 0명일 때는 호출하지 않음."""
+    """IP별 CPU/Memory/Disk/Network instant 메트릭. 연결 0명일 때는 호출하지 않음.
+
+    IP마다 4번씩 조회하지 않고 메트릭마다 instance=~"ip1:9100|ip2:9100|..." 한 번으로 조회해
+    결과를 instance 라벨로 나눈다. 매처가 PROMETHEUS_MATCHER_MAX_LEN을 넘으면 IP를 묶음으로 나눠 조회.
+    """
     result: Dict[str, Dict[str, float]] = {}
-    for ip in ips:
-        if not ip:
-            continue
-        cpu_res = await query_prometheus(_promql_cpu(ip))
-        mem_res = await query_prometheus(_promql_memory(ip))
-        disk_res = await query_prometheus(_promql_disk(ip))
-        net_res = await query_prometheus(_promql_network(ip))
-        cpu_map = _parse_vector_by_ip(cpu_res)
-        mem_map = _parse_vector_by_ip(mem_res)
-        disk_map = _parse_vector_by_ip(disk_res)
-        net_map = _parse_vector_by_ip(net_res)
+    targets = list(dict.fromkeys(ip for ip in ips if ip))
+    if not targets:
+        return result
+    cpu_map: Dict[str, float] = {}
+    mem_map: Dict[str, float] = {}
+    disk_map: Dict[str, float] = {}
+    net_map: Dict[str, float] = {}
+    chunks = _chunk_ips_for_matcher(targets, PROMETHEUS_MATCHER_MAX_LEN)
+    for cpu, mem, disk, net in await asyncio.gather(*(_fetch_instant_maps(chunk) for chunk in chunks)):
+        cpu_map.update(cpu)
+        mem_map.update(mem)
+        disk_map.update(disk)
+        net_map.update(net)
+    for ip in targets:
         raw_cpu = cpu_map.get(ip)
         memory = mem_map.get(ip)
         disk = disk_map.get(ip)
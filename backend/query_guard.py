@@ -0,0 +1,137 @@
+"""
+쿼리 비용 제한: 라우트별 statement_timeout, 최대 반환 행 수, 풀 연결 대기 시간.
+
+풀 연결은 10개뿐이라 잘못된 where 원문이나 이력 테이블 전체 조회 하나가 연결을 몇 분씩 잡으면
+SSE 폴링·로그인까지 밀린다. 데이터 API 라우트는 guarded_connection()으로 연결을 받아
+- 풀 대기가 pool_wait_sec를 넘으면 504 (다른 요청이 연결을 모두 쓰는 중)
+- 연결을 받으면 파이프라인 모드로 들어가 트랜잭션 한정 statement_timeout(set_config)을 호출부 쿼리와 같은 왕복으로 보내고,
+  초과로 취소되면 504 (호출부의 conn.pipeline()·run_with_admin_check는 중첩 파이프라인이 되어 왕복이 늘지 않음)
+- 요청 limit이 max_rows를 넘으면 413 (database.resolve_row_limit)
+
+기본값: DB_STATEMENT_TIMEOUT_MS(기본 30000, 0이면 서버 설정), DB_POOL_WAIT_SEC(기본 5),
+최대 행 수는 DB_ROWS_MAX_LIMIT. 라우트별로 DB_GUARD_<ROUTE>_TIMEOUT_MS / _MAX_ROWS / _POOL_WAIT_SEC로 덮어쓴다
+(ROUTE: READ, STREAM, WRITE, BULK, AGGREGATE, HISTORY).
+"""
+import contextlib
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException
+from psycopg import errors
+from psycopg_pool import PoolTimeout
+
+from query_log import auxiliary_statements, timed_pipeline
+
+try:
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS") or "30000")
+except (TypeError, ValueError):
+    DB_STATEMENT_TIMEOUT_MS = 30000
+try:
+    DB_POOL_WAIT_SEC = float(os.getenv("DB_POOL_WAIT_SEC") or "5")
+except (TypeError, ValueError):
+    DB_POOL_WAIT_SEC = 5.0
+
+T = TypeVar("T", int, float)
+
+
+def _route_env(route: str, suffix: str, cast: Callable[[str], T], default: T) -> T:
+    """DB_GUARD_<ROUTE>_<SUFFIX> 값 (없거나 잘못되면 기본값)"""
+    try:
+        return cast(os.getenv(f"DB_GUARD_{route.upper()}_{suffix}") or str(default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class CostGuard:
+    route: str
+    statement_timeout_ms: int  # 0이면 서버 설정 그대로
+    max_rows: int              # 요청 limit 상한, 0이면 DB_ROWS_MAX_LIMIT
+    pool_wait_sec: float       # 풀 연결 대기 상한
+
+
+def _make_guard(route: str, timeout_ms: int = DB_STATEMENT_TIMEOUT_MS, max_rows: int = 0) -> CostGuard:
+    return CostGuard(
+        route=route,
+        statement_timeout_ms=_route_env(route, "TIMEOUT_MS", int, timeout_ms),
+        max_rows=_route_env(route, "MAX_ROWS", int, max_rows),
+        pool_wait_sec=_route_env(route, "POOL_WAIT_SEC", float, DB_POOL_WAIT_SEC),
+    )
+
+
+# 라우트 -> 제한 (스트리밍은 FETCH 1회마다 적용되는 제한이라 timeout만 의미가 있음)
+GUARDS: Dict[str, CostGuard] = {
+    "read": _make_guard("read"),            # get-db-array, get-db-array/batch, rest-access-page GET
+    "stream": _make_guard("stream"),        # get-db-array stream
+    "write": _make_guard("write"),          # rest-access-page POST/PUT/DELETE
+    "bulk": _make_guard("bulk"),            # rest-access-page bulk
+    "aggregate": _make_guard("aggregate"),  # /api/aggregate
+    "history": _make_guard("history"),      # /api/monitor-history
+}
+
+
+def pool_busy_error(guard: CostGuard) -> HTTPException:
+    return HTTPException(
+        status_code=504,
+        detail=f"Database is busy: no connection available within {guard.pool_wait_sec:g}s",
+    )
+
+
+def statement_timeout_error(guard: CostGuard) -> HTTPException:
+    return HTTPException(
+        status_code=504,
+        detail=f"Query cancelled: exceeded statement_timeout ({guard.statement_timeout_ms} ms)",
+    )
+
+
+async def apply_statement_timeout(conn, guard: CostGuard) -> None:
+    """
+    현재 트랜잭션에만 statement_timeout 적용 (커밋·롤백 후 풀 연결은 원래 설정으로).
+    파이프라인 모드면 결과를 기다리지 않고 다음 쿼리와 함께 전송된다.
+    """
+    if guard.statement_timeout_ms > 0:
+        with auxiliary_statements():
+            await conn.execute(
+                "SELECT set_config('statement_timeout', %s, true)", (str(int(guard.statement_timeout_ms)),)
+            )
+
+
+@contextlib.asynccontextmanager
+async def guarded_connection(pool, guard: CostGuard) -> AsyncIterator:
+    """풀 대기 상한 + statement_timeout을 적용한 파이프라인 모드 연결 (초과 시 504)"""
+    try:
+        async with pool.connection(timeout=guard.pool_wait_sec) as conn:
+            async with timed_pipeline(conn):
+                await apply_statement_timeout(conn, guard)
+                yield conn
+    except PoolTimeout:
+        raise pool_busy_error(guard) from None
+    except errors.QueryCanceled:
+        raise statement_timeout_error(guard) from None
+
+
+async def get_guarded_connection(pool, guard: CostGuard):
+    """
+    guarded_connection의 getconn 버전 (스트리밍처럼 요청 밖에서 반납하는 경우, 반납은 호출부 책임).
+    이름 있는 서버 측 커서는 파이프라인 모드를 쓸 수 없어 statement_timeout은 별도 왕복으로 적용한다.
+    """
+    try:
+        conn = await pool.getconn(timeout=guard.pool_wait_sec)
+    except PoolTimeout:
+        raise pool_busy_error(guard) from None
+    try:
+        await apply_statement_timeout(conn, guard)
+    except Exception:
+        await pool.putconn(conn)
+        raise
+    return conn
+
+
+def check_row_limit(guard: CostGuard, limit: Optional[int], default_max: int) -> int:
+    """요청 limit이 라우트 최대 행 수를 넘으면 413, 아니면 상한 반환"""
+    cap = guard.max_rows if guard.max_rows > 0 else default_max
+    if limit is not None and limit > cap:
+        raise HTTPException(status_code=413, detail=f"limit exceeds maximum rows for this route (max {cap})")
+    return cap
+
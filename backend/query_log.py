@@ -0,0 +1,301 @@
+"""
+느린 쿼리 로그: db_pool 연결의 모든 문 실행 시간을 재고, 임계값을 넘은 문을 실행 계획과 함께 메모리 링 버퍼에 보관.
+
+- database의 레인별 풀이 모두 cursor_factory=TimedAsyncCursor로 연결을 만들므로 database.py / server_status.py / tcs7000.py /
+  auth.py 등 풀을 쓰는 모든 execute가 측정된다 (서버 측 커서 제외).
+  파이프라인 모드의 문은 결과 도착 전에 반환되므로 timed_pipeline()으로 파이프라인 전체를 재고
+  호출부의 주 문(과 파이프라인의 문 목록)을 기록한다 (query_guard.guarded_connection, run_write, run_with_admin_check).
+  주 문은 auxiliary_statements() 밖에서 처음 실행한 문이다 — statement_timeout 설정, 권한 확인 사용자 조회,
+  변경 알림, 월간 롤업 갱신은 보조 문으로 표시해 느린 쓰기·조회 대신 기록되거나 EXPLAIN되지 않게 한다.
+- SLOW_QUERY_MS(기본 500ms)를 넘으면 기록. SLOW_QUERY_SAMPLE_RATE 비율만큼, 분당 SLOW_QUERY_EXPLAIN_PER_MIN회까지
+  풀과 별개인 EXPLAIN 전용 연결 1개에서 한 번에 하나씩 EXPLAIN을 실행해 계획을 붙인다
+  (statement_timeout까지 걸릴 수 있는 재실행이 사용자 요청·SSE 폴링과 풀 연결을 다투지 않도록).
+  SELECT/WITH 문만 EXPLAIN (ANALYZE, BUFFERS)로 다시 실행하고(읽기 전용 트랜잭션, 롤백), 쓰기 문은 ANALYZE 없이 계획만 구한다.
+- 바인딩 값에는 비밀번호 해시 등이 있을 수 있어 기본으로 저장하지 않는다 (SLOW_QUERY_LOG_PARAMS=1이면 저장).
+- GET /api/admin/slow-queries 로 조회, DELETE로 비움.
+"""
+import asyncio
+import collections
+import contextlib
+import contextvars
+import datetime as dt
+import logging
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from fastapi import Depends
+from psycopg import AsyncCursor, pq
+
+logger = logging.getLogger("query_log")
+
+try:
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS") or "500")
+except (TypeError, ValueError):
+    SLOW_QUERY_MS = 500.0
+try:
+    SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE") or "1.0")
+except (TypeError, ValueError):
+    SLOW_QUERY_SAMPLE_RATE = 1.0
+try:
+    SLOW_QUERY_EXPLAIN_PER_MIN = int(os.getenv("SLOW_QUERY_EXPLAIN_PER_MIN") or "6")
+except (TypeError, ValueError):
+    SLOW_QUERY_EXPLAIN_PER_MIN = 6
+try:
+    SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE") or "200")
+except (TypeError, ValueError):
+    SLOW_QUERY_LOG_SIZE = 200
+try:
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS") or "10000")
+except (TypeError, ValueError):
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS = 10000
+SLOW_QUERY_LOG_PARAMS = (os.getenv("SLOW_QUERY_LOG_PARAMS") or "").strip().lower() in ("1", "true", "yes")
+_MAX_SQL_LENGTH = 4000
+
+_slow_queries: Deque[Dict[str, Any]] = collections.deque(maxlen=max(1, SLOW_QUERY_LOG_SIZE))
+_stats = {"statements": 0, "slow": 0, "explained": 0, "explain_skipped": 0, "explain_failed": 0}
+# 최근 1분 EXPLAIN 실행 시각 (분당 상한)
+_explain_times: Deque[float] = collections.deque()
+_explain_tasks: set = set()
+# EXPLAIN 실행 중인 컨텍스트는 측정하지 않음 (재귀 방지)
+_explaining: contextvars.ContextVar[bool] = contextvars.ContextVar("query_log_explaining", default=False)
+# 진행 중인 timed_pipeline의 연결과 큐에 넣은 문 목록
+_pipeline: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("query_log_pipeline", default=None)
+# 보조 문 실행 중 (timed_pipeline의 주 문으로 잡지 않음)
+_auxiliary: contextvars.ContextVar[bool] = contextvars.ContextVar("query_log_auxiliary", default=False)
+# EXPLAIN 전용 연결 (한 번에 하나씩 사용)
+_explain_conn = None
+_explain_lock: Optional[asyncio.Lock] = None
+_MAX_PIPELINE_STATEMENTS = 20
+
+
+def _query_text(query: Any, conn) -> str:
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    if isinstance(query, str):
+        return query
+    try:
+        return query.as_string(conn)  # psycopg.sql.Composed
+    except Exception:
+        return str(query)
+
+
+def _is_read_only(sql: str) -> bool:
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    if head not in ("SELECT", "WITH"):
+        return False
+    # CTE 안 쓰기 (WITH ... INSERT/UPDATE/DELETE) 및 잠금 조회는 계획만
+    upper = sql.upper()
+    return not any(word in upper for word in (" INSERT ", " UPDATE ", " DELETE ", "FOR UPDATE", "FOR SHARE"))
+
+
+def _take_explain_slot() -> bool:
+    """샘플링 + 분당 상한 확인"""
+    if SLOW_QUERY_EXPLAIN_PER_MIN <= 0 or random.random() >= SLOW_QUERY_SAMPLE_RATE:
+        return False
+    now = time.monotonic()
+    while _explain_times and now - _explain_times[0] > 60.0:
+        _explain_times.popleft()
+    if len(_explain_times) >= SLOW_QUERY_EXPLAIN_PER_MIN:
+        return False
+    _explain_times.append(now)
+    return True
+
+
+async def _get_explain_connection():
+    """EXPLAIN 전용 연결 (없거나 끊겼으면 새로 연결)"""
+    global _explain_conn
+    import psycopg
+    from database import DATABASE_URL
+    if _explain_conn is None or _explain_conn.closed or _explain_conn.broken:
+        _explain_conn = await psycopg.AsyncConnection.connect(DATABASE_URL, application_name="vms_explain")
+    return _explain_conn
+
+
+async def close_explain_connection() -> None:
+    """앱 종료 시 EXPLAIN 전용 연결 닫기"""
+    global _explain_conn
+    if _explain_conn is not None:
+        await _explain_conn.close()
+        _explain_conn = None
+
+
+async def _explain(entry: Dict[str, Any], sql: str, params: Any) -> None:
+    """EXPLAIN 전용 연결에서 EXPLAIN 실행 후 기록 항목에 계획 추가 (실패는 기록만)"""
+    global _explain_lock
+    token = _explaining.set(True)
+    analyze = _is_read_only(sql)
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    if _explain_lock is None:
+        _explain_lock = asyncio.Lock()
+    try:
+        async with _explain_lock:
+            conn = await _get_explain_connection()
+            try:
+                async with conn.cursor() as cur:
+                    if analyze:
+                        await cur.execute("SET TRANSACTION READ ONLY")
+                    await cur.execute(f"SET LOCAL statement_timeout = {int(SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+                    await cur.execute(f"EXPLAIN ({options}) {sql}", params)
+                    row = await cur.fetchone()
+            finally:
+                # ANALYZE로 실행된 문의 부수 효과를 남기지 않음
+                await conn.rollback()
+        plan = row[0] if row else None
+        entry["plan"] = plan[0] if isinstance(plan, list) and plan else plan
+        entry["analyzed"] = analyze
+        _stats["explained"] += 1
+    except Exception as e:
+        entry["plan_error"] = str(e)
+        _stats["explain_failed"] += 1
+    finally:
+        _explaining.reset(token)
+
+
+def record_statement(conn, query: Any, params: Any, elapsed_ms: float, many: bool = False,
+                     pipeline: Optional[List[str]] = None) -> None:
+    """
+    실행 시간 기록. 임계값을 넘으면 링 버퍼에 추가하고 (샘플·상한 내에서) EXPLAIN 예약.
+    pipeline이 있으면 elapsed_ms는 파이프라인 전체 시간, query는 그 주 문이다.
+    """
+    _stats["statements"] += 1
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    _stats["slow"] += 1
+    sql = _query_text(query, conn)
+    entry: Dict[str, Any] = {
+        "at": dt.datetime.now().isoformat(timespec="milliseconds"),
+        "elapsed_ms": round(elapsed_ms, 1),
+        "sql": sql[:_MAX_SQL_LENGTH],
+        "executemany": many,
+    }
+    if SLOW_QUERY_LOG_PARAMS and not many:
+        entry["params"] = repr(params)[:_MAX_SQL_LENGTH]
+    if pipeline is not None:
+        entry["pipeline"] = pipeline
+    _slow_queries.append(entry)
+    logger.warning("slow query %.1fms: %s", elapsed_ms, sql[:200])
+
+    if many or not _take_explain_slot():
+        _stats["explain_skipped"] += 1
+        return
+    try:
+        task = asyncio.get_running_loop().create_task(_explain(entry, sql, params))
+    except RuntimeError:
+        return
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
+
+
+@contextlib.contextmanager
+def auxiliary_statements() -> Iterator[None]:
+    """이 블록에서 실행한 문은 timed_pipeline의 주 문으로 잡지 않음 (문 목록에는 포함)"""
+    token = _auxiliary.set(True)
+    try:
+        yield
+    finally:
+        _auxiliary.reset(token)
+
+
+@contextlib.asynccontextmanager
+async def timed_pipeline(conn) -> AsyncIterator:
+    """
+    conn.pipeline()과 같되 파이프라인 전체 실행 시간을 재서 주 문(보조 문이 아닌 첫 문, 없으면 마지막 문)으로 기록.
+    같은 연결의 timed_pipeline 안에서 다시 쓰면 일반 중첩 파이프라인 (바깥에서 한 번만 기록).
+    """
+    current = _pipeline.get()
+    if _explaining.get() or (current is not None and current["conn"] is conn):
+        async with conn.pipeline():
+            yield
+        return
+    state: Dict[str, Any] = {"conn": conn, "main": None, "last": None, "statements": []}
+    token = _pipeline.set(state)
+    start = time.perf_counter()
+    try:
+        async with conn.pipeline():
+            yield
+    finally:
+        _pipeline.reset(token)
+        recorded = state["main"] or state["last"]
+        if recorded is not None:
+            query, params, many = recorded
+            record_statement(conn, query, params, (time.perf_counter() - start) * 1000, many=many,
+                             pipeline=state["statements"])
+
+
+class TimedAsyncCursor(AsyncCursor):
+    """execute/executemany 실행 시간을 query_log에 기록하는 커서 (db_pool 연결의 cursor_factory)"""
+
+    def _timed(self) -> bool:
+        """직접 측정할지 여부 (파이프라인 모드면 timed_pipeline이 파이프라인 단위로 측정)"""
+        if _explaining.get():
+            return False
+        return self.connection.pgconn.pipeline_status == pq.PipelineStatus.OFF
+
+    def _note_pipeline(self, query, params, many: bool) -> None:
+        state = _pipeline.get()
+        if state is None or state["conn"] is not self.connection or _explaining.get():
+            return
+        state["last"] = (query, params, many)
+        if state["main"] is None and not _auxiliary.get():
+            state["main"] = state["last"]
+        if len(state["statements"]) < _MAX_PIPELINE_STATEMENTS:
+            state["statements"].append(_query_text(query, self.connection)[:200])
+
+    async def execute(self, query, params=None, *, prepare=None, binary=None):
+        if not self._timed():
+            self._note_pipeline(query, params, False)
+            return await super().execute(query, params, prepare=prepare, binary=binary)
+        start = time.perf_counter()
+        try:
+            return await super().execute(query, params, prepare=prepare, binary=binary)
+        finally:
+            record_statement(self.connection, query, params, (time.perf_counter() - start) * 1000)
+
+    async def executemany(self, query, params_seq, *, returning=False):
+        if not self._timed():
+            self._note_pipeline(query, None, True)
+            return await super().executemany(query, params_seq, returning=returning)
+        start = time.perf_counter()
+        try:
+            return await super().executemany(query, params_seq, returning=returning)
+        finally:
+            record_statement(self.connection, query, None, (time.perf_counter() - start) * 1000, many=True)
+
+
+def get_slow_queries(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """최근 느린 쿼리 (최신 순)"""
+    entries = list(reversed(_slow_queries))
+    return entries[:limit] if limit else entries
+
+
+def clear_slow_queries() -> None:
+    _slow_queries.clear()
+
+
+def get_query_log_status() -> Dict[str, Any]:
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "sample_rate": SLOW_QUERY_SAMPLE_RATE,
+        "explain_per_min": SLOW_QUERY_EXPLAIN_PER_MIN,
+        "size": len(_slow_queries),
+        "capacity": _slow_queries.maxlen,
+        **_stats,
+    }
+
+
+def register_query_log_routes(app):
+    """느린 쿼리 로그 관리자 라우트 등록"""
+    from auth import require_admin_user
+
+    @app.get("/api/admin/slow-queries", dependencies=[Depends(require_admin_user)])
+    async def slow_queries(limit: Optional[int] = None):
+        """최근 느린 쿼리와 실행 계획 (관리자 전용)"""
+        return {"status": get_query_log_status(), "queries": get_slow_queries(limit)}
+
+    @app.delete("/api/admin/slow-queries", dependencies=[Depends(require_admin_user)])
+    async def slow_queries_clear():
+        """느린 쿼리 로그 비우기 (관리자 전용)"""
+        clear_slow_queries()
+        return {"cleared": True}
@@ -0,0 +1,303 @@
+"""
+참조 테이블 조회 결과 캐시: 자주 바뀌지 않는 테이블(MGMT_CODE, MGMT_MENU 등)의 SELECT 결과를 프로세스 내에 보관.
+
+- 캐시 키는 정규화된 쿼리(생성된 SQL + 바인딩 파라미터 + 응답 형식)이다.
+- 테이블별 버전 토큰을 두고, 쓰기가 커밋되면 토큰을 바꿔 해당 테이블의 기존 항목을 모두 무효화한다.
+- 같은 키의 동시 미스는 DB 조회 1회를 공유한다 (single-flight).
+- 쓰기 트랜잭션에서 새 토큰을 pg_notify로 보내고, 각 워커는 LISTEN 전용 연결로 받아 같은 토큰으로 맞춘다 (멀티 워커 일관성).
+  LISTEN 연결이 끊겼다가 다시 붙으면 놓친 알림이 있을 수 있으므로 전체 토큰을 바꾼다.
+- 같은 토큰으로 조건부 GET용 ETag를 만든다. migrations/002_table_version.sql 트리거가 있는 테이블(ALIVE 컬럼 보유 +
+  참조 테이블)은 장치·psql이 DB를 직접 수정해도 트리거 알림으로 토큰이 바뀌므로 이 테이블에만 ETag를 붙인다.
+  트리거 테이블의 API 쓰기는 앱 알림을 따로 보내지 않고, 같은 트랜잭션에서 트리거가 올린 카운터(v<n>)를 읽어
+  커밋 직후 로컬 토큰으로 쓴다 (쓴 워커의 바로 다음 조회도 새 데이터). 다른 워커는 트리거 알림으로 같은 토큰을 갖는다.
+  v<n> 토큰은 뒤로 가지 않는다 (늦게 도착한 알림이 더 새 토큰을 덮어쓰지 않음).
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from fast_json import dumps as json_dumps
+from query_log import auxiliary_statements
+
+logger = logging.getLogger("result_cache")
+
+# 캐시 대상 테이블 (쉼표 구분 환경 변수로 변경 가능)
+RESULT_CACHE_TABLES = {
+    t.strip().upper()
+    for t in (os.getenv("RESULT_CACHE_TABLES") or "MGMT_CODE,MGMT_MENU,MGMT_MENU_MAP,MGMT_CONFIG,MGMT_VERSION").split(",")
+    if t.strip()
+}
+# 알림을 놓쳐도 오래된 결과가 남지 않도록 하는 안전 만료 시간
+try:
+    RESULT_CACHE_TTL_SEC = float(os.getenv("RESULT_CACHE_TTL_SEC") or "300")
+except (TypeError, ValueError):
+    RESULT_CACHE_TTL_SEC = 300.0
+try:
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES") or "1000")
+except (TypeError, ValueError):
+    RESULT_CACHE_MAX_ENTRIES = 1000
+
+INVALIDATION_CHANNEL = "vms_table_changed"
+_RECONNECT_DELAY_SEC = 5.0
+
+# 이 프로세스가 보낸 알림 구분용 (자기 알림은 이미 로컬에서 반영됨)
+_instance_id = uuid.uuid4().hex
+
+# 대문자 테이블명 -> 버전 토큰 ("v<n>": DB 카운터 기준, 그 외: 무작위)
+_versions: Dict[str, str] = {}
+# DB 트리거(vms_table_version)로 외부 수정까지 추적되는 테이블
+_trigger_tables: Set[str] = set()
+# 캐시 키 -> (버전 토큰, 만료 시각, 값)
+_entries: Dict[str, Tuple[str, float, Any]] = {}
+# (캐시 키, 버전 토큰) -> 진행 중인 조회
+_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+_stats = {"hits": 0, "misses": 0, "shared": 0, "invalidations": 0}
+_listener_task: Optional[asyncio.Task] = None
+_listening = False
+
+
+def is_cacheable_table(table_name: str) -> bool:
+    """결과 캐시 대상 테이블 여부"""
+    return bool(table_name) and str(table_name).upper() in RESULT_CACHE_TABLES
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def get_table_version(table_name: str) -> str:
+    """테이블 버전 토큰 (변경이 커밋될 때마다 바뀜). 처음 조회 시 이 프로세스 전용 무작위 토큰 생성"""
+    table = str(table_name).upper()
+    version = _versions.get(table)
+    if version is None:
+        version = _versions[table] = _new_token()
+    return version
+
+
+def _counter(version: Optional[str]) -> Optional[int]:
+    """트리거 카운터 토큰("v<n>")이면 n (무작위 토큰은 16진수라 "v"로 시작하지 않음)"""
+    if version and version[0] == "v" and version[1:].isdigit():
+        return int(version[1:])
+    return None
+
+
+def set_table_version(table_name: str, version: Optional[str] = None) -> None:
+    """
+    버전 토큰 변경 → 해당 테이블의 캐시 항목은 다음 조회에서 미스 처리 (토큰 미지정 시 무작위).
+    현재와 새 토큰이 모두 트리거 카운터면 더 큰 값일 때만 바꾼다.
+    """
+    table = str(table_name).upper()
+    new, current = _counter(version), _counter(_versions.get(table))
+    if new is not None and current is not None and new <= current:
+        return
+    _versions[table] = version or _new_token()
+    _stats["invalidations"] += 1
+
+
+def reset_all_versions() -> None:
+    """모든 테이블 토큰 변경 (알림 유실 가능성이 있을 때)"""
+    for table in list(_versions):
+        _versions[table] = _new_token()
+    _entries.clear()
+    _stats["invalidations"] += 1
+
+
+def make_cache_key(table_name: str, *parts: Any) -> str:
+    """테이블명 + 정규화된 쿼리 구성 요소로 캐시 키 생성"""
+    return str(table_name).upper() + ":" + json_dumps(list(parts)).decode("utf-8")
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # 기다리는 요청이 모두 끊긴 뒤 실패해도 "exception was never retrieved" 경고 방지
+    if not task.cancelled():
+        task.exception()
+
+
+async def _load_and_store(table_name: str, key: str, version: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+    try:
+        value = await loader()
+        # 조회 중 쓰기가 있었으면 저장하지 않음 (다음 요청이 새로 조회)
+        if get_table_version(table_name) == version:
+            if len(_entries) >= RESULT_CACHE_MAX_ENTRIES:
+                _entries.pop(next(iter(_entries)))
+            _entries[key] = (version, time.monotonic() + RESULT_CACHE_TTL_SEC, value)
+        return value
+    finally:
+        _inflight.pop((key, version), None)
+
+
+async def cached_result(table_name: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    캐시 대상 테이블이면 세대가 같은 캐시 값을 반환하고, 없으면 loader 결과를 저장해 반환.
+    같은 키·세대의 동시 미스는 진행 중인 loader 1개를 함께 기다린다. loader는 별도 태스크로 실행해
+    처음 요청한 클라이언트가 끊겨(취소) 도 함께 기다리는 요청은 결과를 받는다.
+    반환 값은 여러 요청이 공유하므로 호출부에서 수정하지 않는다.
+    """
+    if not is_cacheable_table(table_name):
+        return await loader()
+    version = get_table_version(table_name)
+    entry = _entries.get(key)
+    now = time.monotonic()
+    if entry is not None and entry[0] == version and entry[1] > now:
+        _stats["hits"] += 1
+        return entry[2]
+
+    flight_key = (key, version)
+    task = _inflight.get(flight_key)
+    if task is not None:
+        _stats["shared"] += 1
+    else:
+        _stats["misses"] += 1
+        task = asyncio.get_running_loop().create_task(_load_and_store(table_name, key, version, loader))
+        task.add_done_callback(_retrieve_exception)
+        _inflight[flight_key] = task
+    return await asyncio.shield(task)
+
+
+def is_trigger_tracked(table_name: str) -> bool:
+    """DB 트리거 알림을 받고 있는 테이블 여부 (이 경우 앱 측 알림·토큰 변경 불필요)"""
+    return _listening and str(table_name).upper() in _trigger_tables
+
+
+async def notify_table_change(cur, table_name: str) -> str:
+    """
+    쓰기 직후 같은 트랜잭션에서 호출: 새 버전 토큰을 pg_notify로 다른 워커에 알리고 토큰을 반환.
+    알림은 커밋 시 전달되므로 롤백된 쓰기는 다른 워커를 무효화하지 않는다.
+    로컬 토큰은 커밋 후 set_table_version(table, token)으로 바꾼다
+    (커밋 전에 바꾸면 그 사이 조회한 이전 데이터가 새 토큰으로 캐시됨).
+    트리거 추적 테이블이면 알림은 트리거가 보내므로, 같은 트랜잭션에서 트리거가 올린 카운터를 읽어 "v<n>" 반환
+    (행이 잠겨 있어 커밋 전까지 다른 쓰기가 바꿀 수 없음).
+    """
+    with auxiliary_statements():
+        if is_trigger_tracked(table_name):
+            await cur.execute("SELECT version FROM vms_table_version WHERE table_name = %s", (str(table_name).upper(),))
+            row = await cur.fetchone()
+            if row:
+                return f"v{row[0] if isinstance(row, (tuple, list)) else row['version']}"
+            return _new_token()
+        token = _new_token()
+        await cur.execute(
+            "SELECT pg_notify(%s, %s)",
+            (INVALIDATION_CHANNEL, f"{_instance_id}:{str(table_name).upper()}:{token}"),
+        )
+    return token
+
+
+def _handle_notification(payload: str) -> None:
+    """알림 payload("<instance_id>:<TABLE>[:<token>]") 처리. 자기 알림은 무시 (트리거 알림은 instance_id가 "-")"""
+    instance_id, _, rest = payload.partition(":")
+    table, _, token = rest.partition(":")
+    if instance_id == _instance_id or not table:
+        return
+    set_table_version(table, token or None)
+
+
+async def _load_trigger_versions(conn) -> None:
+    """트리거로 추적되는 테이블 목록과 DB 카운터를 적재 (마이그레이션 미적용이면 건너뜀)"""
+    global _trigger_tables
+    try:
+        cur = await conn.execute("SELECT to_regclass('public.vms_table_version') IS NOT NULL")
+        if not (await cur.fetchone())[0]:
+            _trigger_tables = set()
+            return
+        cur = await conn.execute("SELECT table_name, version FROM vms_table_version")
+        rows = await cur.fetchall()
+    except Exception as e:
+        logger.warning("table version load failed: %s", e)
+        return
+    _trigger_tables = {str(name).upper() for name, _ in rows}
+    for name, version in rows:
+        _versions[str(name).upper()] = f"v{version}"
+
+
+async def _listen_loop() -> None:
+    """LISTEN 전용 autocommit 연결로 알림 수신. 끊기면 재연결 후 전체 무효화"""
+    global _listening
+    import psycopg
+    from database import DATABASE_URL
+    connected_once = False
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(DATABASE_URL, autocommit=True) as conn:
+                await conn.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+                if connected_once:
+                    reset_all_versions()
+                # LISTEN 이후에 카운터를 읽어야 그 사이 변경을 놓치지 않음
+                await _load_trigger_versions(conn)
+                connected_once = True
+                _listening = True
+                async for notify in conn.notifies():
+                    _handle_notification(notify.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("result cache listener disconnected: %s", e)
+            if connected_once:
+                reset_all_versions()
+        finally:
+            _listening = False
+        await asyncio.sleep(_RECONNECT_DELAY_SEC)
+
+
+def start_invalidation_listener() -> None:
+    """앱 시작 시 LISTEN 태스크 시작 (DATABASE_URL이 없으면 로컬 무효화만 사용)"""
+    global _listener_task
+    from database import DATABASE_URL
+    if not DATABASE_URL or _listener_task is not None:
+        return
+    _listener_task = asyncio.get_running_loop().create_task(_listen_loop())
+
+
+async def stop_invalidation_listener() -> None:
+    """앱 종료 시 LISTEN 태스크 정리"""
+    global _listener_task
+    if _listener_task is None:
+        return
+    _listener_task.cancel()
+    try:
+        await _listener_task
+    except (asyncio.CancelledError, Exception):
+        pass
+    _listener_task = None
+
+
+def make_etag(table_name: str, key: str) -> Optional[str]:
+    """
+    테이블 버전 토큰 + 정규화된 쿼리로 강한 ETag 생성.
+    API 밖의 수정까지 토큰에 반영되는 트리거 추적 테이블만, 그리고 변경 알림을 받고 있을 때만 생성한다 (그 외 None).
+    """
+    table = str(table_name).upper()
+    if not is_trigger_tracked(table):
+        return None
+    digest = hashlib.sha1(f"{get_table_version(table)}\0{key}".encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더(쉼표 구분 목록 또는 *)가 ETag와 일치하는지 (W/ 접두사는 무시)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+def get_result_cache_status() -> dict:
+    """관리자 엔드포인트용 캐시 상태"""
+    return {
+        "tables": sorted(RESULT_CACHE_TABLES),
+        "entries": len(_entries),
+        "inflight": len(_inflight),
+        "ttl_sec": RESULT_CACHE_TTL_SEC,
+        "listening": _listening,
+        "trigger_tables": sorted(_trigger_tables),
+        **_stats,
+    }
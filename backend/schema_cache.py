@@ -0,0 +1,184 @@
+"""
+스키마 메타데이터 캐시: public 스키마 테이블의 컬럼·컬럼 타입·PRIMARY KEY를 프로세스 내에 보관.
+
+- 시작 시 pg_catalog 쿼리 1회로 전체 테이블(뷰·구체화 뷰 포함) 메타데이터를 적재한다.
+- tables.py(TABLES)에 정의된 테이블로 먼저 채우고, DB 조회 결과로 컬럼/타입을 덮어쓴다.
+  키는 기존 동작과 동일하게 tables.py 정의를 우선한다.
+- SCHEMA_CACHE_TTL_SEC 경과 시 다음 조회에서 재적재하며, 관리자 엔드포인트로 즉시 갱신할 수 있다.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+from tables import TABLES
+
+logger = logging.getLogger("schema_cache")
+
+try:
+    SCHEMA_CACHE_TTL_SEC = float(os.getenv("SCHEMA_CACHE_TTL_SEC") or "300")
+except (TypeError, ValueError):
+    SCHEMA_CACHE_TTL_SEC = 300.0
+_RETRY_AFTER_FAILURE_SEC = 10.0
+
+# 컬럼 순서, 타입, PK 순서를 한 번에 조회 (information_schema 대비 가볍고 왕복 1회)
+_CATALOG_SQL = """
+    SELECT c.relname,
+           a.attname,
+           format_type(a.atttypid, a.atttypmod),
+           array_position(i.indkey::int2[], a.attnum)
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_catalog.pg_index i ON i.indrelid = c.oid AND i.indisprimary
+    WHERE n.nspname = 'public'
+      AND c.relkind IN ('r', 'p', 'v', 'm')
+      AND NOT c.relispartition
+      -- 보존 기간이 지나 분리된 이력 파티션 <table>_pYYYYMM(DD)_detached (partition_manager.DETACHED_PATTERN)
+      AND c.relname !~ '_monitor_his_p[0-9]{6}([0-9]{2})?_detached$'
+    ORDER BY c.relname, a.attnum
+"""
+
+
+@dataclass
+class TableMeta:
+    """테이블 메타데이터 (컬럼명은 DB에 저장된 대소문자 그대로)"""
+    name: str
+    columns: List[str] = field(default_factory=list)
+    column_types: Dict[str, str] = field(default_factory=dict)  # 소문자 컬럼명 -> 타입
+    primary_key: List[str] = field(default_factory=list)
+    source: str = "schema"  # "schema"(tables.py만) / "database"(DB에서 확인됨)
+
+    @property
+    def key(self) -> Union[str, List[str], None]:
+        """단일 키면 문자열, 복합 키면 리스트, 키가 없으면 None (get_table_key 반환 형식과 동일)"""
+        if not self.primary_key:
+            return None
+        if len(self.primary_key) == 1:
+            return self.primary_key[0]
+        return list(self.primary_key)
+
+
+# 소문자 테이블명 -> TableMeta
+_tables: Dict[str, TableMeta] = {}
+_loaded_at: float = 0.0
+_failed_at: float = 0.0
+_refresh_lock: Optional[asyncio.Lock] = None
+
+
+def _seed_from_schema() -> Dict[str, TableMeta]:
+    """tables.py 정의로 초기 메타데이터 구성 (DB 조회 전/실패 시에도 존재·키 판단 가능)."""
+    seeded: Dict[str, TableMeta] = {}
+    for name, schema in TABLES.items():
+        keys = schema.key if isinstance(schema.key, list) else [schema.key]
+        seeded[name.lower()] = TableMeta(
+            name=name,
+            columns=[f.name.lower() for f in schema.fields],
+            column_types={f.name.lower(): f.type for f in schema.fields},
+            primary_key=list(keys),
+            source="schema",
+        )
+    return seeded
+
+
+_tables = _seed_from_schema()
+
+
+def _database_table_count() -> int:
+    return sum(1 for meta in _tables.values() if meta.source == "database")
+
+
+async def refresh_schema_cache(force: bool = True) -> int:
+    """
+    pg_catalog에서 메타데이터를 다시 적재. 적재된 DB 테이블(뷰 포함) 수를 반환.
+    force=False면 잠금을 기다리는 동안 다른 요청이 재적재를 마친 경우 다시 조회하지 않는다.
+    """
+    global _tables, _loaded_at, _refresh_lock
+    from database import db_pool
+    if not db_pool:
+        return 0
+    if _refresh_lock is None:
+        _refresh_lock = asyncio.Lock()
+    seen = _loaded_at
+    async with _refresh_lock:
+        if not force and _loaded_at != seen:
+            return _database_table_count()
+        async with db_pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(_CATALOG_SQL)
+                rows = await cur.fetchall()
+
+        db_tables: Dict[str, TableMeta] = {}
+        pk_positions: Dict[str, Dict[int, str]] = {}
+        for relname, attname, type_name, pk_pos in rows:
+            meta = db_tables.get(relname.lower())
+            if meta is None:
+                meta = TableMeta(name=relname, source="database")
+                db_tables[relname.lower()] = meta
+                pk_positions[relname.lower()] = {}
+            meta.columns.append(attname)
+            meta.column_types[attname.lower()] = type_name
+            if pk_pos is not None:
+                pk_positions[relname.lower()][pk_pos] = attname
+        for lower, positions in pk_positions.items():
+            db_tables[lower].primary_key = [positions[p] for p in sorted(positions)]
+
+        merged = _seed_from_schema()
+        for lower, meta in db_tables.items():
+            seeded = merged.get(lower)
+            if seeded is not None:
+                # tables.py 키 우선 (MGMT_CODE 등 정의서 기준 키 유지)
+                meta.primary_key = seeded.primary_key
+            merged[lower] = meta
+        _tables = merged
+        _loaded_at = time.monotonic()
+        logger.info("schema cache refreshed: %d tables from database", len(db_tables))
+        return len(db_tables)
+
+
+async def ensure_schema_cache() -> None:
+    """캐시가 한 번도 적재되지 않았거나 TTL이 지났으면 재적재. 실패 시 기존 캐시를 그대로 사용."""
+    global _failed_at
+    now = time.monotonic()
+    if _loaded_at and now - _loaded_at < SCHEMA_CACHE_TTL_SEC:
+        return
+    # DB 장애 시 요청마다 재시도하며 풀 대기하지 않도록 실패 후 잠시 재시도 보류
+    if _failed_at and now - _failed_at < _RETRY_AFTER_FAILURE_SEC:
+        return
+    try:
+        await refresh_schema_cache(force=False)
+        _failed_at = 0.0
+    except Exception as e:
+        _failed_at = time.monotonic()
+        logger.warning("schema cache refresh failed: %s", e)
+
+
+def get_table_meta(table_name: str) -> Optional[TableMeta]:
+    """테이블 메타데이터 조회 (대소문자 무시). 없으면 None."""
+    if not table_name:
+        return None
+    return _tables.get(str(table_name).lower())
+
+
+def is_database_loaded() -> bool:
+    """DB 메타데이터가 한 번 이상 적재되었는지 여부."""
+    return _loaded_at > 0
+
+
+def get_all_table_meta() -> List[TableMeta]:
+    """캐시된 모든 테이블 메타데이터 (테이블명 순)."""
+    return [_tables[k] for k in sorted(_tables)]
+
+
+def get_schema_cache_status() -> dict:
+    """관리자 엔드포인트용 캐시 상태."""
+    age = time.monotonic() - _loaded_at if _loaded_at else None
+    return {
+        "tables": len(_tables),
+        "database_tables": sum(1 for m in _tables.values() if m.source == "database"),
+        "loaded": is_database_loaded(),
+        "age_sec": round(age, 1) if age is not None else None,
+        "ttl_sec": SCHEMA_CACHE_TTL_SEC,
+    }
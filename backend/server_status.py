@@ -38,16 +38,17 @@ def _parse_ts_param(s: Optional[str]) -> Optional[float]:
 async def get_server_ips_from_db() -> List[str]:
     """MGMT_TRANS.trans_ip, MGMT_FMS.fms_ip from DB (unique list)."""
     try:
-        from database import db_pool
+        from database import get_lane_pool
         from database import format_table_name, var_name
     except ImportError:
         return []
-    if not db_pool:
+    pool = get_lane_pool("background")
+    if not pool:
         return []
     ips = []
     for table, col in [("mgmt_trans", "trans_ip"), ("mgmt_fms", "fms_ip")]:
         try:
-            async with db_pool.connection() as conn:
+            async with pool.connection() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute(
                         f"SELECT {var_name(col)} FROM {format_table_name(table)} WHERE {var_name(col)} IS NOT NULL AND TRIM({var_name(col)}) != ''"
@@ -66,16 +67,17 @@ async def get_server_ips_from_db() -> List[str]:
 async def get_server_alive_by_ip_from_db() -> Dict[str, str]:
     """MGMT_TRANS(trans_ip, alive), MGMT_FMS(fms_ip, alive) from DB. IP -> 'y' or 'n'."""
     try:
-        from database import db_pool
+        from database import get_lane_pool
         from database import format_table_name, var_name
     except ImportError:
         return {}
-    if not db_pool:
+    pool = get_lane_pool("background")
+    if not pool:
         return {}
     out: Dict[str, str] = {}
     for table, ip_col in [("mgmt_trans", "trans_ip"), ("mgmt_fms", "fms_ip")]:
         try:
-            async with db_pool.connection() as conn:
+            async with pool.connection() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute(
                         f"SELECT {var_name(ip_col)}, {var_name('alive')} FROM {format_table_name(table)} WHERE {var_name(ip_col)} IS NOT NULL AND TRIM({var_name(ip_col)}) != ''"
@@ -0,0 +1,362 @@
+"""
+세션·넌스 저장소: 로그인 토큰(token -> user_id)과 재전송 방지 넌스를 보관. 워커를 여러 개 띄우려면 공유 저장소가 필요하다.
+
+- SESSION_STORE=memory(기본): 프로세스 메모리. uvicorn 워커 1개일 때만 사용.
+- SESSION_STORE=postgres: UNLOGGED 테이블 vms_session / vms_nonce (시작 시 없으면 생성, auth 레인 풀 사용).
+  토큰은 SHA-256 해시로 저장한다 (DB 덤프로 세션을 가로챌 수 없도록).
+  세션은 SESSION_LOCAL_CACHE_SEC(기본 30초) 동안 워커 메모리에 read-through 캐시하고, 로그아웃 시 pg_notify
+  (vms_session_revoked)로 모든 워커의 캐시에서 해당 토큰을 지운다. 알림 수신(LISTEN) 연결이 끊긴 동안은 로컬 캐시를 쓰지 않는다.
+  넌스는 캐시하지 않고 DELETE ... RETURNING으로 정확히 한 번만 소비한다.
+  만료 행은 SESSION_PURGE_INTERVAL_SEC(기본 300초)마다 정리. UNLOGGED 테이블은 DB 비정상 종료 시 비워진다 (다시 로그인).
+
+넌스 발급(/api/auth/nonce)은 인증 없이 호출되므로 메모리 저장소는 만료 시각 min-heap으로 만료분만 꺼내고
+(소비는 dict 조회 O(1), 만료 정리는 건당 O(log n)), 미사용 넌스가 NONCE_MAX_OUTSTANDING(기본 10000)개를 넘으면
+가장 먼저 만료될 넌스부터 버린다. 발급·소비·거부·만료·축출 횟수는 GET /api/admin/sessions 로 확인.
+"""
+import abc
+import asyncio
+import hashlib
+import heapq
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("session_store")
+
+SESSION_STORE = (os.getenv("SESSION_STORE") or "memory").strip().lower()
+try:
+    SESSION_LOCAL_CACHE_SEC = float(os.getenv("SESSION_LOCAL_CACHE_SEC") or "30")
+except (TypeError, ValueError):
+    SESSION_LOCAL_CACHE_SEC = 30.0
+try:
+    SESSION_PURGE_INTERVAL_SEC = float(os.getenv("SESSION_PURGE_INTERVAL_SEC") or "300")
+except (TypeError, ValueError):
+    SESSION_PURGE_INTERVAL_SEC = 300.0
+try:
+    NONCE_MAX_OUTSTANDING = int(os.getenv("NONCE_MAX_OUTSTANDING") or "10000")
+except (TypeError, ValueError):
+    NONCE_MAX_OUTSTANDING = 10000
+
+
+class SessionStore(abc.ABC):
+    """세션·넌스 저장소 인터페이스 (ttl은 초). 구현하지 않은 메서드가 있으면 생성 시 TypeError"""
+
+    name = "base"
+    shared = False  # 여러 워커가 같은 저장소를 보는지
+
+    def __init__(self) -> None:
+        # 이 워커 기준 넌스 카운터 (rejected: 없거나 만료·재사용된 넌스)
+        self.nonce_stats = {"issued": 0, "consumed": 0, "rejected": 0, "expired": 0, "evicted": 0}
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"store": self.name, "shared": self.shared, "nonces": dict(self.nonce_stats)}
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def create_session(self, token: str, user_id: str, ttl: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def get_session(self, token: str) -> Optional[str]:
+        """유효한 토큰이면 user_id, 아니면 None"""
+
+    @abc.abstractmethod
+    async def delete_session(self, token: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def add_nonce(self, nonce: str, ttl: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def consume_nonce(self, nonce: str) -> bool:
+        """유효한 넌스면 삭제하고 True (같은 넌스는 한 번만 True)"""
+
+
+class MemorySessionStore(SessionStore):
+    """프로세스 메모리 저장소 (워커 1개 전용)"""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        super().__init__()
+        # token -> (user_id, 만료 시각)
+        self._sessions: Dict[str, Tuple[str, float]] = {}
+        # nonce -> 만료 시각, 만료 시각 min-heap (소비된 넌스의 항목은 꺼낼 때 건너뜀)
+        self._nonces: Dict[str, float] = {}
+        self._nonce_heap: List[Tuple[float, str]] = []
+        self._last_purge = time.monotonic()
+
+    def _purge_sessions(self, now: float) -> None:
+        if now - self._last_purge < SESSION_PURGE_INTERVAL_SEC:
+            return
+        self._last_purge = now
+        for token in [t for t, (_, expires) in self._sessions.items() if expires < now]:
+            del self._sessions[token]
+
+    async def create_session(self, token: str, user_id: str, ttl: float) -> None:
+        now = time.monotonic()
+        self._purge_sessions(now)
+        self._sessions[token] = (user_id, now + ttl)
+
+    async def get_session(self, token: str) -> Optional[str]:
+        entry = self._sessions.get(token)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            del self._sessions[token]
+            return None
+        return entry[0]
+
+    async def delete_session(self, token: str) -> None:
+        self._sessions.pop(token, None)
+
+    def _pop_nonce(self) -> Optional[str]:
+        """가장 먼저 만료되는 미사용 넌스를 꺼내 삭제 (없으면 None)"""
+        while self._nonce_heap:
+            expires, nonce = heapq.heappop(self._nonce_heap)
+            if self._nonces.get(nonce) == expires:
+                del self._nonces[nonce]
+                return nonce
+        return None
+
+    def _expire_nonces(self, now: float) -> None:
+        while self._nonce_heap and self._nonce_heap[0][0] < now:
+            expires, nonce = heapq.heappop(self._nonce_heap)
+            if self._nonces.get(nonce) == expires:
+                del self._nonces[nonce]
+                self.nonce_stats["expired"] += 1
+
+    async def add_nonce(self, nonce: str, ttl: float) -> None:
+        now = time.monotonic()
+        self._expire_nonces(now)
+        while len(self._nonces) >= max(1, NONCE_MAX_OUTSTANDING):
+            self._pop_nonce()
+            self.nonce_stats["evicted"] += 1
+        # 소비된 넌스의 힙 항목이 쌓이면 살아 있는 항목만으로 다시 구성
+        if len(self._nonce_heap) > 2 * max(1, NONCE_MAX_OUTSTANDING):
+            self._nonce_heap = [(expires, n) for n, expires in self._nonces.items()]
+            heapq.heapify(self._nonce_heap)
+        expires = now + ttl
+        self._nonces[nonce] = expires
+        heapq.heappush(self._nonce_heap, (expires, nonce))
+        self.nonce_stats["issued"] += 1
+
+    async def consume_nonce(self, nonce: str) -> bool:
+        expires = self._nonces.pop(nonce, None) if nonce else None
+        if expires is None or expires < time.monotonic():
+            # 만료된 넌스의 힙 항목은 다음 만료 정리에서 건너뜀
+            self.nonce_stats["rejected"] += 1
+            return False
+        self.nonce_stats["consumed"] += 1
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status["nonces"]["outstanding"] = len(self._nonces)
+        status["nonces"]["max_outstanding"] = NONCE_MAX_OUTSTANDING
+        status["sessions"] = len(self._sessions)
+        return status
+
+
+_SCHEMA_SQL = (
+    "CREATE UNLOGGED TABLE IF NOT EXISTS vms_session ("
+    "token_hash TEXT PRIMARY KEY, user_id TEXT NOT NULL, expires_at TIMESTAMPTZ NOT NULL)",
+    "CREATE UNLOGGED TABLE IF NOT EXISTS vms_nonce ("
+    "nonce TEXT PRIMARY KEY, expires_at TIMESTAMPTZ NOT NULL)",
+)
+
+
+# 로그아웃한 토큰 해시를 다른 워커의 로컬 캐시에서 지우는 알림 채널
+SESSION_REVOKED_CHANNEL = "vms_session_revoked"
+_RECONNECT_DELAY_SEC = 5.0
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PostgresSessionStore(SessionStore):
+    """UNLOGGED 테이블 저장소 + 워커 로컬 세션 캐시"""
+
+    name = "postgres"
+    shared = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        # 토큰 해시 -> (user_id, 로컬 캐시 만료 시각)
+        self._local: Dict[str, Tuple[str, float]] = {}
+        self._purge_task: Optional[asyncio.Task] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self._listening = False
+
+    def _pool(self):
+        from database import get_lane_pool
+        pool = get_lane_pool("auth")
+        if pool is None:
+            raise RuntimeError("database pool is not initialized")
+        return pool
+
+    async def open(self) -> None:
+        async with self._pool().connection() as conn:
+            async with conn.cursor() as cur:
+                # 여러 워커가 동시에 시작해도 생성은 한 번만
+                await cur.execute("SELECT pg_advisory_xact_lock(hashtext('vms_session_store'))")
+                for sql in _SCHEMA_SQL:
+                    await cur.execute(sql)
+        loop = asyncio.get_running_loop()
+        if self._purge_task is None and SESSION_PURGE_INTERVAL_SEC > 0:
+            self._purge_task = loop.create_task(self._purge_loop())
+        if self._listen_task is None and SESSION_LOCAL_CACHE_SEC > 0:
+            self._listen_task = loop.create_task(self._listen_loop())
+
+    async def close(self) -> None:
+        for task in (self._purge_task, self._listen_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._purge_task = None
+        self._listen_task = None
+
+    async def _listen_loop(self) -> None:
+        """LISTEN 전용 autocommit 연결로 로그아웃 알림 수신. 끊긴 동안은 로컬 캐시를 비우고 쓰지 않음"""
+        import psycopg
+        from database import DATABASE_URL
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(DATABASE_URL, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {SESSION_REVOKED_CHANNEL}")
+                    self._listening = True
+                    async for notify in conn.notifies():
+                        self._local.pop(notify.payload, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("session revoke listener disconnected: %s", e)
+            finally:
+                # 끊긴 사이 로그아웃을 놓쳤을 수 있음
+                self._listening = False
+                self._local.clear()
+            await asyncio.sleep(_RECONNECT_DELAY_SEC)
+
+    async def _purge_loop(self) -> None:
+        while True:
+            await asyncio.sleep(SESSION_PURGE_INTERVAL_SEC)
+            now = time.monotonic()
+            for token_hash in [t for t, (_, until) in self._local.items() if until < now]:
+                del self._local[token_hash]
+            try:
+                async with self._pool().connection() as conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute("DELETE FROM vms_session WHERE expires_at < now()")
+                        await cur.execute("DELETE FROM vms_nonce WHERE expires_at < now()")
+            except Exception as e:
+                logger.warning("session purge failed: %s", e)
+
+    def _cache_local(self, token_hash: str, user_id: str, ttl: float) -> None:
+        if SESSION_LOCAL_CACHE_SEC > 0 and self._listening:
+            self._local[token_hash] = (user_id, time.monotonic() + min(SESSION_LOCAL_CACHE_SEC, ttl))
+
+    async def create_session(self, token: str, user_id: str, ttl: float) -> None:
+        token_hash = _token_hash(token)
+        async with self._pool().connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "INSERT INTO vms_session (token_hash, user_id, expires_at) "
+                    "VALUES (%s, %s, now() + make_interval(secs => %s))",
+                    (token_hash, user_id, ttl),
+                    prepare=True,
+                )
+        self._cache_local(token_hash, user_id, ttl)
+
+    async def get_session(self, token: str) -> Optional[str]:
+        token_hash = _token_hash(token)
+        entry = self._local.get(token_hash)
+        if entry is not None:
+            if entry[1] >= time.monotonic():
+                return entry[0]
+            del self._local[token_hash]
+        async with self._pool().connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT user_id, EXTRACT(EPOCH FROM expires_at - now()) FROM vms_session "
+                    "WHERE token_hash = %s AND expires_at > now()",
+                    (token_hash,),
+                    prepare=True,
+                )
+                row = await cur.fetchone()
+        if not row:
+            return None
+        user_id, remaining = row
+        self._cache_local(token_hash, user_id, float(remaining))
+        return user_id
+
+    async def delete_session(self, token: str) -> None:
+        """세션 삭제 + 커밋 시 모든 워커의 로컬 캐시에서 제거하도록 알림"""
+        token_hash = _token_hash(token)
+        self._local.pop(token_hash, None)
+        async with self._pool().connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("DELETE FROM vms_session WHERE token_hash = %s", (token_hash,), prepare=True)
+                await cur.execute("SELECT pg_notify(%s, %s)", (SESSION_REVOKED_CHANNEL, token_hash))
+
+    async def add_nonce(self, nonce: str, ttl: float) -> None:
+        async with self._pool().connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "INSERT INTO vms_nonce (nonce, expires_at) VALUES (%s, now() + make_interval(secs => %s)) "
+                    "ON CONFLICT (nonce) DO NOTHING",
+                    (nonce, ttl),
+                    prepare=True,
+                )
+        self.nonce_stats["issued"] += 1
+
+    async def consume_nonce(self, nonce: str) -> bool:
+        if not nonce:
+            self.nonce_stats["rejected"] += 1
+            return False
+        async with self._pool().connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "DELETE FROM vms_nonce WHERE nonce = %s AND expires_at > now() RETURNING 1",
+                    (nonce,),
+                    prepare=True,
+                )
+                consumed = await cur.fetchone() is not None
+        self.nonce_stats["consumed" if consumed else "rejected"] += 1
+        return consumed
+
+
+def _make_store() -> SessionStore:
+    if SESSION_STORE == "postgres":
+        return PostgresSessionStore()
+    if SESSION_STORE != "memory":
+        logger.warning("unknown SESSION_STORE=%s, using memory", SESSION_STORE)
+    return MemorySessionStore()
+
+
+_store: SessionStore = _make_store()
+
+
+def get_session_store() -> SessionStore:
+    return _store
+
+
+async def open_session_store() -> None:
+    """앱 시작 시 (DB 풀을 연 뒤) 호출"""
+    await _store.open()
+
+
+async def close_session_store() -> None:
+    """앱 종료 시 (DB 풀을 닫기 전) 호출"""
+    await _store.close()
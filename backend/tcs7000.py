@@ -87,8 +87,9 @@ def register_tcs_routes(app):
 
         - 입력: { "serverId": "<TRANS_ID>" }
         - 동작:
-          1) MGMT_TRANS 에서 TRANS_ID 로 trans_ip, trans_port, trans_id 조회
+          1) 관리자 확인 + MGMT_TRANS 에서 TRANS_ID 로 trans_ip, trans_port, trans_id 조회 (한 연결에서 파이프라인으로 1회 왕복)
           2) TCS7000 JSON-RPC tr_stop 호출
+          3) 성공 시 MGMT_TRANS.alive = 'n' 갱신
         """
         server_id = (body.serverId or "").strip()
         if not server_id:
@@ -97,37 +98,31 @@ def register_tcs_routes(app):
         logger.info("TCS7000 중지 요청 수신: serverId=%s", server_id)
 
         # 관리자만 호출 가능 (MGMT_TRANS 관리와 동일한 권한 정책 사용)
-        try:
-            from auth import get_current_user_from_request
-        except ImportError:
-            get_current_user_from_request = None
-
-        if get_current_user_from_request:
-            user_row = await get_current_user_from_request(request)
-            group_name = (
-                (user_row.get("group_name") or user_row.get("GROUP_NAME")) or ""
-            ).strip().lower() if user_row else ""
-            if group_name != "admin":
-                raise HTTPException(status_code=403, detail="Admin role required for this resource")
+        from auth import run_with_admin_check
 
         try:
-            from database import db_pool, format_table_name, var_name
+            from database import format_table_name, get_lane_pool, var_name
         except ImportError as e:
             raise HTTPException(status_code=500, detail=f"데이터베이스 모듈을 로드할 수 없습니다: {e}") from e
 
-        if not db_pool:
+        pool = get_lane_pool("background")
+        if not pool:
             raise HTTPException(status_code=500, detail="데이터베이스 연결 풀이 초기화되지 않았습니다.")
 
-        # MGMT_TRANS 에서 서버 정보 조회
-        async with db_pool.connection() as conn:
-            async with conn.cursor() as cur:
-                table = format_table_name("mgmt_trans")
-                col_id = var_name("trans_id")
-                col_ip = var_name("trans_ip")
-                col_port = var_name("trans_port")
-                sql = f"SELECT {col_ip}, {col_port}, {col_id} FROM {table} WHERE {col_id} = {var_name('*').replace('*', '%s')}"
-                await cur.execute(sql, (server_id,))
-                row = await cur.fetchone()
+        table = format_table_name("mgmt_trans")
+        col_id = var_name("trans_id")
+
+        # 사용자 조회와 MGMT_TRANS 서버 정보 조회를 같은 연결에서 파이프라인으로 전송
+        async with pool.connection() as conn:
+            async def fetch_server():
+                async with conn.cursor() as cur:
+                    col_ip = var_name("trans_ip")
+                    col_port = var_name("trans_port")
+                    sql = f"SELECT {col_ip}, {col_port}, {col_id} FROM {table} WHERE {col_id} = %s"
+                    await cur.execute(sql, (server_id,), prepare=True)
+                    return await cur.fetchone()
+
+            row = await run_with_admin_check(conn, request, fetch_server)
 
         if not row:
             logger.warning("TCS7000 중지 요청: MGMT_TRANS 에서 서버를 찾을 수 없음: serverId=%s", server_id)
@@ -151,15 +146,18 @@ def register_tcs_routes(app):
         result = await stop_transcoder(ip, port, tr_id or server_id)
         logger.info("TCS7000 중지 요청 완료: serverId=%s, result=%s", server_id, result)
 
-        # TCS7000 응답이 예외 없이 성공하면 MGMT_TRANS.alive 를 'n' 으로 갱신
+        # TCS7000 응답이 예외 없이 성공하면 MGMT_TRANS.alive 를 'n' 으로 갱신 (변경 알림과 함께 파이프라인으로)
         try:
-            async with db_pool.connection() as conn:
-                async with conn.cursor() as cur:
-                    table = format_table_name("mgmt_trans")
-                    col_id = var_name("trans_id")
-                    col_alive = var_name("alive")
-                    sql_update = f"UPDATE {table} SET {col_alive} = %s WHERE {col_id} = {var_name('*').replace('*', '%s')}"
-                    await cur.execute(sql_update, ("n", server_id))
+            from query_log import timed_pipeline
+            from result_cache import notify_table_change, set_table_version
+            async with pool.connection() as conn:
+                async with timed_pipeline(conn):
+                    async with conn.cursor() as cur:
+                        col_alive = var_name("alive")
+                        sql_update = f"UPDATE {table} SET {col_alive} = %s WHERE {col_id} = %s"
+                        await cur.execute(sql_update, ("n", server_id), prepare=True)
+                        version = await notify_table_change(cur, "MGMT_TRANS")
+            set_table_version("MGMT_TRANS", version)
             logger.info("MGMT_TRANS.alive 갱신 완료: serverId=%s, alive=n", server_id)
         except Exception as e:
             # alive 업데이트 실패는 중지 요청 자체는 성공한 것으로 간주하고, 로그만 남긴다.
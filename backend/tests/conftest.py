@@ -0,0 +1,10 @@
+"""
+백엔드 테스트 공통 설정: backend 디렉터리를 import 경로에 추가.
+
+실행: cd backend && python -m pytest tests
+DB 없이 실행하며, DB가 필요한 경로는 테스트 안에서 연결·커서를 흉내 낸다.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,125 @@
+"""
+결과 캐시 read-after-write: 같은 프로세스에서 쓰기 직후 조회가 캐시된 이전 결과를 받지 않는지 확인.
+
+DB 대신 쓰기 문을 실행하면 데이터와 vms_table_version 카운터(문장 트리거)를 바꾸는 가짜 풀을 쓴다.
+"""
+import asyncio
+import contextlib
+
+import pytest
+
+import database
+import result_cache
+
+
+class FakeDb:
+    """테이블 하나의 데이터 + 트리거 카운터"""
+
+    def __init__(self) -> None:
+        self.value = "old"
+        self.version = 1
+        self.statements = []
+
+
+class FakeCursor:
+    def __init__(self, db: FakeDb) -> None:
+        self.db = db
+        self.row = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=None, prepare=None):
+        self.db.statements.append(sql)
+        if sql.startswith("UPDATE"):
+            self.db.value = params[0]
+            self.db.version += 1  # vms_bump_table_version 문장 트리거
+            self.row = {"code": "A", "name": params[0]}
+        elif "vms_table_version" in sql:
+            self.row = (self.db.version,)
+        else:
+            self.row = None
+
+    async def fetchone(self):
+        return self.row
+
+
+class FakeConn:
+    def __init__(self, db: FakeDb) -> None:
+        self.db = db
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self.db)
+
+    async def execute(self, sql, params=None):
+        return await self.cursor().execute(sql, params)
+
+    @contextlib.asynccontextmanager
+    async def pipeline(self):
+        yield
+
+
+class FakePool:
+    def __init__(self, db: FakeDb) -> None:
+        self.db = db
+
+    @contextlib.asynccontextmanager
+    async def connection(self, timeout=None):
+        yield FakeConn(self.db)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDb()
+    monkeypatch.setattr(database, "db_pool", FakePool(fake))
+    monkeypatch.setattr(result_cache, "_versions", {})
+    monkeypatch.setattr(result_cache, "_entries", {})
+    monkeypatch.setattr(result_cache, "_inflight", {})
+    monkeypatch.setattr(result_cache, "_trigger_tables", set())
+    monkeypatch.setattr(result_cache, "_listening", False)
+    return fake
+
+
+async def _read(db: FakeDb):
+    async def load():
+        return {"name": db.value}
+    return await result_cache.cached_result("MGMT_CODE", "MGMT_CODE:select", load)
+
+
+async def _write_then_read(db: FakeDb, name: str):
+    before = await _read(db)
+    await database.run_write(None, "MGMT_CODE", "UPDATE mgmt_code SET name = %s", [name], require_row=True)
+    return before, await _read(db)
+
+
+def test_write_then_read_returns_fresh_data(db):
+    before, after = asyncio.run(_write_then_read(db, "new"))
+    assert before == {"name": "old"}
+    assert after == {"name": "new"}
+
+
+def test_trigger_tracked_write_then_read_returns_fresh_data(db, monkeypatch):
+    monkeypatch.setattr(result_cache, "_listening", True)
+    monkeypatch.setattr(result_cache, "_trigger_tables", {"MGMT_CODE"})
+    result_cache._versions["MGMT_CODE"] = "v1"
+    etag_before = result_cache.make_etag("MGMT_CODE", "MGMT_CODE:select")
+
+    before, after = asyncio.run(_write_then_read(db, "new"))
+
+    assert before == {"name": "old"}
+    assert after == {"name": "new"}
+    # 앱 알림 없이 트리거 카운터를 로컬 토큰으로 사용
+    assert result_cache.get_table_version("MGMT_CODE") == "v2"
+    assert not any("pg_notify" in sql for sql in db.statements)
+    assert result_cache.make_etag("MGMT_CODE", "MGMT_CODE:select") != etag_before
+
+
+def test_trigger_version_does_not_move_backwards(db):
+    result_cache.set_table_version("MGMT_CODE", "v5")
+    result_cache._handle_notification("-:MGMT_CODE:v4")
+    assert result_cache.get_table_version("MGMT_CODE") == "v5"
+    result_cache._handle_notification("-:MGMT_CODE:v6")
+    assert result_cache.get_table_version("MGMT_CODE") == "v6"
@@ -62,19 +62,262 @@ apiClient.interceptors.response.use(
   }
 )
 
+// get-db-array 구조화 필터 (서버에서 컬럼 검증 후 바인딩 파라미터 SQL로 변환)
+export type DbFilterOp =
+  | 'eq' | 'ne' | 'lt' | 'lte' | 'gt' | 'gte' | 'between'
+  | 'in' | 'not_in' | 'like' | 'ilike' | 'prefix' | 'iprefix' | 'contains' | 'icontains' | 'is_null'
+
+export type DbFilter =
+  | { field: string; op?: DbFilterOp; value?: any }
+  | { or: DbFilter[] }
+  | { and: DbFilter[] }
+
+// 정렬: 'field' | '-field'(내림차순) | { field, dir }
+export type DbSort = string | { field: string; dir?: 'asc' | 'desc' }
+
+// 서버 측 집계 (/api/aggregate/{table}). field 생략 시 count는 COUNT(*), as 생략 시 'fn' 또는 'fn_field'
+export interface DbAggregate {
+  fn: 'count' | 'count_distinct' | 'min' | 'max' | 'sum' | 'avg'
+  field?: string
+  as?: string
+}
+
+// 서버 상태 이력 구간 집계 응답 (/api/monitor-history/{kind})
+export interface MonitorHistoryBucket {
+  bucket: string
+  samples: number
+  [metric: string]: string | number | null
+}
+
+export interface MonitorHistoryResponse {
+  server_id: string
+  start: string
+  end: string
+  bucket_sec: number
+  buckets: MonitorHistoryBucket[]
+}
+
+export interface DbAggregateRequest {
+  group_by?: string[]
+  aggregates?: DbAggregate[]
+  filters?: DbFilter[]
+  limit?: number
+}
+
+// columnar 응답 형식 (컬럼명 1회 + 행별 값 배열)
+export interface ColumnarPayload {
+  columns: string[]
+  rows: any[][]
+}
+
+// columnar 응답을 기존과 같은 객체 배열로 변환 (이미 배열이면 그대로)
+export function decodeColumnar<T = any>(data: ColumnarPayload | T[]): T[] {
+  if (Array.isArray(data)) return data
+  if (!data || !Array.isArray(data.columns) || !Array.isArray(data.rows)) return []
+  const { columns, rows } = data
+  return rows.map((row) => {
+    const item: Record<string, any> = {}
+    for (let i = 0; i < columns.length; i++) item[columns[i]] = row[i]
+    return item as T
+  })
+}
+
+// bulk 요청/응답 형식
+export interface BulkWriteOps {
+  insert?: Record<string, any>[]
+  update?: Record<string, any>[]
+  delete?: (string | number | Record<string, any>)[]
+}
+
+export interface BulkRowResult<T = any> {
+  ok: boolean
+  row?: T
+  error?: string
+}
+
+export interface BulkWriteResult<T = any> {
+  inserted: number
+  updated: number
+  deleted: number
+  results: { insert: BulkRowResult<T>[]; update: BulkRowResult<T>[]; delete: BulkRowResult<T>[] }
+}
+
+// get-db-array 조건부 요청용 캐시 (요청 본문 -> ETag + 마지막 응답). 오래된 항목부터 제거
+const DB_ARRAY_ETAG_CACHE_MAX = 100
+const dbArrayEtagCache = new Map<string, { etag: string; response: AxiosResponse<any[]> }>()
+
+function rememberDbArrayResponse(key: string, etag: string, response: AxiosResponse<any[]>) {
+  dbArrayEtagCache.delete(key)
+  dbArrayEtagCache.set(key, { etag, response })
+  if (dbArrayEtagCache.size > DB_ARRAY_ETAG_CACHE_MAX) {
+    const oldest = dbArrayEtagCache.keys().next().value
+    if (oldest !== undefined) dbArrayEtagCache.delete(oldest)
+  }
+}
+
+function buildDbArrayRequest(tableName: string, params: any) {
+  return {
+    target: `/${tableName}/`,
+    layout: params.layout || [{ field: '*' }],
+    query: params.query || [],
+    where: params.where || '',
+    order: params.order || '',
+    ...(params.limit != null ? { limit: params.limit } : {}),
+    ...(params.after ? { after: params.after } : {}),
+    ...(params.format ? { format: params.format } : {}),
+    ...(params.filters?.length ? { filters: params.filters } : {}),
+    ...(params.sort?.length ? { sort: params.sort } : {})
+  }
+}
+
+// 단건 get-db-array. 이전 응답에 ETag가 있으면 If-None-Match로 보내고, 304면 저장해 둔 응답을 그대로 반환
+async function postDbArray(requestData: Record<string, any>): Promise<AxiosResponse<any[]>> {
+  const cacheKey = JSON.stringify(requestData)
+  const cached = dbArrayEtagCache.get(cacheKey)
+  // 프록시를 통해 /api 경로를 FastAPI 서버로 전달
+  const response = await fastApiClient.post<any[] | ColumnarPayload>('/api/get-db-array', requestData, {
+    headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304
+  })
+  if (response.status === 304 && cached) {
+    return { ...cached.response, status: 304 }
+  }
+  const decoded: AxiosResponse<any[]> = { ...response, data: decodeColumnar(response.data) }
+  const etag = response.headers?.etag
+  if (etag) {
+    rememberDbArrayResponse(cacheKey, etag, decoded)
+  } else if (cached) {
+    dbArrayEtagCache.delete(cacheKey)
+  }
+  return decoded
+}
+
+// get-db-array/batch 항목 결과
+interface DbArrayBatchResult {
+  status: number
+  data?: any[] | ColumnarPayload
+  next_cursor?: string | null
+  truncated?: boolean
+  etag?: string | null
+  detail?: any
+}
+
+interface PendingDbArray {
+  requestData: Record<string, any>
+  resolve: (response: AxiosResponse<any>) => void
+  reject: (error: any) => void
+}
+
+let pendingDbArray: PendingDbArray[] = []
+
+function queueDbArray(requestData: Record<string, any>): Promise<AxiosResponse<any[]>> {
+  return new Promise((resolve, reject) => {
+    pendingDbArray.push({ requestData, resolve, reject })
+    if (pendingDbArray.length === 1) setTimeout(flushDbArrayQueue, 0)
+  })
+}
+
+// 대기 중인 get-db-array 호출 전송: 1건이면 단건 API, 여러 건이면 batch API 한 번
+async function flushDbArrayQueue() {
+  const queue = pendingDbArray
+  pendingDbArray = []
+  if (queue.length === 1) {
+    const [only] = queue
+    postDbArray(only.requestData).then(only.resolve, only.reject)
+    return
+  }
+
+  const cacheKeys = queue.map((item) => JSON.stringify(item.requestData))
+  let batchResponse: AxiosResponse<{ results: Record<string, DbArrayBatchResult> }>
+  try {
+    batchResponse = await fastApiClient.post('/api/get-db-array/batch', {
+      requests: queue.map((item, i) => ({
+        ...item.requestData,
+        key: String(i),
+        if_none_match: dbArrayEtagCache.get(cacheKeys[i])?.etag
+      }))
+    })
+  } catch (error) {
+    queue.forEach((item) => item.reject(error))
+    return
+  }
+
+  queue.forEach((item, i) => {
+    const result = batchResponse.data.results[String(i)]
+    const cached = dbArrayEtagCache.get(cacheKeys[i])
+    if (result?.status === 304 && cached) {
+      item.resolve({ ...cached.response, status: 304 })
+    } else if (result?.status === 200) {
+      const headers: Record<string, string> = {}
+      if (result.next_cursor) headers['x-next-cursor'] = result.next_cursor
+      if (result.truncated) headers['x-result-truncated'] = 'true'
+      if (result.etag) headers.etag = result.etag
+      const response = {
+        ...batchResponse,
+        status: 200,
+        headers,
+        data: decodeColumnar(result.data ?? [])
+      } as AxiosResponse<any[]>
+      if (result.etag) rememberDbArrayResponse(cacheKeys[i], result.etag, response)
+      item.resolve(response)
+    } else {
+      // 단건 호출과 같은 형태의 오류 (error.response.status / error.response.data.detail)
+      const status = result?.status ?? 500
+      const itemResponse = { ...batchResponse, status, data: { detail: result?.detail } } as AxiosResponse
+      item.reject(new AxiosError(
+        typeof result?.detail === 'string' ? result.detail : `Request failed with status code ${status}`,
+        status >= 500 ? AxiosError.ERR_BAD_RESPONSE : AxiosError.ERR_BAD_REQUEST,
+        batchResponse.config,
+        batchResponse.request,
+        itemResponse
+      ))
+    }
+  })
+}
+
 // FastAPI 백엔드용 API 헬퍼 함수들
 const fastApiApi = {
   // FastAPI /get-db-array를 사용한 데이터 조회
+  // limit/after: 키셋 페이지네이션 (다음 페이지가 있으면 응답 헤더 x-next-cursor 값을 after로 전달)
+  // format: 'columnar' 이면 작은 페이로드로 받아 객체 배열로 변환해 반환 (호출부 데이터 형태 동일)
+  // filters/sort: 구조화 필터·정렬 (DbFilter[], DbSort[]) - 브라우저 대신 DB에서 거름
+  // 같은 틱에 여러 스토어가 호출하면 /get-db-array/batch 한 번으로 묶어 전송
   getDbArray: <T = any>(tableName: string, params: any): Promise<AxiosResponse<T[]>> => {
-    const requestData = {
-      target: `/${tableName}/`,
-      layout: params.layout || [{ field: '*' }],
-      query: params.query || [],
-      where: params.where || '',
-      order: params.order || ''
-    }
-    // 프록시를 통해 /api 경로를 FastAPI 서버로 전달
-    return fastApiClient.post<T[]>('/api/get-db-array', requestData)
+    return queueDbArray(buildDbArrayRequest(tableName, params))
+  },
+
+  // 여러 테이블을 한 번에 조회 (결과는 요청 key별 응답, 실패 항목은 error)
+  getDbArrayBatch: async (
+    items: { key: string; tableName: string; params?: any }[]
+  ): Promise<Record<string, { response?: AxiosResponse<any[]>; error?: any }>> => {
+    const settled = await Promise.allSettled(
+      items.map((item) => queueDbArray(buildDbArrayRequest(item.tableName, item.params || {})))
+    )
+    const results: Record<string, { response?: AxiosResponse<any[]>; error?: any }> = {}
+    items.forEach((item, i) => {
+      const result = settled[i]
+      results[item.key] = result.status === 'fulfilled' ? { response: result.value } : { error: result.reason }
+    })
+    return results
+  },
+
+  // 집계 결과만 조회 (전체 행을 받아 브라우저에서 세는 대신 DB에서 COUNT / GROUP BY)
+  // 예: aggregate('MGMT_CHANNEL', { group_by: ['ch_alive'], aggregates: [{ fn: 'count' }] })
+  aggregate: <T = Record<string, any>>(tableName: string, body: DbAggregateRequest): Promise<AxiosResponse<T[]>> => {
+    return fastApiClient.post<T[]>(`/api/aggregate/${tableName}`, {
+      group_by: body.group_by || [],
+      aggregates: body.aggregates || [{ fn: 'count' }],
+      filters: body.filters || [],
+      limit: body.limit
+    })
+  },
+
+  // 서버 상태 이력 구간 집계 (kind: trans | fms | fc, bucket: 구간 초). 구간별 CPU/MEM/BW 최소·평균·최대
+  monitorHistory: (
+    kind: 'trans' | 'fms' | 'fc',
+    params: { server_id: string; start?: string; end?: string; bucket?: number }
+  ): Promise<AxiosResponse<MonitorHistoryResponse>> => {
+    return fastApiClient.get<MonitorHistoryResponse>(`/api/monitor-history/${kind}`, { params })
   },
 
   // FastAPI /rest-access-page를 사용한 REST API 호출
@@ -92,6 +335,16 @@ const fastApiApi = {
     } else {
       return fastApiClient[method.toLowerCase() as 'post' | 'put']<T>(url, data)
     }
+  },
+
+  // 여러 행 등록/수정/삭제를 한 요청·한 트랜잭션으로 처리 (/rest-access-page/{table}/bulk)
+  // delete: 단일 키 값, 'val1,val2' 또는 복합 키 객체. 결과는 작업별 행 순서대로 { ok, row | error }
+  restAccessBulk: <T = any>(tableName: string, ops: BulkWriteOps): Promise<AxiosResponse<BulkWriteResult<T>>> => {
+    return fastApiClient.post<BulkWriteResult<T>>(`/api/rest-access-page/${tableName}/bulk`, {
+      insert: ops.insert || [],
+      update: ops.update || [],
+      delete: ops.delete || []
+    })
   }
 }
 
@@ -80,12 +80,10 @@ export const useDisplayGroupStore = defineStore('displayGroup', {
         const res = await api.fastapi.getDbArray<DisplayGroup>(TABLE_GROUP, {
           layout: [{ field: '*' }],
           query: [],
-          where: `user_id = '${userId}'`,
-          order: 'group_name asc'
+          filters: [{ field: 'user_id', op: 'eq', value: userId }],
+          sort: ['group_name']
         })
-        const raw = Array.isArray(res.data) ? res.data : []
-        this.items = raw.filter((g: any) => (g.user_id || g.user_Id) === userId)
-        if (this.items.length === 0 && raw.length > 0) this.items = raw
+        this.items = Array.isArray(res.data) ? res.data : []
         this.lastFetched = Date.now()
       } catch (e: any) {
         this.error = e.response?.data?.detail ?? e.message ?? '표출그룹 목록 조회 실패'
@@ -102,12 +100,10 @@ export const useDisplayGroupStore = defineStore('displayGroup', {
         const res = await api.fastapi.getDbArray<any>(TABLE_CAMERA, {
           layout: [{ field: '*' }],
           query: [],
-          where: `group_id = '${groupId}'`,
-          order: 'layout_index asc'
+          filters: [{ field: 'group_id', op: 'eq', value: groupId }],
+          sort: ['layout_index']
         })
-        const raw = Array.isArray(res.data) ? res.data : []
-        const byGroup = raw.filter((c: any) => (c.group_id || c.group_Id) === groupId)
-        const list = byGroup.length > 0 ? byGroup : raw
+        const list = Array.isArray(res.data) ? res.data : []
         return list.map((c: any) => {
           const objectId = c.object_id ?? c.object_Id ?? ''
           const [ch_id = '', cctv_id = ''] = objectId.includes('|') ? objectId.split('|') : ['', objectId]
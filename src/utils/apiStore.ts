@@ -6,6 +6,9 @@
 import { api } from '../services/api'
 import type { AxiosResponse } from 'axios'
 
+// get-db-array 페이지 크기 (서버 DB_ROWS_DEFAULT_LIMIT 기본값과 같게, 다음 페이지는 x-next-cursor로 이어서 조회)
+const PAGE_SIZE = 10000
+
 // 공통 API 응답 타입
 export interface PaginatedResponse<T> {
   items: T[]
@@ -70,14 +73,22 @@ export class ApiStoreHelper<TApiResponse, TFrontend> {
       let allItems: TApiResponse[]
       
       if (tableName) {
-        // FastAPI 백엔드 사용
-        const response = await api.fastapi.getDbArray<TApiResponse>(tableName, {
-          layout: [{ field: '*' }],
-          query: [],
-          where: '',
-          order: ''
-        })
-        allItems = Array.isArray(response.data) ? response.data : []
+        // FastAPI 백엔드 사용 (columnar 형식으로 전송량 절감, limit으로 페이지 조회를 요청하고 x-next-cursor로 다음 페이지 연속 조회)
+        allItems = []
+        let after: string | undefined
+        do {
+          const response = await api.fastapi.getDbArray<TApiResponse>(tableName, {
+            layout: [{ field: '*' }],
+            query: [],
+            where: '',
+            order: '',
+            format: 'columnar',
+            limit: PAGE_SIZE,
+            after
+          })
+          if (Array.isArray(response.data)) allItems.push(...response.data)
+          after = response.headers?.['x-next-cursor'] || undefined
+        } while (after)
         
         // FastAPI에서 받은 데이터는 이미 소문자로 변환되어 있음
       } else {
@@ -227,15 +238,12 @@ export class ApiStoreHelper<TApiResponse, TFrontend> {
       this.state.isLoading = true
       this.state.error = null
       
-      const deletePromises = ids.map(id => {
-        if (tableName) {
-          return api.fastapi.restAccess(tableName, 'DELETE', undefined, id)
-        } else {
-          return api.delete(`${this.endpoint}/${id}`)
-        }
-      })
-      
-      await Promise.all(deletePromises)
+      if (tableName) {
+        // 한 요청·한 트랜잭션으로 삭제
+        await api.fastapi.restAccessBulk(tableName, { delete: ids })
+      } else {
+        await Promise.all(ids.map(id => api.delete(`${this.endpoint}/${id}`)))
+      }
       
       const keyField = tableKey || 'id'
       const keyLower = keyField.toLowerCase()